@@ -0,0 +1,71 @@
+"""add leaderboard entries
+
+Revision ID: 0b7e5c9a3d41
+Revises: f3c8a1d5b7e2
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0b7e5c9a3d41"
+down_revision: Union[str, Sequence[str], None] = "f3c8a1d5b7e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "leaderboard_entries",
+        sa.Column("id", sa.Uuid(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("category_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("scoring_model_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("entity_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("entity_name", sa.String(length=255), nullable=False),
+        sa.Column("entity_slug", sa.String(length=255), nullable=False),
+        sa.Column("entity_image_url", sa.String(length=512), nullable=False),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["scoring_model_id"], ["scoring_models.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["entity_id"], ["entities.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("scoring_model_id", "entity_id", name="uq_leaderboard_entries_model_entity"),
+    )
+    op.create_index("ix_leaderboard_entries_id", "leaderboard_entries", ["id"])
+    op.create_index(
+        "ix_leaderboard_entries_category_rank",
+        "leaderboard_entries",
+        ["category_id", "scoring_model_id", "rank"],
+        unique=True,
+        postgresql_include=["entity_id", "score", "entity_name", "entity_slug", "entity_image_url"],
+    )
+
+    # Rank what has already been scored; the FinalScore id doubles as the row id.
+    op.execute(
+        """
+        INSERT INTO leaderboard_entries (
+            id, category_id, scoring_model_id, entity_id, rank, score,
+            entity_name, entity_slug, entity_image_url
+        )
+        SELECT fs.id, e.category_id, fs.scoring_model_id, fs.entity_id,
+               row_number() OVER (
+                   PARTITION BY fs.scoring_model_id ORDER BY fs.score DESC, fs.entity_id
+               ),
+               fs.score, e.name, e.slug, e.image_url
+        FROM final_scores fs
+        JOIN entities e ON e.id = fs.entity_id
+        WHERE e.deleted_at IS NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_leaderboard_entries_category_rank", table_name="leaderboard_entries")
+    op.drop_index("ix_leaderboard_entries_id", table_name="leaderboard_entries")
+    op.drop_table("leaderboard_entries")
@@ -0,0 +1,39 @@
+"""make era adjusted scores unique per entity, era and component
+
+Revision ID: 3d8a6f1c5e27
+Revises: 9b6e2f4a8c13
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3d8a6f1c5e27"
+down_revision: Union[str, Sequence[str], None] = "9b6e2f4a8c13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the most recent adjustment of each value
+    op.execute(
+        """
+        DELETE FROM era_adjusted_scores AS a
+        USING era_adjusted_scores AS b
+        WHERE a.entity_id = b.entity_id
+          AND a.era_id = b.era_id
+          AND a.component_id = b.component_id
+          AND (a.updated_at, a.id) < (b.updated_at, b.id)
+        """
+    )
+    op.create_unique_constraint(
+        "_entity_era_component_uc", "era_adjusted_scores", ["entity_id", "era_id", "component_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("_entity_era_component_uc", "era_adjusted_scores", type_="unique")
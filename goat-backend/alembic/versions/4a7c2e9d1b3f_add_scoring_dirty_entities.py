@@ -0,0 +1,45 @@
+"""add scoring dirty entities
+
+Revision ID: 4a7c2e9d1b3f
+Revises: cc1d2e3f4a5b
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4a7c2e9d1b3f"
+down_revision: Union[str, Sequence[str], None] = "cc1d2e3f4a5b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("scoring_models", sa.Column("normalization_snapshot", sa.JSON(), nullable=True))
+    op.create_table(
+        "scoring_dirty_entities",
+        sa.Column("id", sa.Uuid(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("entity_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("scoring_model_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("reason", sa.String(length=50), nullable=True),
+        sa.ForeignKeyConstraint(["entity_id"], ["entities.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["scoring_model_id"], ["scoring_models.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("entity_id", "scoring_model_id", name="uq_scoring_dirty_entity_model"),
+    )
+    op.create_index("ix_scoring_dirty_entities_id", "scoring_dirty_entities", ["id"])
+    op.create_index(
+        "ix_scoring_dirty_entities_scoring_model_id", "scoring_dirty_entities", ["scoring_model_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scoring_dirty_entities_scoring_model_id", table_name="scoring_dirty_entities")
+    op.drop_index("ix_scoring_dirty_entities_id", table_name="scoring_dirty_entities")
+    op.drop_table("scoring_dirty_entities")
+    op.drop_column("scoring_models", "normalization_snapshot")
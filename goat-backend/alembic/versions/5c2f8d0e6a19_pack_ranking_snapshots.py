@@ -0,0 +1,51 @@
+"""pack ranking snapshots
+
+Revision ID: 5c2f8d0e6a19
+Revises: 0b7e5c9a3d41
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c2f8d0e6a19"
+down_revision: Union[str, Sequence[str], None] = "0b7e5c9a3d41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column("ranking_snapshots", "snapshot_data", existing_type=sa.JSON(), nullable=True)
+    op.add_column("ranking_snapshots", sa.Column("entry_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("ranking_snapshots", sa.Column("entity_ids", sa.LargeBinary(), nullable=True))
+    op.add_column("ranking_snapshots", sa.Column("scores", sa.LargeBinary(), nullable=True))
+    op.add_column("ranking_snapshots", sa.Column("name_offsets", sa.LargeBinary(), nullable=True))
+    op.add_column("ranking_snapshots", sa.Column("names", sa.LargeBinary(), nullable=True))
+    op.add_column("ranking_snapshots", sa.Column("breakdown_keys", sa.JSON(), nullable=True))
+    op.add_column("ranking_snapshots", sa.Column("breakdown_values", sa.LargeBinary(), nullable=True))
+    # Entries are paged with substr; out-of-line but uncompressed TOAST lets
+    # Postgres fetch just the chunks covering the range instead of
+    # decompressing the whole array
+    for column in ("entity_ids", "scores", "name_offsets", "names", "breakdown_values"):
+        op.execute(f"ALTER TABLE ranking_snapshots ALTER COLUMN {column} SET STORAGE EXTERNAL")
+    op.execute(
+        "UPDATE ranking_snapshots SET entry_count = json_array_length(snapshot_data::json) "
+        "WHERE snapshot_data IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    # Packed snapshots have no JSON form to fall back to
+    op.execute("DELETE FROM ranking_snapshots WHERE snapshot_data IS NULL")
+    op.drop_column("ranking_snapshots", "breakdown_values")
+    op.drop_column("ranking_snapshots", "breakdown_keys")
+    op.drop_column("ranking_snapshots", "names")
+    op.drop_column("ranking_snapshots", "name_offsets")
+    op.drop_column("ranking_snapshots", "scores")
+    op.drop_column("ranking_snapshots", "entity_ids")
+    op.drop_column("ranking_snapshots", "entry_count")
+    op.alter_column("ranking_snapshots", "snapshot_data", existing_type=sa.JSON(), nullable=False)
@@ -0,0 +1,45 @@
+"""add era component sketches
+
+Revision ID: 6b1e9c4d7a35
+Revises: 3d8a6f1c5e27
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6b1e9c4d7a35"
+down_revision: Union[str, Sequence[str], None] = "3d8a6f1c5e27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled from raw_scores the first time an era's factors are calculated
+    op.create_table(
+        "era_component_sketches",
+        sa.Column("id", sa.Uuid(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("era_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("component_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("mean", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("m2", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("min_value", sa.Float(), nullable=True),
+        sa.Column("max_value", sa.Float(), nullable=True),
+        sa.Column("quantile_sketch", sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(["era_id"], ["eras.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["component_id"], ["scoring_components.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("era_id", "component_id", name="_era_component_sketch_uc"),
+    )
+    op.create_index("ix_era_component_sketches_id", "era_component_sketches", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_era_component_sketches_id", table_name="era_component_sketches")
+    op.drop_table("era_component_sketches")
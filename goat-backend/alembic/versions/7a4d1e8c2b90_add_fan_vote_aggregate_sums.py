@@ -0,0 +1,51 @@
+"""add fan vote aggregate running sums
+
+Revision ID: 7a4d1e8c2b90
+Revises: 5c2f8d0e6a19
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7a4d1e8c2b90"
+down_revision: Union[str, Sequence[str], None] = "5c2f8d0e6a19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "fan_vote_aggregates",
+        sa.Column("weighted_rating_sum", sa.Float(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "fan_vote_aggregates",
+        sa.Column("weight_sum", sa.Float(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        UPDATE fan_vote_aggregates AS a
+        SET weighted_rating_sum = v.weighted_rating_sum,
+            weight_sum = v.weight_sum,
+            vote_count = v.vote_count
+        FROM (
+            SELECT entity_id, category_id,
+                   SUM(rating * weight) AS weighted_rating_sum,
+                   SUM(weight) AS weight_sum,
+                   COUNT(*) AS vote_count
+            FROM fan_votes
+            GROUP BY entity_id, category_id
+        ) AS v
+        WHERE a.entity_id = v.entity_id AND a.category_id = v.category_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("fan_vote_aggregates", "weight_sum")
+    op.drop_column("fan_vote_aggregates", "weighted_rating_sum")
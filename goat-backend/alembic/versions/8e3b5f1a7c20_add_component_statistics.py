@@ -0,0 +1,50 @@
+"""add component statistics
+
+Revision ID: 8e3b5f1a7c20
+Revises: 4a7c2e9d1b3f
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e3b5f1a7c20"
+down_revision: Union[str, Sequence[str], None] = "4a7c2e9d1b3f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "component_statistics",
+        sa.Column("id", sa.Uuid(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("category_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("component_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("era_id", sa.Uuid(as_uuid=True), nullable=True),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("mean", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("m2", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("min_value", sa.Float(), nullable=True),
+        sa.Column("max_value", sa.Float(), nullable=True),
+        sa.Column("min_max_stale", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["component_id"], ["scoring_components.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["era_id"], ["eras.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint(
+            "category_id", "component_id", "era_id",
+            name="uq_component_statistics_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+    op.create_index("ix_component_statistics_id", "component_statistics", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_component_statistics_id", table_name="component_statistics")
+    op.drop_table("component_statistics")
@@ -0,0 +1,95 @@
+"""add decayed and windowed fan aggregates
+
+Revision ID: 9b6e2f4a8c13
+Revises: e5b3c7a9d2f1
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b6e2f4a8c13"
+down_revision: Union[str, Sequence[str], None] = "e5b3c7a9d2f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Matches the FAN_DECAY_HALF_LIFE_DAYS default and DECAY_LANDMARK; a
+# reconcile run rebuilds the decayed sums for other settings.
+DECAY_RATE = "(ln(2) / (30 * 86400.0))"
+DECAY_SCALE = (
+    f"exp({DECAY_RATE} * (extract(epoch FROM updated_at) - extract(epoch FROM timestamptz '2026-01-01 00:00:00+00')))"
+)
+
+
+def upgrade() -> None:
+    for name in ("decayed_weighted_rating_sum", "decayed_weight_sum", "decayed_score"):
+        op.add_column(
+            "fan_vote_aggregates",
+            sa.Column(name, sa.Float(), nullable=False, server_default="0"),
+        )
+    op.add_column(
+        "scoring_models",
+        sa.Column("fan_score_mode", sa.String(length=20), nullable=True, server_default="lifetime"),
+    )
+
+    op.create_table(
+        "fan_vote_buckets",
+        sa.Column("id", sa.Uuid(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("entity_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("category_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("granularity", sa.String(length=10), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("weighted_rating_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("weight_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("vote_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["entity_id"], ["entities.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint(
+            "entity_id", "category_id", "granularity", "bucket_start", name="uq_fan_vote_buckets_entity_bucket"
+        ),
+    )
+    op.create_index("ix_fan_vote_buckets_id", "fan_vote_buckets", ["id"])
+
+    op.execute(
+        f"""
+        UPDATE fan_vote_aggregates AS a
+        SET decayed_weighted_rating_sum = v.decayed_weighted_rating_sum,
+            decayed_weight_sum = v.decayed_weight_sum,
+            decayed_score = COALESCE(v.decayed_weighted_rating_sum / NULLIF(v.decayed_weight_sum, 0) * 10, 0)
+        FROM (
+            SELECT entity_id, category_id,
+                   SUM(rating * weight * {DECAY_SCALE}) AS decayed_weighted_rating_sum,
+                   SUM(weight * {DECAY_SCALE}) AS decayed_weight_sum
+            FROM fan_votes
+            GROUP BY entity_id, category_id
+        ) AS v
+        WHERE a.entity_id = v.entity_id AND a.category_id = v.category_id
+        """
+    )
+    for granularity, retention in (("hour", "7 days"), ("day", "400 days")):
+        op.execute(
+            f"""
+            INSERT INTO fan_vote_buckets
+                (id, entity_id, category_id, granularity, bucket_start, weighted_rating_sum, weight_sum, vote_count)
+            SELECT gen_random_uuid(), entity_id, category_id, '{granularity}',
+                   date_trunc('{granularity}', updated_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                   SUM(rating * weight), SUM(weight), COUNT(*)
+            FROM fan_votes
+            WHERE updated_at >= now() - interval '{retention}'
+            GROUP BY entity_id, category_id, 5
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_fan_vote_buckets_id", table_name="fan_vote_buckets")
+    op.drop_table("fan_vote_buckets")
+    op.drop_column("scoring_models", "fan_score_mode")
+    for name in ("decayed_score", "decayed_weight_sum", "decayed_weighted_rating_sum"):
+        op.drop_column("fan_vote_aggregates", name)
@@ -0,0 +1,61 @@
+"""add latest raw scores
+
+Revision ID: b61f0c4d2e93
+Revises: 8e3b5f1a7c20
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b61f0c4d2e93"
+down_revision: Union[str, Sequence[str], None] = "8e3b5f1a7c20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "latest_raw_scores",
+        sa.Column("id", sa.Uuid(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("entity_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("component_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("raw_score_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+        sa.Column("era_id", sa.Uuid(as_uuid=True), nullable=True),
+        sa.ForeignKeyConstraint(["entity_id"], ["entities.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["component_id"], ["scoring_components.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["raw_score_id"], ["raw_scores.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["era_id"], ["eras.id"], ondelete="SET NULL"),
+        sa.UniqueConstraint("entity_id", "component_id", name="uq_latest_raw_scores_entity_component"),
+    )
+    op.create_index("ix_latest_raw_scores_id", "latest_raw_scores", ["id"])
+    op.create_index("ix_latest_raw_scores_component_id", "latest_raw_scores", ["component_id"])
+
+    # Backfill from history; the projection row reuses the raw score's id.
+    op.execute(
+        """
+        INSERT INTO latest_raw_scores (id, entity_id, component_id, raw_score_id, value, era_id)
+        SELECT id, entity_id, component_id, id, value, era_id
+        FROM (
+            SELECT raw_scores.*,
+                   row_number() OVER (
+                       PARTITION BY entity_id, component_id ORDER BY created_at DESC
+                   ) AS rn
+            FROM raw_scores
+        ) ranked
+        WHERE rn = 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_latest_raw_scores_component_id", table_name="latest_raw_scores")
+    op.drop_index("ix_latest_raw_scores_id", table_name="latest_raw_scores")
+    op.drop_table("latest_raw_scores")
@@ -0,0 +1,71 @@
+"""add influence event content hashes and dirty marks
+
+Revision ID: c4f2a8e6d913
+Revises: 6b1e9c4d7a35
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f2a8e6d913"
+down_revision: Union[str, Sequence[str], None] = "6b1e9c4d7a35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("influence_events", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    # Same canonical form as app.services.influence.event_content_hash
+    op.execute(
+        """
+        UPDATE influence_events
+        SET content_hash = encode(sha256(convert_to(concat_ws(chr(31),
+            entity_id::text,
+            source_id::text,
+            event_type,
+            coalesce(to_char(event_date AT TIME ZONE 'UTC', 'YYYY-MM-DD'), ''),
+            description
+        ), 'UTF8')), 'hex')
+        """
+    )
+    # Existing duplicates stay, but only the oldest takes part in deduplication
+    op.execute(
+        """
+        UPDATE influence_events AS a
+        SET content_hash = NULL
+        FROM influence_events AS b
+        WHERE a.content_hash = b.content_hash
+          AND (a.created_at, a.id) > (b.created_at, b.id)
+        """
+    )
+    op.create_index("ix_influence_events_content_hash", "influence_events", ["content_hash"], unique=True)
+
+    op.create_table(
+        "influence_dirty_entities",
+        sa.Column("id", sa.Uuid(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("entity_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("influence_model_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("reason", sa.String(length=50), nullable=True),
+        sa.ForeignKeyConstraint(["entity_id"], ["entities.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["influence_model_id"], ["influence_models.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("entity_id", "influence_model_id", name="uq_influence_dirty_entity_model"),
+    )
+    op.create_index("ix_influence_dirty_entities_id", "influence_dirty_entities", ["id"])
+    op.create_index(
+        "ix_influence_dirty_entities_influence_model_id", "influence_dirty_entities", ["influence_model_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_influence_dirty_entities_influence_model_id", table_name="influence_dirty_entities")
+    op.drop_index("ix_influence_dirty_entities_id", table_name="influence_dirty_entities")
+    op.drop_table("influence_dirty_entities")
+    op.drop_index("ix_influence_events_content_hash", table_name="influence_events")
+    op.drop_column("influence_events", "content_hash")
@@ -0,0 +1,37 @@
+"""make user trust scores unique per user
+
+Revision ID: e5b3c7a9d2f1
+Revises: 7a4d1e8c2b90
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b3c7a9d2f1"
+down_revision: Union[str, Sequence[str], None] = "7a4d1e8c2b90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Concurrent first votes could create several rows per user; keep the oldest
+    op.execute(
+        """
+        DELETE FROM user_trust_scores AS a
+        USING user_trust_scores AS b
+        WHERE a.user_id = b.user_id
+          AND (a.created_at, a.id) > (b.created_at, b.id)
+        """
+    )
+    op.drop_index("ix_user_trust_scores_user_id", table_name="user_trust_scores")
+    op.create_index("ix_user_trust_scores_user_id", "user_trust_scores", ["user_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_trust_scores_user_id", table_name="user_trust_scores")
+    op.create_index("ix_user_trust_scores_user_id", "user_trust_scores", ["user_id"], unique=False)
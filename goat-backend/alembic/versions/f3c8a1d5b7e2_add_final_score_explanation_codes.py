@@ -0,0 +1,26 @@
+"""add final score explanation codes
+
+Revision ID: f3c8a1d5b7e2
+Revises: d2a94e6b8f17
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3c8a1d5b7e2"
+down_revision: Union[str, Sequence[str], None] = "d2a94e6b8f17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("final_scores", sa.Column("explanation_codes", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("final_scores", "explanation_codes")
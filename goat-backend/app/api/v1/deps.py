@@ -1,5 +1,7 @@
+import ipaddress
 from datetime import datetime, timezone
-from typing import Generator, List
+from functools import lru_cache
+from typing import Generator, List, Optional, Tuple
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
@@ -15,6 +17,9 @@ from app.schemas.token import TokenPayload
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token"
 )
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token", auto_error=False
+)
 
 def get_current_user(
     db: Session = Depends(get_db),
@@ -55,6 +60,16 @@ def get_current_user(
         request.state.user_id = user.id
     return user
 
+def get_optional_current_user(
+    db: Session = Depends(get_db),
+    token: Optional[str] = Depends(optional_oauth2),
+    request: Request | None = None,
+) -> Optional[User]:
+    """The caller if a bearer token was sent, for routes open to anonymous use."""
+    if token is None:
+        return None
+    return get_current_user(db=db, token=token, request=request)
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -115,3 +130,33 @@ class RoleChecker:
                 detail=f"Access requires one of the following roles: {', '.join(self.allowed_roles)}",
             )
         return user
+
+
+@lru_cache(maxsize=1)
+def _trusted_proxy_networks() -> Tuple[ipaddress._BaseNetwork, ...]:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXIES if proxy)
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_proxy_networks())
+
+
+def get_vote_source(request: Request) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (client IP, user agent) of a voting request, for anomaly detection. The
+    peer address is used unless it is a trusted proxy; then X-Forwarded-For
+    is read right to left, past the trusted proxies, to the first hop they
+    did not add themselves. Anything further left is client-supplied.
+    """
+    ip = request.client.host if request.client else None
+    if ip and _is_trusted_proxy(ip):
+        forwarded = ",".join(request.headers.getlist("x-forwarded-for"))
+        for hop in reversed([hop.strip() for hop in forwarded.split(",") if hop.strip()]):
+            ip = hop
+            if not _is_trusted_proxy(hop):
+                break
+    return (ip[:45] if ip else None), request.headers.get("user-agent")
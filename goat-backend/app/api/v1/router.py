@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.routes import health, categories, subcategories, entities, scoring, experts, fan_votes, eras, influence, auth, users, audit_logs, debates, debate_arguments
+from app.api.v1.routes import health, categories, subcategories, entities, scoring, experts, fan_votes, eras, influence, auth, users, audit_logs, debates, debate_arguments, jobs
 
 api_router = APIRouter()
 
@@ -17,3 +17,4 @@ api_router.include_router(influence.router, prefix="/influence", tags=["influenc
 api_router.include_router(audit_logs.router, prefix="/audit-logs", tags=["audit-logs"])
 api_router.include_router(debates.router, prefix="/debates", tags=["debates"])
 api_router.include_router(debate_arguments.router, prefix="/debates", tags=["debate-arguments"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
@@ -1,13 +1,15 @@
-from typing import List
+from typing import List, Optional, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.schemas.core import Category, CategoryCreate, CategoryUpdate, Entity
-from app.schemas.fan_voting import FanVote, FanVoteCreate
+from app.schemas.fan_voting import FanVote, FanVoteCreate, FanBallotCreate, FanBallotResult
+from app.schemas.scoring import LeaderboardPage, LeaderboardEntryResponse
 from app.services.category import category_service
 from app.services.entity import entity_service
 from app.services.fan_voting import fan_voting_service
+from app.services.leaderboard import leaderboard_service
 from app.api.v1 import deps
 from app.models.user import User
 
@@ -83,6 +85,53 @@ def read_category_goats(
     return category_service.get_goats(db, category_id=category_id, skip=skip, limit=limit)
 
 
+@router.get("/{category_id}/leaderboard", response_model=LeaderboardPage)
+def read_category_leaderboard(
+    category_id: UUID,
+    db: Session = Depends(get_db),
+    after_rank: int = Query(0, ge=0, description="Last rank of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    scoring_model_id: Optional[UUID] = None
+):
+    """
+    Ranked leaderboard from the latest scoring run, paged by rank. Uses the
+    category's active scoring model unless one is given.
+    """
+    try:
+        model_id = leaderboard_service.resolve_model_id(db, category_id, scoring_model_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    entries = leaderboard_service.get_page(db, category_id, model_id, after_rank=after_rank, limit=limit)
+    total = leaderboard_service.count(db, category_id, model_id)
+    next_after_rank = entries[-1].rank if entries and entries[-1].rank < total else None
+    return LeaderboardPage(
+        category_id=category_id,
+        scoring_model_id=model_id,
+        total=total,
+        entries=entries,
+        next_after_rank=next_after_rank,
+    )
+
+
+@router.get("/{category_id}/leaderboard/{entity_id}", response_model=LeaderboardEntryResponse)
+def read_category_leaderboard_rank(
+    category_id: UUID,
+    entity_id: UUID,
+    db: Session = Depends(get_db),
+    scoring_model_id: Optional[UUID] = None
+):
+    try:
+        model_id = leaderboard_service.resolve_model_id(db, category_id, scoring_model_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    entry = leaderboard_service.get_entity_rank(db, model_id, entity_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Entity is not ranked in this category")
+    return entry
+
+
 @router.get("/{category_id}/goats/{goat_id}", response_model=Entity)
 def read_category_goat(
     category_id: UUID,
@@ -100,7 +149,8 @@ def submit_category_vote(
     category_id: UUID,
     vote_in: FanVoteCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user),
+    source: Tuple[Optional[str], Optional[str]] = Depends(deps.get_vote_source)
 ):
     if vote_in.category_id != category_id:
         raise HTTPException(status_code=400, detail="Category ID mismatch")
@@ -109,7 +159,33 @@ def submit_category_vote(
     if not goat or goat.category_id != category_id:
         raise HTTPException(status_code=400, detail="GOAT does not belong to this category")
         
-    return fan_voting_service.submit_vote(db, user_id=current_user.id, vote_in=vote_in)
+    ip_address, user_agent = source
+    return fan_voting_service.submit_vote(
+        db, user_id=current_user.id, vote_in=vote_in, ip_address=ip_address, user_agent=user_agent
+    )
+
+
+@router.post("/{category_id}/votes/ballot", response_model=FanBallotResult)
+def submit_category_ballot(
+    category_id: UUID,
+    ballot_in: FanBallotCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_user),
+    source: Tuple[Optional[str], Optional[str]] = Depends(deps.get_vote_source)
+):
+    """
+    Rates many GOATs of the category in one request. The ballot is applied
+    as a whole: if any rating is invalid, none are recorded.
+    """
+    ip_address, user_agent = source
+    try:
+        votes = fan_voting_service.submit_ballot(
+            db, user_id=current_user.id, category_id=category_id, ratings=ballot_in.ratings,
+            ip_address=ip_address, user_agent=user_agent,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"category_id": category_id, "votes": votes}
 
 
 @router.post("/{category_id}/debates")
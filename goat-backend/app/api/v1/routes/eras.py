@@ -1,11 +1,15 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
+from app.api.v1 import deps
 from app.core.database import get_db
-from app.schemas.era import Era, EraCreate, EraUpdate, EraFactor, EraFactorCreate
+from app.schemas.era import Era, EraCreate, EraUpdate, EraFactor, EraFactorCreate, EraAdjustRequest, EraAdjustedScoreResponse
+from app.schemas.job import JobResponse
 from app.services.era import era_service
+from app.services.jobs import job_runner
 from app.models.era import Era as EraDB, EraFactor as EraFactorDB
+from app.models.user import User
 
 router = APIRouter()
 
@@ -46,13 +50,88 @@ def create_era_factor(
     return db_obj
 
 
-@router.post("/{era_id}/recalculate", response_model=Dict[str, str])
+@router.post("/{era_id}/recalculate", response_model=Union[JobResponse, Dict[str, str]], status_code=202)
 def recalculate_era_factors(
     era_id: UUID,
-    db: Session = Depends(get_db)
+    response: Response,
+    background: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_superuser)
 ):
+    """
+    Queues the recalculation and returns the job (202), or runs it within
+    the request with ``background=false``.
+    """
+    if background:
+        if not db.get(EraDB, era_id):
+            raise HTTPException(status_code=404, detail="Era not found")
+        return job_runner.enqueue(
+            db, "era.recalculate", {"era_id": str(era_id)}, dedup_key=f"era:{era_id}",
+            created_by=current_user.id,
+        )
+
+    response.status_code = 200
+    try:
+        written = era_service.calculate_era_factors(db, era_id)
+        return {"status": "success", "message": f"{written} era factors recalculated"}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/category/{category_id}/recalculate", response_model=Union[JobResponse, Dict[str, str]], status_code=202)
+def recalculate_category_era_factors(
+    category_id: UUID,
+    response: Response,
+    background: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_superuser)
+):
+    """
+    Recalculates the factors of every era of a category in one pass. Queued
+    as a job (202) unless ``background=false``.
+    """
+    if background:
+        return job_runner.enqueue(
+            db, "era.recalculate", {"category_id": str(category_id)}, dedup_key=f"era:category:{category_id}",
+            created_by=current_user.id,
+        )
+
+    response.status_code = 200
     try:
-        era_service.calculate_era_factors(db, era_id)
-        return {"status": "success", "message": "Era factors recalculated"}
+        written = era_service.calculate_category_era_factors(db, category_id)
+        return {"status": "success", "message": f"{written} era factors recalculated"}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/adjust", response_model=List[EraAdjustedScoreResponse])
+def adjust_values(
+    adjust_in: EraAdjustRequest,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(deps.get_optional_current_user)
+):
+    """
+    Era-adjusts a batch of raw values with one factor lookup. With
+    ``persist`` the results are stored as EraAdjustedScore rows, which
+    takes an expert or superuser.
+    """
+    if adjust_in.persist:
+        if current_user is None:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        deps.get_current_expert(deps.get_current_active_user(current_user))
+    try:
+        results = era_service.adjust_values(db, adjust_in.values, persist=adjust_in.persist)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if adjust_in.persist:
+        db.commit()
+    return results
+
+
+@router.get("/adjusted/{entity_id}", response_model=List[EraAdjustedScoreResponse])
+def read_entity_adjusted_scores(
+    entity_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """The entity's latest era-tagged raw scores with their era adjustments."""
+    return era_service.adjust_entity(db, entity_id)
@@ -1,11 +1,15 @@
+from typing import Optional, Tuple, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.schemas.fan_voting import FanVote, FanVoteCreate, FanVoteAggregate
-from app.services.fan_voting import fan_voting_service
+from app.schemas.fan_voting import FanVote, FanVoteCreate, FanVoteAggregate, FanAggregateReconcileReport, FanAggregateQueueMetrics
+from app.schemas.job import JobResponse
+from app.services.fan_aggregate_deltas import parse_window
+from app.services.fan_voting import fan_voting_service, fan_aggregate_queue
 from app.services.entity import entity_service
+from app.services.jobs import job_runner
 from app.models.fan_voting import FanVoteAggregate as FanVoteAggregateDB
 
 router = APIRouter()
@@ -18,22 +22,41 @@ from app.models.user import User
 def submit_fan_vote(
     vote_in: FanVoteCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    current_user: User = Depends(deps.get_current_active_user),
+    source: Tuple[Optional[str], Optional[str]] = Depends(deps.get_vote_source)
 ):
     # Validate that the GOAT belongs to the category
     goat = entity_service.get_entity(db, entity_id=vote_in.entity_id)
     if not goat or goat.category_id != vote_in.category_id:
         raise HTTPException(status_code=400, detail="GOAT does not belong to this category")
         
-    return fan_voting_service.submit_vote(db, user_id=current_user.id, vote_in=vote_in)
+    ip_address, user_agent = source
+    return fan_voting_service.submit_vote(
+        db, user_id=current_user.id, vote_in=vote_in, ip_address=ip_address, user_agent=user_agent
+    )
+
+
+@router.get("/aggregates/queue", response_model=FanAggregateQueueMetrics)
+def get_fan_aggregate_queue_metrics(
+    current_user: User = Depends(deps.get_current_active_superuser)
+):
+    """Depth and flush lag of the asynchronous aggregate pipeline."""
+    return fan_aggregate_queue.metrics()
 
 
 @router.get("/aggregates/{entity_id}/{category_id}", response_model=FanVoteAggregate)
 def get_fan_aggregate(
     entity_id: UUID,
     category_id: UUID,
+    window: Optional[str] = Query(None, description="Trailing window such as 24h, 7d or 30d"),
+    decayed: bool = Query(False, description="Report the time-decayed score as aggregate_score"),
     db: Session = Depends(get_db)
 ):
+    """
+    The lifetime weighted fan score of a GOAT in a category, alongside its
+    time-decayed score. ``window`` adds the score and vote count of votes
+    cast within that trailing window.
+    """
     aggregate = db.execute(
         select(FanVoteAggregateDB).where(
             and_(
@@ -45,4 +68,49 @@ def get_fan_aggregate(
     
     if not aggregate:
         raise HTTPException(status_code=404, detail="Aggregate not found")
-    return aggregate
+
+    result = FanVoteAggregate.model_validate(aggregate)
+    if decayed:
+        result.aggregate_score = aggregate.decayed_score
+    if window:
+        try:
+            result.window_score, result.window_vote_count = fan_voting_service.get_windowed_aggregate(
+                db, entity_id, category_id, parse_window(window)
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        result.window = window
+    return result
+
+
+@router.post(
+    "/aggregates/reconcile",
+    response_model=Union[JobResponse, FanAggregateReconcileReport],
+    status_code=202,
+)
+def reconcile_fan_aggregates(
+    response: Response,
+    category_id: Optional[UUID] = None,
+    background: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_superuser)
+):
+    """
+    Recomputes fan vote aggregates from the votes themselves, fixing any
+    drift in the running sums. Queued as a job (202) unless
+    ``background=false``.
+    """
+    if background:
+        return job_runner.enqueue(
+            db,
+            "fan_votes.reconcile",
+            {"category_id": str(category_id) if category_id else None},
+            dedup_key=f"fan_votes.reconcile:{category_id or 'all'}",
+            created_by=current_user.id,
+        )
+
+    response.status_code = 200
+    fan_voting_service.flush_aggregate_queue()
+    report = fan_voting_service.reconcile_aggregates(db, category_id=category_id)
+    db.commit()
+    return report
@@ -1,20 +1,28 @@
-from typing import List, Dict
+from typing import List, Dict, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.api.v1 import deps
 from app.core.database import get_db
 from app.schemas.influence import (
     InfluenceSource, InfluenceSourceCreate,
     InfluenceModel, InfluenceModelCreate,
     InfluenceEvent, InfluenceEventCreate,
-    InfluenceScore
+    InfluenceScore, InfluenceBatchReport, InfluenceEventIngestReport
 )
-from app.services.influence import influence_service
+from app.schemas.job import JobResponse
+from app.services.influence import event_content_hash, influence_service
+from app.services.influence_ingest import influence_event_ingest_service, DEFAULT_CHUNK_SIZE
+from app.services.line_records import LineRecordReader, format_for_content_type, stream_line_batches
+from app.services.jobs import job_runner
 from app.models.influence import (
     InfluenceSource as InfluenceSourceDB,
     InfluenceModel as InfluenceModelDB,
     InfluenceEvent as InfluenceEventDB
 )
+from app.models.user import User
 
 router = APIRouter()
 
@@ -60,19 +68,99 @@ def create_event(
     db: Session = Depends(get_db),
     event_in: InfluenceEventCreate
 ):
-    db_obj = InfluenceEventDB(**event_in.model_dump())
+    content_hash = event_content_hash(
+        event_in.entity_id, event_in.source_id, event_in.event_type, event_in.event_date, event_in.description
+    )
+    if db.execute(select(InfluenceEventDB.id).where(InfluenceEventDB.content_hash == content_hash)).first():
+        raise HTTPException(status_code=409, detail="This influence event is already recorded")
+    db_obj = InfluenceEventDB(**event_in.model_dump(), content_hash=content_hash)
     db.add(db_obj)
+    influence_service.mark_dirty(db, [db_obj.entity_id], reason="influence_event")
     db.commit()
     db.refresh(db_obj)
     return db_obj
 
+
+@router.post("/events/bulk", response_model=InfluenceEventIngestReport)
+async def bulk_ingest_events(
+    request: Request,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=50_000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_superuser)
+):
+    """
+    Loads influence events from a streamed NDJSON (application/x-ndjson) or
+    CSV (text/csv, header row first) body in committed chunks. Events already
+    recorded, by content hash of entity, source, type, day and description,
+    are skipped and counted as duplicates. That includes soft-deleted
+    events: a deleted event stays deleted when a crawl sends it again.
+    Entities with new events are marked for
+    ``POST /influence/models/{id}/calculate?dirty_only=true``.
+    """
+    fmt = format_for_content_type(request.headers.get("content-type"))
+    if not fmt:
+        raise HTTPException(status_code=415, detail="Send application/x-ndjson or text/csv")
+
+    reader = LineRecordReader(fmt)
+    report = InfluenceEventIngestReport()
+    async for lines in stream_line_batches(request.stream(), chunk_size):
+        await run_in_threadpool(influence_event_ingest_service.ingest_rows, db, reader.read(lines), report)
+    if leftover := reader.finish():
+        await run_in_threadpool(influence_event_ingest_service.ingest_rows, db, leftover, report)
+    return report
+
 # --- Scoring ---
-@router.post("/calculate/{entity_id}/{model_id}", response_model=InfluenceScore)
+@router.post("/models/{model_id}/calculate", response_model=Union[JobResponse, InfluenceBatchReport], status_code=202)
+def calculate_model_influence(
+    model_id: UUID,
+    response: Response,
+    dirty_only: bool = False,
+    background: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_superuser)
+):
+    """
+    Scores every entity in the model's category in one pass, or with
+    ``dirty_only=true`` only those with new events. Queued as a job (202)
+    unless ``background=false``.
+    """
+    if background:
+        if not db.get(InfluenceModelDB, model_id):
+            raise HTTPException(status_code=404, detail="Influence model not found")
+        return job_runner.enqueue(
+            db, "influence.calculate_model", {"model_id": str(model_id), "dirty_only": dirty_only},
+            dedup_key=f"influence:model:{model_id}", created_by=current_user.id,
+        )
+
+    response.status_code = 200
+    try:
+        return influence_service.calculate_model_scores(db, model_id, dirty_only=dirty_only)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/calculate/{entity_id}/{model_id}", response_model=Union[JobResponse, InfluenceScore], status_code=202)
 def calculate_influence(
     entity_id: UUID,
     model_id: UUID,
-    db: Session = Depends(get_db)
+    response: Response,
+    background: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_superuser)
 ):
+    """
+    Queues the calculation and returns the job (202), or runs it within the
+    request with ``background=false``.
+    """
+    if background:
+        if not db.get(InfluenceModelDB, model_id):
+            raise HTTPException(status_code=404, detail="Influence model not found")
+        return job_runner.enqueue(
+            db, "influence.calculate",
+            {"entity_id": str(entity_id), "model_id": str(model_id)},
+            dedup_key=f"influence:{entity_id}:{model_id}", created_by=current_user.id,
+        )
+
+    response.status_code = 200
     try:
         return influence_service.calculate_influence_score(db, entity_id, model_id)
     except ValueError as e:
@@ -0,0 +1,49 @@
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.api.v1 import deps
+from app.core.database import get_db
+from app.models.user import User
+from app.schemas.job import JobResponse
+from app.services.jobs import job_runner
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[JobResponse])
+def list_jobs(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_superuser),
+    status: Optional[str] = Query(None, description="queued, running, succeeded, failed or cancelled"),
+    kind: Optional[str] = Query(None, description="e.g. scoring.run"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+):
+    return job_runner.list_jobs(db, status=status, kind=kind, skip=skip, limit=limit)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def read_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """A job's status and result, visible to whoever queued it and to superusers."""
+    job = job_runner.get(db, job_id)
+    # Someone else's job is reported as missing rather than forbidden
+    if not job or (job.created_by != current_user.id and not current_user.is_superuser):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+def cancel_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_superuser)
+):
+    try:
+        return job_runner.cancel(db, job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
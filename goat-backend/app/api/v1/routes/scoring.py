@@ -1,15 +1,22 @@
-from typing import List
+from typing import List, Optional, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.schemas.scoring import (
     ScoringModel, ScoringModelCreate, 
     ScoringComponent, ScoringComponentCreate,
     RawScoreCreate, FinalScoreResponse,
-    RankingSnapshotResponse
+    RankingSnapshotResponse, SnapshotPage, SnapshotDiff, ScoringRunSummary, RawScoreIngestReport, ScoreAllReport
 )
+from app.schemas.job import JobResponse
+from app.services.jobs import job_runner
+from app.services.ranking_snapshots import ranking_snapshot_service
+from app.services.score_all import score_all_service
 from app.services.scoring import scoring_service
+from app.services.raw_score_ingest import raw_score_ingest_service, DEFAULT_CHUNK_SIZE
+from app.services.line_records import LineRecordReader, format_for_content_type, stream_line_batches
 from app.models.scoring import ScoringModel as ScoringModelDB, ScoringComponent as ScoringComponentDB, ScoringWeight
 
 router = APIRouter()
@@ -45,7 +52,8 @@ def create_scoring_model(
         version=model_in.version,
         description=model_in.description,
         category_id=model_in.category_id,
-        is_active=model_in.is_active
+        is_active=model_in.is_active,
+        fan_score_mode=model_in.fan_score_mode
     )
     db.add(db_model)
     db.flush()
@@ -70,32 +78,184 @@ def submit_raw_score(
     db: Session = Depends(get_db),
     score_in: RawScoreCreate
 ):
-    from app.models.scoring import RawScore
-    db_obj = RawScore(**score_in.model_dump())
-    db.add(db_obj)
-    db.commit()
+    try:
+        scoring_service.submit_raw_score(db, score_in)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     return {"message": "Raw score submitted successfully"}
 
 
 from app.api.v1 import deps
 from app.models.user import User
 
-@router.post("/run/{category_id}", response_model=List[FinalScoreResponse])
+@router.post("/raw-scores/bulk", response_model=RawScoreIngestReport)
+async def bulk_ingest_raw_scores(
+    request: Request,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=50_000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_superuser)
+):
+    """
+    Loads raw scores from a streamed NDJSON (application/x-ndjson) or CSV
+    (text/csv, header row first) body. Rows are validated and committed in
+    chunks; invalid rows are reported by line number and skipped.
+    """
+    fmt = format_for_content_type(request.headers.get("content-type"))
+    if not fmt:
+        raise HTTPException(status_code=415, detail="Send application/x-ndjson or text/csv")
+
+    reader = LineRecordReader(fmt)
+    report = RawScoreIngestReport()
+    async for lines in stream_line_batches(request.stream(), chunk_size):
+        await run_in_threadpool(raw_score_ingest_service.ingest_rows, db, reader.read(lines), report)
+    if leftover := reader.finish():
+        await run_in_threadpool(raw_score_ingest_service.ingest_rows, db, leftover, report)
+    return report
+
+
+@router.post("/run-all", response_model=Union[JobResponse, ScoreAllReport], status_code=202)
+def run_scoring_all(
+    response: Response,
+    max_workers: Optional[int] = Query(None, ge=1),
+    background: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_superuser)
+):
+    """
+    Rescores every category with an active scoring model across a process
+    pool and reports timings and entity counts per category. Queued as a
+    job (202) unless ``background=false``.
+    """
+    if background:
+        return job_runner.enqueue(
+            db, "scoring.run_all", {"max_workers": max_workers},
+            dedup_key="scoring:all", created_by=current_user.id,
+        )
+
+    response.status_code = 200
+    return score_all_service.score_all(db, max_workers=max_workers)
+
+
+@router.post(
+    "/run/{category_id}",
+    response_model=Union[JobResponse, List[FinalScoreResponse], ScoringRunSummary],
+    status_code=202,
+)
 def run_scoring(
     category_id: UUID,
+    response: Response,
+    summary: bool = False,
+    background: bool = True,
     db: Session = Depends(get_db),
     current_user: User = Depends(deps.get_current_active_superuser)
 ):
+    """
+    Queues a scoring run for the category and returns the job (202); poll
+    it at ``GET /jobs/{id}``. Only one run per category is queued or
+    running at a time. With ``background=false`` the category is scored
+    within the request; ``summary=true`` then returns run statistics
+    instead of every FinalScore.
+    """
+    if background:
+        return job_runner.enqueue(
+            db, "scoring.run", {"category_id": str(category_id)},
+            dedup_key=f"scoring:{category_id}", created_by=current_user.id,
+        )
+
+    response.status_code = 200
     try:
+        if summary:
+            return scoring_service.score_category(db, category_id=category_id)
         return scoring_service.run_scoring_for_category(db, category_id=category_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post(
+    "/run/{category_id}/incremental",
+    response_model=Union[JobResponse, ScoringRunSummary],
+    status_code=202,
+)
+def run_incremental_scoring(
+    category_id: UUID,
+    response: Response,
+    background: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_superuser)
+):
+    """
+    Re-scores only entities whose inputs changed since the last run. Shares
+    the category's scoring job slot with full runs.
+    """
+    if background:
+        return job_runner.enqueue(
+            db, "scoring.incremental", {"category_id": str(category_id)},
+            dedup_key=f"scoring:{category_id}", created_by=current_user.id,
+        )
+
+    response.status_code = 200
+    try:
+        return scoring_service.score_dirty(db, category_id=category_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/snapshots/{category_id}", response_model=RankingSnapshotResponse)
 def create_snapshot(
     category_id: UUID,
     label: str,
+    scoring_model_id: Optional[UUID] = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        return scoring_service.create_snapshot(
+            db, category_id=category_id, label=label, scoring_model_id=scoring_model_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/snapshots/{snapshot_id}/entries", response_model=SnapshotPage)
+def read_snapshot_entries(
+    snapshot_id: UUID,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """
+    A page of a snapshot's ranking, by rank. Only the requested entries are
+    read from storage.
+    """
+    try:
+        snapshot = ranking_snapshot_service.get(db, snapshot_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {
+        "snapshot_id": snapshot.id,
+        "total": snapshot.entry_count,
+        "offset": offset,
+        "entries": ranking_snapshot_service.get_entries(db, snapshot, offset=offset, limit=limit),
+    }
+
+
+@router.get("/snapshots/{snapshot_id}/diff", response_model=SnapshotDiff)
+def diff_snapshot(
+    snapshot_id: UUID,
+    against: Optional[UUID] = Query(None, description="Later snapshot; omit to compare with the live leaderboard"),
+    limit: Optional[int] = Query(None, ge=1, description="Return only the largest N movers"),
     db: Session = Depends(get_db)
 ):
-    return scoring_service.create_snapshot(db, category_id=category_id, label=label)
+    """
+    Who moved up or down between two snapshots of a category, or since a
+    snapshot was taken: rank and score changes, entrants and exits.
+    """
+    for requested_id in (snapshot_id, against):
+        if requested_id is not None and not ranking_snapshot_service.exists(db, requested_id):
+            raise HTTPException(status_code=404, detail="Snapshot not found")
+    try:
+        diff = ranking_snapshot_service.diff(db, snapshot_id, against)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if limit is not None:
+        diff = diff.model_copy(update={"movers": diff.movers[:limit]})
+    return diff
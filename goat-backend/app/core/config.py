@@ -11,6 +11,24 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 5
     DATABASE_MAX_OVERFLOW: int = 10
+
+    # Background jobs (in-process runner; 0 workers disables it)
+    JOB_WORKERS: int = 2
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_STALE_AFTER_SECONDS: int = 600
+    # Running jobs refresh their heartbeat this often; keep well under the above
+    JOB_HEARTBEAT_INTERVAL_SECONDS: float = 30.0
+    # Fan vote aggregates are updated by a flusher this often; 0 updates them
+    # synchronously within each vote
+    FAN_AGGREGATE_FLUSH_INTERVAL_SECONDS: float = 1.0
+    # Half-life of a vote in the decayed fan score; changing it needs a reconcile
+    FAN_DECAY_HALF_LIFE_DAYS: float = 30.0
+    # Detected vote anomalies are written this often; 0 writes them with the vote
+    VOTE_ANOMALY_FLUSH_INTERVAL_SECONDS: float = 5.0
+    # How long a user's trust score is served from cache; 0 disables caching
+    TRUST_SCORE_CACHE_TTL_SECONDS: int = 300
+    # Processes used to score all categories; each holds one DB connection
+    SCORE_ALL_MAX_WORKERS: int = 4
     
     # Security
     SECRET_KEY: str
@@ -19,13 +37,15 @@ class Settings(BaseSettings):
     
     # CORS
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
+    # Reverse proxies (addresses or CIDR ranges) whose X-Forwarded-For is believed
+    TRUSTED_PROXIES: List[str] = []
 
     # Environment
     ENVIRONMENT: str = "production"
     DEBUG: bool = False
     LOG_LEVEL: str = "INFO"
 
-    @field_validator("BACKEND_CORS_ORIGINS", mode="before")
+    @field_validator("BACKEND_CORS_ORIGINS", "TRUSTED_PROXIES", mode="before")
     @classmethod
     def assemble_cors_origins(cls, v: str | List[str]) -> List[str] | str:
         if isinstance(v, str) and not v.startswith("["):
@@ -0,0 +1,32 @@
+"""
+Structured FinalScore explanations. Scoring stores each explanation as a
+list of ``[code, *params]`` entries; text is rendered only when an API
+response includes it. Kept in core so that scoring (writing codes) and the
+response schemas (rendering them) share it without depending on each other.
+"""
+from typing import Any, List, Sequence
+
+WEIGHT_CAPPED = "cap"        # [code, component name]
+ERA_MULTIPLIER = "era_mult"  # [code, component name, multiplier]
+ERA_DOMINANCE = "era_dom"    # [code, component name, dominance factor]
+EXPERT_VOTES = "expert"      # [code, vote count]
+FAN_VOTES = "fan"            # [code, vote count]
+AI_INFLUENCE = "ai"          # [code, influence score]
+
+_TEMPLATES = {
+    WEIGHT_CAPPED: "{0}: Popularity weight capped at 10% and renormalized",
+    ERA_MULTIPLIER: "{0}: Era multiplier {1} applied",
+    ERA_DOMINANCE: "{0}: Era dominance factor {1:.2f} applied",
+    EXPERT_VOTES: "Expert Influence: {0} votes aggregated (20% weight)",
+    FAN_VOTES: "Fan Sentiment: {0} votes aggregated (10% weight)",
+    AI_INFLUENCE: "AI Influence: {0:.1f} (15% weight)",
+}
+
+ExplanationCodes = List[List[Any]]
+
+
+def render_explanation(codes: Sequence[Sequence[Any]]) -> str:
+    """Renders explanation codes to the pipe-separated text shown to users."""
+    return " | ".join(
+        _TEMPLATES[code].format(*params) for code, *params in codes if code in _TEMPLATES
+    )
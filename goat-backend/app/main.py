@@ -7,6 +7,9 @@ from fastapi.middleware.gzip import GZipMiddleware
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.api.v1.router import api_router
+from app.services.fan_voting import fan_aggregate_queue
+from app.services.jobs import job_runner
+from app.services.vote_anomalies import vote_anomaly_detector
 from app.api.v1.middleware.security import SecurityHeadersMiddleware, RequestIdMiddleware, limiter, _rate_limit_exceeded_handler, RateLimitExceeded
 from app.api.v1.middleware.access_log import AccessLogMiddleware
 import logging
@@ -80,10 +83,16 @@ async def general_exception_handler(request: Request, exc: Exception):
 async def startup_event():
     logger.info(f"Starting {settings.PROJECT_NAME} in {settings.ENVIRONMENT} mode")
     logger.info(f"API documentation: {'Enabled' if settings.DEBUG else 'Disabled'}")
+    job_runner.start()
+    fan_aggregate_queue.start()
+    vote_anomaly_detector.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info(f"Shutting down {settings.PROJECT_NAME}")
+    job_runner.shutdown()
+    fan_aggregate_queue.shutdown()
+    vote_anomaly_detector.shutdown()
 
 # Set all CORS enabled origins
 # Managed by explicit CORSMiddleware above
@@ -10,8 +10,12 @@ from app.models.scoring import (
     ScoringComponent, 
     ScoringWeight, 
     RawScore, 
+    LatestRawScore,
     FinalScore, 
-    RankingSnapshot
+    RankingSnapshot,
+    LeaderboardEntry,
+    DirtyScoringEntity,
+    ComponentStatistic
 )
 
 from app.models.expert import (
@@ -30,6 +34,7 @@ from app.models.fan_voting import (
     FanVote,
     FanVoteVersion,
     FanVoteAggregate,
+    FanVoteBucket,
     VoteAnomaly
 )
 
@@ -37,6 +42,7 @@ from app.models.era import (
     Era,
     EraModel,
     EraFactor,
+    EraComponentSketch,
     EraAdjustedScore,
     EraAuditLog
 )
@@ -45,8 +51,10 @@ from app.models.influence import (
     InfluenceSource,
     InfluenceEvent,
     InfluenceModel,
-    InfluenceScore
+    InfluenceScore,
+    DirtyInfluenceEntity
 )
+from app.models.job import BackgroundJob
 from app.models.user import User
 from app.models.audit_log import AuditLog
 from app.models.debate import Debate
@@ -63,8 +71,12 @@ __all__ = [
     "ScoringComponent",
     "ScoringWeight",
     "RawScore",
+    "LatestRawScore",
     "FinalScore",
     "RankingSnapshot",
+    "LeaderboardEntry",
+    "DirtyScoringEntity",
+    "ComponentStatistic",
     "Expert",
     "ExpertDomain",
     "ExpertReputationEvent",
@@ -77,16 +89,20 @@ __all__ = [
     "FanVote",
     "FanVoteVersion",
     "FanVoteAggregate",
+    "FanVoteBucket",
     "VoteAnomaly",
     "Era",
     "EraModel",
     "EraFactor",
+    "EraComponentSketch",
     "EraAdjustedScore",
     "EraAuditLog",
     "InfluenceSource",
     "InfluenceEvent",
     "InfluenceModel",
     "InfluenceScore",
+    "DirtyInfluenceEntity",
+    "BackgroundJob",
     "User",
     "AuditLog",
     "Debate",
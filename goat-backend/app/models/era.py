@@ -46,6 +46,27 @@ class EraFactor(Base, UUIDMixin, TimestampMixin):
         UniqueConstraint('era_id', 'component_id', name='_era_component_uc'),
     )
 
+class EraComponentSketch(Base, UUIDMixin, TimestampMixin):
+    """
+    Streaming statistics of every raw score recorded for one (era,
+    component): Welford moments plus a mergeable KLL quantile sketch
+    (see app.services.era_stats).
+    """
+    __tablename__ = "era_component_sketches"
+
+    era_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("eras.id", ondelete="CASCADE"), nullable=False)
+    component_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("scoring_components.id", ondelete="CASCADE"), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    mean: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    m2: Mapped[float] = mapped_column(Float, default=0.0, nullable=False) # Welford sum of squared deviations
+    min_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    max_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    quantile_sketch: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+
+    __table_args__ = (
+        UniqueConstraint('era_id', 'component_id', name='_era_component_sketch_uc'),
+    )
+
 class EraAdjustedScore(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "era_adjusted_scores"
 
@@ -57,6 +78,10 @@ class EraAdjustedScore(Base, UUIDMixin, TimestampMixin):
     z_score: Mapped[float] = mapped_column(Float, nullable=True)
     explanation: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
+    __table_args__ = (
+        UniqueConstraint('entity_id', 'era_id', 'component_id', name='_entity_era_component_uc'),
+    )
+
 class EraAuditLog(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "era_audit_logs"
 
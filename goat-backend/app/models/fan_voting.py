@@ -9,7 +9,7 @@ from app.models.base import UUIDMixin, TimestampMixin, SoftDeleteMixin
 class UserTrustScore(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "user_trust_scores"
 
-    user_id: Mapped[uuid.UUID] = mapped_column(nullable=False, index=True) # Assuming external user system
+    user_id: Mapped[uuid.UUID] = mapped_column(nullable=False, unique=True, index=True) # Assuming external user system
     trust_score: Mapped[float] = mapped_column(Float, default=1.0)
     account_age_days: Mapped[int] = mapped_column(Integer, default=0)
     engagement_level: Mapped[int] = mapped_column(Integer, default=0)
@@ -52,12 +52,39 @@ class FanVoteAggregate(Base, UUIDMixin, TimestampMixin):
     category_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
     aggregate_score: Mapped[float] = mapped_column(Float, nullable=False) # Normalized 0-100
     vote_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Running sums adjusted by each vote's delta; aggregate_score is derived
+    # from them. A reconcile (run on demand) recomputes both from fan_votes.
+    weighted_rating_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    weight_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    # Exponentially decayed sums, each vote scaled by exp(λ·(cast at - landmark))
+    # (see app.services.fan_aggregate_deltas); their ratio is the decayed mean.
+    decayed_weighted_rating_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    decayed_weight_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    decayed_score: Mapped[float] = mapped_column(Float, default=0.0, nullable=False) # Normalized 0-100
     last_updated: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
 
     __table_args__ = (
         UniqueConstraint('entity_id', 'category_id', name='_entity_category_aggregate_uc'),
     )
 
+class FanVoteBucket(Base, UUIDMixin, TimestampMixin):
+    """Hourly or daily sums of the votes cast on an entity, for windowed aggregates."""
+    __tablename__ = "fan_vote_buckets"
+
+    entity_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("entities.id", ondelete="CASCADE"), nullable=False)
+    category_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
+    granularity: Mapped[str] = mapped_column(String(10), nullable=False) # hour, day
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    weighted_rating_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    weight_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    vote_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            'entity_id', 'category_id', 'granularity', 'bucket_start', name='uq_fan_vote_buckets_entity_bucket'
+        ),
+    )
+
 class VoteAnomaly(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "vote_anomalies"
 
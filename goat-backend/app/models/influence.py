@@ -40,6 +40,8 @@ class InfluenceEvent(Base, UUIDMixin, TimestampMixin, SoftDeleteMixin):
     event_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     weight: Mapped[float] = mapped_column(Float, default=1.0)
     metadata_json: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict) # evidence snippet, url, etc.
+    # sha256 of (entity, source, type, date, description); see event_content_hash
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, unique=True, index=True)
 
     entity: Mapped["Entity"] = relationship("Entity")
     source: Mapped["InfluenceSource"] = relationship("InfluenceSource", back_populates="events")
@@ -67,3 +69,17 @@ class InfluenceScore(Base, UUIDMixin, TimestampMixin):
     __table_args__ = (
         UniqueConstraint('entity_id', 'influence_model_id', name='_entity_model_uc'),
     )
+
+class DirtyInfluenceEntity(Base, UUIDMixin, TimestampMixin):
+    """(entity, influence model) pairs whose events changed since they were last scored."""
+    __tablename__ = "influence_dirty_entities"
+
+    entity_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("entities.id", ondelete="CASCADE"), nullable=False)
+    influence_model_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("influence_models.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    reason: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('entity_id', 'influence_model_id', name='uq_influence_dirty_entity_model'),
+    )
@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import String, Text, Float, JSON, Integer, Boolean, DateTime, ForeignKey, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+from app.models.base import UUIDMixin, TimestampMixin
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+ACTIVE_JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+
+class BackgroundJob(Base, UUIDMixin, TimestampMixin):
+    """
+    A unit of work run by the in-process job runner (app.services.jobs).
+    """
+
+    __tablename__ = "background_jobs"
+
+    kind: Mapped[str] = mapped_column(String(50), nullable=False, index=True)  # scoring.run, era.recalculate, ...
+    status: Mapped[str] = mapped_column(String(20), default=JOB_QUEUED, nullable=False, index=True)
+    params: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False)
+    # Jobs sharing a key never run concurrently, e.g. one scoring run per category
+    dedup_key: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    result: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    progress: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)  # 0 to 1
+    progress_message: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3, nullable=False)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    created_by: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "uq_background_jobs_active_dedup_key",
+            "dedup_key",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+    )
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from sqlalchemy import String, Text, ForeignKey, Float, JSON, Integer, Boolean, DateTime, func, UniqueConstraint
+from sqlalchemy import String, Text, ForeignKey, Float, JSON, Integer, Boolean, DateTime, LargeBinary, func, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 from app.models.base import UUIDMixin, TimestampMixin, SoftDeleteMixin
@@ -15,6 +15,11 @@ class ScoringModel(Base, UUIDMixin, TimestampMixin, SoftDeleteMixin):
     version: Mapped[str] = mapped_column(String(20), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Component stats and era means used by the last full run, so incremental
+    # runs can tell whether normalization has shifted since.
+    normalization_snapshot: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    # Fan blend input: "lifetime" weighted mean or the time-"decayed" one
+    fan_score_mode: Mapped[str] = mapped_column(String(20), default="lifetime", server_default="lifetime")
     
     category_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("categories.id", ondelete="CASCADE"), nullable=False
@@ -78,6 +83,33 @@ class RawScore(Base, UUIDMixin, TimestampMixin):
     )  # For era normalization
 
 
+class LatestRawScore(Base, UUIDMixin, TimestampMixin):
+    """
+    Current value per (entity, component), maintained as raw scores are
+    submitted. ``raw_scores`` keeps the full history.
+    """
+
+    __tablename__ = "latest_raw_scores"
+
+    entity_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("entities.id", ondelete="CASCADE"), nullable=False
+    )
+    component_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("scoring_components.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    raw_score_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("raw_scores.id", ondelete="CASCADE"), nullable=False
+    )
+    value: Mapped[float] = mapped_column(Float, nullable=False)
+    era_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("eras.id", ondelete="SET NULL"), nullable=True
+    )
+
+    __table_args__ = (
+        UniqueConstraint("entity_id", "component_id", name="uq_latest_raw_scores_entity_component"),
+    )
+
+
 class FinalScore(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "final_scores"
 
@@ -89,7 +121,10 @@ class FinalScore(Base, UUIDMixin, TimestampMixin):
     )
     score: Mapped[float] = mapped_column(Float, nullable=False)  # 0 to 100
     breakdown: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False)
+    # Rendered text, only set on rows scored before explanation_codes existed
     explanation: Mapped[str] = mapped_column(Text, nullable=True)
+    # [[code, *params], ...], see app.core.score_explanations
+    explanation_codes: Mapped[Optional[List[Any]]] = mapped_column(JSON, nullable=True)
 
     scoring_model: Mapped["ScoringModel"] = relationship("ScoringModel", back_populates="final_scores")
     entity: Mapped["Entity"] = relationship("Entity")
@@ -99,6 +134,93 @@ class FinalScore(Base, UUIDMixin, TimestampMixin):
     )
 
 
+class LeaderboardEntry(Base, UUIDMixin, TimestampMixin):
+    """
+    Ranked read model per (category, scoring model), rebuilt at the end of
+    each scoring run. Entity fields are copied so pages are served from the
+    rank index alone.
+    """
+
+    __tablename__ = "leaderboard_entries"
+
+    category_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("categories.id", ondelete="CASCADE"), nullable=False
+    )
+    scoring_model_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("scoring_models.id", ondelete="CASCADE"), nullable=False
+    )
+    entity_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("entities.id", ondelete="CASCADE"), nullable=False
+    )
+    rank: Mapped[int] = mapped_column(Integer, nullable=False)  # 1-based, unique per model
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    entity_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    entity_slug: Mapped[str] = mapped_column(String(255), nullable=False)
+    entity_image_url: Mapped[str] = mapped_column(String(512), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_leaderboard_entries_category_rank",
+            "category_id", "scoring_model_id", "rank",
+            unique=True,
+            postgresql_include=["entity_id", "score", "entity_name", "entity_slug", "entity_image_url"],
+        ),
+        UniqueConstraint("scoring_model_id", "entity_id", name="uq_leaderboard_entries_model_entity"),
+    )
+
+
+class ComponentStatistic(Base, UUIDMixin, TimestampMixin):
+    """
+    Running moments of the latest raw score per entity, for one
+    (category, component, era). ``era_id`` is NULL for values without an era.
+    """
+
+    __tablename__ = "component_statistics"
+
+    category_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("categories.id", ondelete="CASCADE"), nullable=False
+    )
+    component_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("scoring_components.id", ondelete="CASCADE"), nullable=False
+    )
+    era_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("eras.id", ondelete="CASCADE"), nullable=True
+    )
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    mean: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    m2: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)  # Welford sum of squared deviations
+    min_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    max_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Set when the current min or max was removed; recomputed on next read
+    min_max_stale: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "category_id", "component_id", "era_id",
+            name="uq_component_statistics_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+
+class DirtyScoringEntity(Base, UUIDMixin, TimestampMixin):
+    """(entity, scoring model) pairs whose inputs changed since they were last scored."""
+
+    __tablename__ = "scoring_dirty_entities"
+
+    entity_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("entities.id", ondelete="CASCADE"), nullable=False
+    )
+    scoring_model_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("scoring_models.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    reason: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)  # raw_score, expert_vote, ...
+
+    __table_args__ = (
+        UniqueConstraint("entity_id", "scoring_model_id", name="uq_scoring_dirty_entity_model"),
+    )
+
+
 class RankingSnapshot(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "ranking_snapshots"
 
@@ -108,5 +230,17 @@ class RankingSnapshot(Base, UUIDMixin, TimestampMixin):
     scoring_model_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("scoring_models.id", ondelete="CASCADE"), nullable=False
     )
-    snapshot_data: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False)
     label: Mapped[str] = mapped_column(String(100), nullable=False)  # e.g. "Year End 2025"
+    # Legacy format: the whole ranking as one JSON list. New snapshots use the
+    # packed columns below (see app.services.ranking_snapshots).
+    snapshot_data: Mapped[Optional[List[Dict[str, Any]]]] = mapped_column(JSON, nullable=True, deferred=True)
+    entry_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Packed little-endian arrays in rank order: 16-byte entity ids, float64
+    # scores, uint32 offsets into the UTF-8 names blob, and an
+    # entry_count x len(breakdown_keys) float64 matrix (NaN = key absent).
+    entity_ids: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True, deferred=True)
+    scores: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True, deferred=True)
+    name_offsets: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True, deferred=True)
+    names: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True, deferred=True)
+    breakdown_keys: Mapped[Optional[List[str]]] = mapped_column(JSON, nullable=True)
+    breakdown_values: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True, deferred=True)
@@ -53,3 +53,13 @@ class EraAdjustedScoreResponse(EraBase):
     adjusted_value: float
     z_score: Optional[float]
     explanation: Optional[str]
+
+class EraValue(EraBase):
+    entity_id: UUID
+    era_id: UUID
+    component_id: UUID
+    raw_value: float
+
+class EraAdjustRequest(EraBase):
+    values: List[EraValue] = Field(..., min_length=1, max_length=10_000)
+    persist: bool = False  # also store the results as EraAdjustedScore rows
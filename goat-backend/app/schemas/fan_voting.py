@@ -12,6 +12,14 @@ class FanVoteCreate(FanVoteBase):
     rating: float = Field(..., ge=1.0, le=10.0)
     reason: Optional[str] = None
 
+class BallotRating(FanVoteBase):
+    entity_id: UUID
+    rating: float = Field(..., ge=1.0, le=10.0)
+    reason: Optional[str] = None
+
+class FanBallotCreate(FanVoteBase):
+    ratings: List[BallotRating] = Field(..., min_length=1, max_length=100)
+
 class FanVoteUpdate(FanVoteBase):
     rating: float = Field(..., ge=1.0, le=10.0)
     reason: Optional[str] = None
@@ -26,12 +34,39 @@ class FanVote(FanVoteBase):
     created_at: datetime
     updated_at: datetime
 
+class FanBallotResult(FanVoteBase):
+    category_id: UUID
+    votes: List[FanVote]
+
 class FanVoteAggregate(FanVoteBase):
     entity_id: UUID
     category_id: UUID
     aggregate_score: float
+    decayed_score: float = 0.0
     vote_count: int
     last_updated: datetime
+    # Set when a window is requested: the weighted mean and votes cast within it
+    window: Optional[str] = None
+    window_score: Optional[float] = None
+    window_vote_count: Optional[int] = None
+
+class FanAggregateReconcileReport(FanVoteBase):
+    checked: int  # (entity, category) pairs with votes
+    corrected: int  # aggregates rewritten because their running sums drifted
+    removed: int  # aggregates left without any votes
+    buckets: int = 0  # hourly and daily buckets rebuilt within retention
+
+class FanAggregateQueueMetrics(FanVoteBase):
+    running: bool
+    queue_depth: int  # (entity, category) aggregates waiting for a flush
+    pending_votes: int
+    oldest_pending_age_seconds: float
+    last_flush_lag_seconds: Optional[float] = None  # oldest vote's wait in the last flush
+    seconds_since_last_flush: Optional[float] = None
+    flushes: int
+    failed_flushes: int
+    votes_applied: int
+    votes_dropped: int  # in batches given up on after repeated failed flushes
 
 class UserTrustScore(FanVoteBase):
     user_id: UUID
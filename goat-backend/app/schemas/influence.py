@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from uuid import UUID
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
 
 # --- Influence Source ---
 class InfluenceSourceBase(BaseModel):
@@ -81,3 +81,35 @@ class InfluenceScore(InfluenceScoreBase):
     confidence_score: float
     breakdown: Dict[str, Any]
     explanation: Optional[str]
+
+class InfluenceBatchReport(BaseModel):
+    influence_model_id: UUID
+    category_id: UUID
+    entities_scored: int
+    entities_changed: int  # scores written; unchanged ones are left alone
+    entities_without_events: int
+    duration_ms: Optional[float] = None
+
+# --- Bulk event ingestion ---
+class InfluenceEventIngestError(BaseModel):
+    line: int
+    error: str
+
+class InfluenceEventBatchStats(BaseModel):
+    batch: int
+    received: int
+    inserted: int
+    duplicates: int  # already stored, or repeated within the batch
+    failed: int
+    duration_ms: float
+
+class InfluenceEventIngestReport(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    entities_marked: int = 0  # entities with new events, marked for influence re-scoring
+    batches: List[InfluenceEventBatchStats] = []
+    errors: List[InfluenceEventIngestError] = []
+    errors_truncated: bool = False
+    _marked: set = PrivateAttr(default_factory=set)
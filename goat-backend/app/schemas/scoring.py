@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from uuid import UUID
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, computed_field
+from app.core.score_explanations import render_explanation
 
 
 class ScoringBase(BaseModel):
@@ -46,6 +47,7 @@ class ScoringModelBase(ScoringBase):
     description: Optional[str] = None
     category_id: UUID
     is_active: bool = True
+    fan_score_mode: Literal["lifetime", "decayed"] = "lifetime"
 
 
 class ScoringModelCreate(ScoringModelBase):
@@ -65,17 +67,121 @@ class RawScoreCreate(ScoringBase):
     era_id: Optional[UUID] = None
 
 
+class RawScoreIngestError(ScoringBase):
+    line: int
+    error: str
+
+
+class RawScoreIngestReport(ScoringBase):
+    received: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[RawScoreIngestError] = []
+    errors_truncated: bool = False
+
+
 class FinalScoreResponse(ScoringBase):
     entity_id: UUID
     scoring_model_id: UUID
     score: float
     breakdown: Dict[str, float]
-    explanation: Optional[str] = None
+    explanation_codes: Optional[List[List[Any]]] = Field(None, exclude=True)
+    legacy_explanation: Optional[str] = Field(None, validation_alias="explanation", exclude=True)
+
+    @computed_field
+    @property
+    def explanation(self) -> Optional[str]:
+        # Rendered at serialization time, so only responses that carry it pay for it
+        if self.explanation_codes is not None:
+            return render_explanation(self.explanation_codes)
+        return self.legacy_explanation
+
+
+class ScoringRunSummary(ScoringBase):
+    category_id: UUID
+    scoring_model_id: Optional[UUID] = None
+    mode: str = "full"  # full, incremental
+    entities_scored: int
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    mean_score: Optional[float] = None
+    duration_ms: Optional[float] = None
+
+
+class CategoryScoringResult(ScoringBase):
+    category_id: UUID
+    status: str  # succeeded, failed
+    entities_scored: int = 0
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ScoreAllReport(ScoringBase):
+    workers: int
+    categories: List[CategoryScoringResult] = []
+    succeeded: int = 0
+    failed: int = 0
+    entities_scored: int = 0
+    duration_ms: Optional[float] = None
+
+
+class LeaderboardEntryResponse(ScoringBase):
+    rank: int
+    entity_id: UUID
+    score: float
+    entity_name: str
+    entity_slug: str
+    entity_image_url: str
+
+
+class LeaderboardPage(ScoringBase):
+    category_id: UUID
+    scoring_model_id: UUID
+    total: int
+    entries: List[LeaderboardEntryResponse]
+    next_after_rank: Optional[int] = None  # pass as after_rank for the next page
 
 
 class RankingSnapshotResponse(ScoringBase):
     id: UUID
     category_id: UUID
+    scoring_model_id: UUID
     label: str
-    snapshot_data: List[Dict[str, Any]]
+    entry_count: int
     created_at: datetime
+
+
+class SnapshotEntry(ScoringBase):
+    rank: int
+    entity_id: Optional[UUID] = None  # not recorded by legacy snapshots
+    entity_name: str
+    score: float
+    breakdown: Dict[str, Any]
+
+
+class SnapshotPage(ScoringBase):
+    snapshot_id: UUID
+    total: int
+    offset: int
+    entries: List[SnapshotEntry]
+
+
+class SnapshotDiffEntry(ScoringBase):
+    entity_id: UUID
+    entity_name: str
+    old_rank: Optional[int] = None  # None for entrants
+    new_rank: Optional[int] = None  # None for exits
+    rank_change: Optional[int] = None  # positive = moved up
+    old_score: Optional[float] = None
+    new_score: Optional[float] = None
+    score_change: Optional[float] = None
+
+
+class SnapshotDiff(ScoringBase):
+    from_snapshot_id: UUID
+    to_snapshot_id: Optional[UUID] = None  # None = compared with the live leaderboard
+    category_id: UUID
+    movers: List[SnapshotDiffEntry]  # largest rank change first
+    entrants: List[SnapshotDiffEntry]
+    exits: List[SnapshotDiffEntry]
+    unchanged_count: int
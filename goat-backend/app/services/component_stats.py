@@ -0,0 +1,280 @@
+import math
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+from sqlalchemy import select, func, delete
+from sqlalchemy.orm import Session
+from app.models.entity import Entity
+from app.models.scoring import ComponentStatistic, LatestRawScore
+from app.repositories.bulk import dialect_insert
+
+StatsKey = Tuple[UUID, UUID, Optional[UUID]]  # (category_id, component_id, era_id)
+
+
+def welford_add(stat: ComponentStatistic, value: float) -> None:
+    stat.count += 1
+    delta = value - stat.mean
+    stat.mean += delta / stat.count
+    stat.m2 += delta * (value - stat.mean)
+    if not stat.min_max_stale:
+        stat.min_value = value if stat.min_value is None else min(stat.min_value, value)
+        stat.max_value = value if stat.max_value is None else max(stat.max_value, value)
+
+
+def welford_remove(stat: ComponentStatistic, value: float) -> None:
+    if stat.count <= 1:
+        stat.count, stat.mean, stat.m2 = 0, 0.0, 0.0
+        stat.min_value = stat.max_value = None
+        stat.min_max_stale = False
+        return
+
+    old_mean = stat.mean
+    stat.count -= 1
+    stat.mean = (old_mean * (stat.count + 1) - value) / stat.count
+    stat.m2 = max(0.0, stat.m2 - (value - old_mean) * (value - stat.mean))
+    # Removing an extreme leaves no way to know the runner-up without a scan
+    if stat.min_value is None or value <= stat.min_value or value >= stat.max_value:
+        stat.min_max_stale = True
+
+
+def merge_moments(stats: Iterable[ComponentStatistic]) -> Tuple[int, float, float]:
+    """Combines (count, mean, m2) across partitions (Chan et al.)."""
+    count, mean, m2 = 0, 0.0, 0.0
+    for stat in stats:
+        if not stat.count:
+            continue
+        total = count + stat.count
+        delta = stat.mean - mean
+        mean += delta * stat.count / total
+        m2 += stat.m2 + delta * delta * count * stat.count / total
+        count = total
+    return count, mean, m2
+
+
+class ComponentStatsService:
+    """
+    Materialized normalization statistics over the latest raw score of each
+    entity, kept per (category, component, era) and updated as raw scores
+    arrive, so scoring runs don't aggregate ``raw_scores`` themselves.
+    """
+
+    def _latest_values_query(self, category_id: Optional[UUID] = None):
+        latest = (
+            select(
+                Entity.category_id.label("category_id"),
+                LatestRawScore.component_id.label("component_id"),
+                LatestRawScore.era_id.label("era_id"),
+                LatestRawScore.value.label("value"),
+            )
+            .join(Entity, LatestRawScore.entity_id == Entity.id)
+        )
+        if category_id:
+            latest = latest.where(Entity.category_id == category_id)
+        return latest.subquery()
+
+    def _locked_stats(self, db: Session, keys: Set[StatsKey]) -> Dict[StatsKey, ComponentStatistic]:
+        # Every era's row of the (category, component) pairs, re-read and locked
+        stats = db.execute(
+            select(ComponentStatistic)
+            .where(
+                ComponentStatistic.category_id.in_({key[0] for key in keys}),
+                ComponentStatistic.component_id.in_({key[1] for key in keys}),
+            )
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        ).scalars().all()
+        return {(s.category_id, s.component_id, s.era_id): s for s in stats}
+
+    def _load_for_update(self, db: Session, keys: Iterable[StatsKey]) -> Dict[StatsKey, ComponentStatistic]:
+        """
+        The statistics rows of ``keys``, locked. Missing rows are created
+        with INSERT ... ON CONFLICT DO NOTHING and then locked, so concurrent
+        first writers share one row instead of failing on the unique key.
+        """
+        keys = set(keys)
+        loaded = self._locked_stats(db, keys)
+        missing = keys - loaded.keys()
+        if missing:
+            db.execute(
+                dialect_insert(db)(ComponentStatistic.__table__)
+                .values([
+                    {
+                        "id": uuid.uuid4(),
+                        "category_id": category_id,
+                        "component_id": component_id,
+                        "era_id": era_id,
+                        "count": 0,
+                        "mean": 0.0,
+                        "m2": 0.0,
+                        "min_max_stale": False,
+                    }
+                    for category_id, component_id, era_id in missing
+                ])
+                .on_conflict_do_nothing()
+            )
+            loaded = self._locked_stats(db, keys)
+        return loaded
+
+    def record_raw_score(
+        self,
+        db: Session,
+        entity_id: UUID,
+        component_id: UUID,
+        value: float,
+        era_id: Optional[UUID] = None,
+        category_id: Optional[UUID] = None,
+    ) -> None:
+        """
+        Folds a new raw score into the statistics, replacing the entity's
+        previous latest value for the component. Call before latest_raw_scores
+        is updated. Does not commit.
+        """
+        if category_id is None:
+            category_id = db.execute(
+                select(Entity.category_id).where(Entity.id == entity_id)
+            ).scalar_one_or_none()
+            if category_id is None:
+                raise ValueError("Entity not found")
+
+        self.record_raw_scores(db, [{
+            "category_id": category_id,
+            "entity_id": entity_id,
+            "component_id": component_id,
+            "value": value,
+            "era_id": era_id,
+        }])
+
+    def record_raw_scores(self, db: Session, scores: List[Dict[str, Any]]) -> None:
+        """
+        Batch form of ``record_raw_score``: ``scores`` are dicts with
+        category_id, entity_id, component_id, value and era_id, applied in
+        order. The affected statistics rows are locked before the previous
+        latest values are read (and locked too), so concurrent writers for
+        the same entity and component never remove the same old value twice.
+        Does not commit.
+        """
+        if not scores:
+            return
+
+        keys = {(s["category_id"], s["component_id"], s["era_id"]) for s in scores}
+        stats = self._load_for_update(db, keys)
+
+        previous: Dict[Tuple[UUID, UUID], Tuple[float, Optional[UUID]]] = {}
+        wanted = {(s["entity_id"], s["component_id"]) for s in scores}
+        rows = db.execute(
+            select(LatestRawScore.entity_id, LatestRawScore.component_id, LatestRawScore.value, LatestRawScore.era_id)
+            .where(
+                LatestRawScore.entity_id.in_({key[0] for key in wanted}),
+                LatestRawScore.component_id.in_({key[1] for key in wanted}),
+            )
+            .with_for_update()
+        ).all()
+        for row in rows:
+            if (row.entity_id, row.component_id) in wanted:
+                previous[(row.entity_id, row.component_id)] = (row.value, row.era_id)
+
+        category_of = {s["entity_id"]: s["category_id"] for s in scores}
+        old_keys = {
+            (category_of[entity_id], component_id, era_id)
+            for (entity_id, component_id), (_, era_id) in previous.items()
+        }
+        if old_keys - stats.keys():
+            # A previous value in an era without statistics yet
+            stats = self._load_for_update(db, keys | old_keys)
+
+        for s in scores:
+            key = (s["entity_id"], s["component_id"])
+            if key in previous:
+                old_value, old_era_id = previous[key]
+                welford_remove(stats[(s["category_id"], s["component_id"], old_era_id)], old_value)
+            welford_add(stats[(s["category_id"], s["component_id"], s["era_id"])], s["value"])
+            previous[key] = (s["value"], s["era_id"])
+        db.flush()
+
+    def _refresh_min_max(self, db: Session, stat: ComponentStatistic) -> None:
+        latest = self._latest_values_query(stat.category_id)
+        era_filter = latest.c.era_id.is_(None) if stat.era_id is None else latest.c.era_id == stat.era_id
+        stat.min_value, stat.max_value = db.execute(
+            select(func.min(latest.c.value), func.max(latest.c.value)).where(
+                latest.c.component_id == stat.component_id,
+                era_filter,
+            )
+        ).one()
+        stat.min_max_stale = False
+
+    def get_normalization_stats(
+        self, db: Session, category_id: UUID, component_ids: List[UUID]
+    ) -> Tuple[Dict[UUID, Dict[str, Optional[float]]], Dict[Tuple[UUID, UUID], float]]:
+        """
+        Returns per-component min/max/avg/std (sample) and per-(era, component)
+        means for a category, in the shape ScoringInputs expects.
+        """
+        query = select(ComponentStatistic).where(
+            ComponentStatistic.category_id == category_id,
+            ComponentStatistic.component_id.in_(component_ids),
+        )
+        rows = db.execute(query).scalars().all()
+        if not rows:
+            # Nothing materialized yet for this category (fresh deploy, or raw
+            # scores written around the service): build it once from history.
+            self.rebuild(db, category_id)
+            rows = db.execute(query).scalars().all()
+
+        by_component: Dict[UUID, List[ComponentStatistic]] = {}
+        era_means: Dict[Tuple[UUID, UUID], float] = {}
+        for stat in rows:
+            if stat.min_max_stale:
+                self._refresh_min_max(db, stat)
+            if not stat.count:
+                continue
+            by_component.setdefault(stat.component_id, []).append(stat)
+            if stat.era_id is not None:
+                era_means[(stat.era_id, stat.component_id)] = stat.mean
+
+        component_stats: Dict[UUID, Dict[str, Optional[float]]] = {}
+        for component_id, stats in by_component.items():
+            count, mean, m2 = merge_moments(stats)
+            component_stats[component_id] = {
+                "min": min(s.min_value for s in stats),
+                "max": max(s.max_value for s in stats),
+                "avg": mean,
+                "std": math.sqrt(m2 / (count - 1)) if count > 1 else None,
+            }
+        return component_stats, era_means
+
+    def rebuild(self, db: Session, category_id: Optional[UUID] = None) -> int:
+        """
+        Recomputes the statistics from latest_raw_scores, for one category
+        or for everything. Does not commit; returns the number of rows written.
+        """
+        latest = self._latest_values_query(category_id)
+        stats: Dict[StatsKey, ComponentStatistic] = {}
+        result = db.execute(
+            select(latest.c.category_id, latest.c.component_id, latest.c.era_id, latest.c.value),
+            execution_options={"yield_per": 5000},
+        )
+        for row in result:
+            key = (row.category_id, row.component_id, row.era_id)
+            stat = stats.get(key)
+            if stat is None:
+                stat = stats[key] = ComponentStatistic(
+                    category_id=row.category_id,
+                    component_id=row.component_id,
+                    era_id=row.era_id,
+                    count=0,
+                    mean=0.0,
+                    m2=0.0,
+                    min_max_stale=False,
+                )
+            welford_add(stat, row.value)
+
+        stale = delete(ComponentStatistic)
+        if category_id:
+            stale = stale.where(ComponentStatistic.category_id == category_id)
+        db.execute(stale)
+        db.add_all(stats.values())
+        db.flush()
+        return len(stats)
+
+
+component_stats_service = ComponentStatsService()
@@ -0,0 +1,81 @@
+import uuid
+from typing import Iterable, List, Optional
+from uuid import UUID
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+from app.models.entity import Entity
+from app.models.scoring import DirtyScoringEntity, ScoringModel
+from app.repositories.bulk import bulk_upsert
+
+
+class DirtyScoreService:
+    """
+    Tracks which (entity, scoring model) pairs need re-scoring after one of
+    their inputs (raw scores, expert votes, fan aggregates, influence scores)
+    was written. Marks are written in the caller's transaction.
+    """
+
+    def mark_dirty(
+        self,
+        db: Session,
+        entity_ids: Iterable[UUID],
+        *,
+        scoring_model_id: Optional[UUID] = None,
+        reason: Optional[str] = None,
+    ) -> int:
+        """
+        Marks entities dirty for ``scoring_model_id``, or for every scoring
+        model of each entity's category when no model is given.
+        """
+        entity_ids = set(entity_ids)
+        if not entity_ids:
+            return 0
+
+        if scoring_model_id:
+            pairs = [(entity_id, scoring_model_id) for entity_id in entity_ids]
+        else:
+            pairs = db.execute(
+                select(Entity.id, ScoringModel.id)
+                .join(ScoringModel, ScoringModel.category_id == Entity.category_id)
+                .where(Entity.id.in_(entity_ids))
+            ).all()
+
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "entity_id": entity_id,
+                "scoring_model_id": model_id,
+                "reason": reason,
+            }
+            for entity_id, model_id in pairs
+        ]
+        return bulk_upsert(
+            db,
+            DirtyScoringEntity,
+            rows,
+            conflict_columns=("entity_id", "scoring_model_id"),
+            update_columns=("reason",),
+            constraint="uq_scoring_dirty_entity_model",
+        )
+
+    def claim_dirty(self, db: Session, scoring_model_id: UUID) -> List[UUID]:
+        """
+        Returns the dirty entity ids for a model and removes their marks. The
+        rows stay locked until the caller commits, so a concurrent mark waits
+        and re-inserts instead of being lost.
+        """
+        dirty = db.execute(
+            select(DirtyScoringEntity.id, DirtyScoringEntity.entity_id)
+            .where(DirtyScoringEntity.scoring_model_id == scoring_model_id)
+            .with_for_update()
+        ).all()
+        if not dirty:
+            return []
+
+        db.execute(
+            delete(DirtyScoringEntity).where(DirtyScoringEntity.id.in_([row.id for row in dirty]))
+        )
+        return [row.entity_id for row in dirty]
+
+
+dirty_score_service = DirtyScoreService()
@@ -1,93 +1,246 @@
-import math
-from typing import List, Optional, Dict, Any
+import uuid
+from typing import List, Optional, Dict, Any, Set, Tuple, TYPE_CHECKING
 from uuid import UUID
-from sqlalchemy import select, func, and_
+import numpy as np
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.models.entity import Entity
 from app.models.era import Era, EraFactor, EraAdjustedScore, EraModel
-from app.models.scoring import RawScore, ScoringComponent
+from app.models.scoring import LatestRawScore, ScoringComponent, ScoringModel, ScoringWeight
+from app.repositories.bulk import bulk_upsert
+from app.services.era_stats import era_stats_service
+from app.schemas.era import EraValue
+
+if TYPE_CHECKING:
+    from app.services.jobs import JobContext
+
+FactorKey = Tuple[UUID, UUID]  # (era_id, component_id)
+MIN_STD_DEV = 0.1  # stands in for a zero spread, avoiding division by zero
+# EraModel.config["normalization"]
+NORMALIZATION_MEAN_STD = "mean_std"
+NORMALIZATION_MEDIAN_IQR = "median_iqr"
+NORMALIZATION_METHODS = (NORMALIZATION_MEAN_STD, NORMALIZATION_MEDIAN_IQR)
+IQR_TO_STD_DEV = 1.349  # IQR of a normal distribution in standard deviations
 
 
 class EraService:
-    def calculate_era_factors(self, db: Session, era_id: UUID):
+    def _category_component_ids(self, category_id: UUID):
+        """Components weighted by any of the category's scoring models."""
+        return (
+            select(ScoringWeight.component_id)
+            .join(ScoringModel, ScoringWeight.scoring_model_id == ScoringModel.id)
+            .where(ScoringModel.category_id == category_id, ScoringModel.deleted_at.is_(None))
+        )
+
+    def normalization_method(self, db: Session, category_id: UUID) -> str:
+        """The ``normalization`` option of the category's active EraModel config."""
+        config = db.execute(
+            select(EraModel.config).where(
+                EraModel.category_id == category_id,
+                EraModel.is_active == True,
+                EraModel.deleted_at.is_(None),
+            ).order_by(EraModel.created_at.desc())
+        ).scalars().first() or {}
+        method = config.get("normalization", NORMALIZATION_MEAN_STD)
+        if method not in NORMALIZATION_METHODS:
+            raise ValueError(f"Unknown era normalization {method!r}; use one of {', '.join(NORMALIZATION_METHODS)}")
+        return method
+
+    def _recalculate_factors(
+        self, db: Session, category_id: UUID, era_ids: List[UUID], context: Optional["JobContext"] = None
+    ) -> int:
+        # Merged from the streaming sketches rather than rescanning raw_scores
+        method = self.normalization_method(db, category_id)
+        stats = era_stats_service.get_stats(db, era_ids, self._category_component_ids(category_id))
+        if context:
+            # Building missing sketches is the slow part
+            context.check_cancelled()
+            context.progress(0.5, "Writing era factors")
+
+        rows = []
+        for (era_id, component_id), stat in stats.items():
+            if not stat.count:
+                continue
+            if method == NORMALIZATION_MEDIAN_IQR:
+                # Median and IQR scaled to a normal standard deviation, robust
+                # to heavy tails such as follower counts
+                center, spread = stat.median, stat.iqr / IQR_TO_STD_DEV
+            else:
+                center, spread = stat.mean, stat.std_dev
+            rows.append({
+                "id": uuid.uuid4(),
+                "era_id": era_id,
+                "component_id": component_id,
+                "mean_value": center,
+                "std_dev": spread if spread > 0 else MIN_STD_DEV,
+                "multiplier": 1.0,
+            })
+        # Curated multipliers are kept on update
+        return bulk_upsert(
+            db,
+            EraFactor,
+            rows,
+            conflict_columns=("era_id", "component_id"),
+            update_columns=("mean_value", "std_dev"),
+            constraint="_era_component_uc",
+        )
+
+    def calculate_era_factors(self, db: Session, era_id: UUID, context: Optional["JobContext"] = None) -> int:
         """
-        Pre-calculates mean and std_dev for all components within an era.
+        Pre-calculates the center (mean, or median) and spread (std_dev, or
+        scaled IQR) of each component the era's category scores with, from
+        the era's statistics sketches, with one bulk upsert. Returns the
+        number of factors written.
         """
         era = db.get(Era, era_id)
         if not era:
             raise ValueError("Era not found")
+        written = self._recalculate_factors(db, era.category_id, [era.id], context)
+        db.commit()
+        return written
 
-        # Get all components used in this category
-        components = db.execute(
-            select(ScoringComponent)
+    def calculate_category_era_factors(
+        self, db: Session, category_id: UUID, context: Optional["JobContext"] = None
+    ) -> int:
+        """Recalculates the factors of every era of a category in one pass."""
+        era_ids = db.execute(
+            select(Era.id).where(Era.category_id == category_id, Era.deleted_at.is_(None))
         ).scalars().all()
+        if not era_ids:
+            raise ValueError("No eras found for this category")
+        written = self._recalculate_factors(db, category_id, era_ids, context)
+        db.commit()
+        return written
 
-        for component in components:
-            # Get all raw scores for this component in this era
-            scores_query = select(RawScore.value).where(
-                and_(
-                    RawScore.component_id == component.id,
-                    RawScore.era_id == era_id
-                )
+    def _load_factors(self, db: Session, keys: Set[FactorKey]) -> Dict[FactorKey, Tuple[float, float, float]]:
+        rows = db.execute(
+            select(EraFactor.era_id, EraFactor.component_id, EraFactor.mean_value, EraFactor.std_dev, EraFactor.multiplier)
+            .where(
+                EraFactor.era_id.in_({key[0] for key in keys}),
+                EraFactor.component_id.in_({key[1] for key in keys}),
             )
-            scores = db.execute(scores_query).scalars().all()
+        ).all()
+        return {
+            (row.era_id, row.component_id): (row.mean_value, row.std_dev, row.multiplier)
+            for row in rows
+            if (row.era_id, row.component_id) in keys
+        }
 
-            if not scores:
-                continue
+    def _adjust(
+        self, values: List[EraValue], factors: Dict[FactorKey, Tuple[float, float, float]]
+    ) -> List[Dict[str, Any]]:
+        # Columns of (mean, std_dev, multiplier), NaN where the era has no factor
+        params = np.array(
+            [factors.get((v.era_id, v.component_id), (np.nan, np.nan, np.nan)) for v in values], dtype=float
+        ).reshape(len(values), 3)
+        raw = np.array([v.raw_value for v in values], dtype=float)
+        mean, std_dev, multiplier = params.T
+        adjustable = ~np.isnan(std_dev) & (std_dev != 0)
+
+        # 1. Z-score (dominance within era)
+        z_scores = np.full(len(values), np.nan)
+        np.divide(raw - mean, std_dev, out=z_scores, where=adjustable)
+        # 2. Era multiplier (contextual difficulty)
+        adjusted = np.where(adjustable, raw * multiplier, raw)
 
-            mean = sum(scores) / len(scores)
-            variance = sum((x - mean) ** 2 for x in scores) / len(scores)
-            std_dev = math.sqrt(variance) if variance > 0 else 0.1 # Avoid division by zero
-
-            # Update or create EraFactor
-            factor = db.execute(
-                select(EraFactor).where(
-                    and_(
-                        EraFactor.era_id == era_id,
-                        EraFactor.component_id == component.id
-                    )
-                )
-            ).scalar_one_or_none()
-
-            if factor:
-                factor.mean_value = mean
-                factor.std_dev = std_dev
+        results = []
+        for i, value in enumerate(values):
+            if adjustable[i]:
+                explanation = f"x{multiplier[i]:g} era multiplier; z-score {z_scores[i]:.2f} within era"
             else:
-                factor = EraFactor(
-                    era_id=era_id,
-                    component_id=component.id,
-                    mean_value=mean,
-                    std_dev=std_dev
-                )
-                db.add(factor)
-        
-        db.commit()
+                explanation = "No era factor; raw value kept"
+            results.append({
+                "entity_id": value.entity_id,
+                "era_id": value.era_id,
+                "component_id": value.component_id,
+                "raw_value": value.raw_value,
+                "adjusted_value": float(adjusted[i]),
+                "z_score": float(z_scores[i]) if adjustable[i] else None,
+                "explanation": explanation,
+            })
+        return results
 
-    def get_adjusted_value(self, db: Session, entity_id: UUID, era_id: UUID, component_id: UUID, raw_value: float) -> float:
+    def _persist(self, db: Session, results: List[Dict[str, Any]]) -> None:
+        # One row per key, the last value winning: Postgres will not upsert
+        # the same row twice in one statement
+        rows = {(r["entity_id"], r["era_id"], r["component_id"]): r for r in results}
+        for model, column, name in (
+            (Entity, "entity_id", "Entity"),
+            (Era, "era_id", "Era"),
+            (ScoringComponent, "component_id", "Scoring component"),
+        ):
+            wanted = {row[column] for row in rows.values()}
+            missing = wanted - set(db.execute(select(model.id).where(model.id.in_(wanted))).scalars())
+            if missing:
+                raise ValueError(f"{name} not found: {min(missing)}")
+        bulk_upsert(
+            db,
+            EraAdjustedScore,
+            [{"id": uuid.uuid4(), **result} for result in rows.values()],
+            conflict_columns=("entity_id", "era_id", "component_id"),
+            update_columns=("raw_value", "adjusted_value", "z_score", "explanation"),
+            constraint="_entity_era_component_uc",
+        )
+
+    def adjust_values(self, db: Session, values: List[EraValue], persist: bool = False) -> List[Dict[str, Any]]:
+        """
+        Era-adjusts a batch of raw values: the factors they need are loaded
+        with one query and z-scores and multiplied values computed as arrays.
+        With ``persist`` the results are also upserted as EraAdjustedScore
+        rows, the last value of a repeated (entity, era, component) winning;
+        raises ValueError if an id does not exist. Does not commit.
+        """
+        if not values:
+            return []
+        factors = self._load_factors(db, {(v.era_id, v.component_id) for v in values})
+        results = self._adjust(values, factors)
+        if persist:
+            self._persist(db, results)
+        return results
+
+    def adjust_entity(self, db: Session, entity_id: UUID, persist: bool = False) -> List[Dict[str, Any]]:
         """
-        Calculates the era-adjusted value using Z-score and era multipliers.
+        Era-adjusted view of an entity's latest raw scores, read together with
+        their factors in a single query. Does not commit.
         """
-        factor = db.execute(
-            select(EraFactor).where(
-                and_(
-                    EraFactor.era_id == era_id,
-                    EraFactor.component_id == component_id
-                )
+        rows = db.execute(
+            select(
+                LatestRawScore.era_id,
+                LatestRawScore.component_id,
+                LatestRawScore.value,
+                EraFactor.mean_value,
+                EraFactor.std_dev,
+                EraFactor.multiplier,
             )
-        ).scalar_one_or_none()
-
-        if not factor or factor.std_dev == 0:
-            return raw_value
-
-        # 1. Calculate Z-Score (Dominance within era)
-        z_score = (raw_value - factor.mean_value) / factor.std_dev
-        
-        # 2. Apply Era Multiplier (Contextual difficulty)
-        # For now, we use the multiplier from EraFactor
-        adjusted_value = raw_value * factor.multiplier
-        
-        # 3. Store for audit
-        # (Optional: could be done in a separate step to avoid overhead)
-        
-        return adjusted_value
+            .outerjoin(
+                EraFactor,
+                (EraFactor.era_id == LatestRawScore.era_id)
+                & (EraFactor.component_id == LatestRawScore.component_id),
+            )
+            .where(LatestRawScore.entity_id == entity_id, LatestRawScore.era_id.is_not(None))
+        ).all()
+        values = [
+            EraValue(entity_id=entity_id, era_id=row.era_id, component_id=row.component_id, raw_value=row.value)
+            for row in rows
+        ]
+        factors = {
+            (row.era_id, row.component_id): (row.mean_value, row.std_dev, row.multiplier)
+            for row in rows
+            if row.mean_value is not None
+        }
+        results = self._adjust(values, factors) if values else []
+        if persist:
+            self._persist(db, results)
+        return results
+
+    def get_adjusted_value(self, db: Session, entity_id: UUID, era_id: UUID, component_id: UUID, raw_value: float) -> float:
+        """
+        Calculates the era-adjusted value of a single raw value; prefer
+        ``adjust_values`` for more than one.
+        """
+        [result] = self.adjust_values(
+            db, [EraValue(entity_id=entity_id, era_id=era_id, component_id=component_id, raw_value=raw_value)]
+        )
+        return result["adjusted_value"]
 
 era_service = EraService()
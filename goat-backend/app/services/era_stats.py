@@ -0,0 +1,306 @@
+"""
+Streaming era statistics.
+
+Every raw score recorded with an era is folded into a per-(era, component)
+summary: Welford moments (count, mean, m2, min, max) and a KLL quantile
+sketch. Both merge without the underlying values, so ingest batches are
+summarized in memory and merged into the stored rows, and era factors are
+recalculated from the summaries instead of rescanning ``raw_scores``.
+
+The KLL sketch (Karnin, Lang & Liberty) keeps a stack of compactors; level h
+holds items of weight 2^h. A full compactor sorts its items and promotes
+every other one, starting at a random offset, to the next level. With
+k = 200 ranks are typically within about 1% of the truth while the sketch
+holds a few hundred values however many it has seen.
+"""
+import math
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+from sqlalchemy import select, delete, func, true, tuple_
+from sqlalchemy.orm import Session
+from app.models.era import EraComponentSketch
+from app.models.scoring import RawScore
+from app.repositories.bulk import bulk_upsert, dialect_insert
+
+KLL_K = 200
+KLL_C = 2 / 3  # capacity ratio between consecutive levels
+REBUILD_BATCH_SIZE = 5000
+
+SketchKey = Tuple[UUID, UUID]  # (era_id, component_id)
+
+
+class KllSketch:
+    def __init__(self, k: int = KLL_K, compactors: Optional[List[List[float]]] = None):
+        self.k = k
+        self.compactors: List[List[float]] = compactors or [[]]
+        self.size = sum(len(items) for items in self.compactors)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(2, int(math.ceil(self.k * KLL_C ** depth)))
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.compactors):
+            if len(self.compactors[level]) >= self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+                items = sorted(self.compactors[level])
+                kept = [items.pop()] if len(items) % 2 else []
+                self.compactors[level + 1].extend(items[random.getrandbits(1)::2])
+                self.compactors[level] = kept
+                self.size = sum(len(items) for items in self.compactors)
+                if self.size < self._max_size():
+                    return
+            level += 1
+
+    def update(self, value: float) -> None:
+        self.compactors[0].append(value)
+        self.size += 1
+        if self.size >= self._max_size():
+            self._compress()
+
+    def merge(self, other: "KllSketch") -> None:
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.size = sum(len(items) for items in self.compactors)
+        while self.size >= self._max_size():
+            self._compress()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The value at rank ``q`` (0-1) of everything seen, None when empty."""
+        weighted = sorted(
+            (value, 1 << level) for level, items in enumerate(self.compactors) for value in items
+        )
+        if not weighted:
+            return None
+        target = q * sum(weight for _, weight in weighted)
+        seen = 0
+        for value, weight in weighted:
+            seen += weight
+            if seen >= target:
+                return value
+        return weighted[-1][0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.k, "compactors": self.compactors}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "KllSketch":
+        if not data:
+            return cls()
+        return cls(k=data.get("k", KLL_K), compactors=[list(items) for items in data["compactors"]])
+
+
+@dataclass
+class EraStats:
+    """Mergeable summary of one (era, component)'s raw scores."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    quantiles: KllSketch = field(default_factory=KllSketch)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+        self.max_value = value if self.max_value is None else max(self.max_value, value)
+        self.quantiles.update(value)
+
+    def merge(self, other: "EraStats") -> None:
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+        self.max_value = other.max_value if self.max_value is None else max(self.max_value, other.max_value)
+        self.quantiles.merge(other.quantiles)
+
+    @property
+    def std_dev(self) -> float:
+        """Population standard deviation."""
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+    @property
+    def median(self) -> Optional[float]:
+        return self.quantiles.quantile(0.5)
+
+    @property
+    def iqr(self) -> Optional[float]:
+        if not self.count:
+            return None
+        return self.quantiles.quantile(0.75) - self.quantiles.quantile(0.25)
+
+    @classmethod
+    def from_row(cls, row: EraComponentSketch) -> "EraStats":
+        return cls(
+            count=row.count,
+            mean=row.mean,
+            m2=row.m2,
+            min_value=row.min_value,
+            max_value=row.max_value,
+            quantiles=KllSketch.from_dict(row.quantile_sketch),
+        )
+
+    def to_columns(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min_value": self.min_value,
+            "max_value": self.max_value,
+            "quantile_sketch": self.quantiles.to_dict(),
+        }
+
+
+def summarize(values: Iterable[Tuple[UUID, UUID, float]]) -> Dict[SketchKey, EraStats]:
+    """Summarizes (era_id, component_id, value) triples per key."""
+    stats: Dict[SketchKey, EraStats] = {}
+    for era_id, component_id, value in values:
+        key = (era_id, component_id)
+        stat = stats.get(key)
+        if stat is None:
+            stat = stats[key] = EraStats()
+        stat.add(value)
+    return stats
+
+
+class EraStatsService:
+    def _locked_sketches(self, db: Session, keys: Iterable[SketchKey]) -> Dict[SketchKey, EraComponentSketch]:
+        rows = db.execute(
+            select(EraComponentSketch)
+            .where(tuple_(EraComponentSketch.era_id, EraComponentSketch.component_id).in_(list(keys)))
+            .order_by(EraComponentSketch.era_id, EraComponentSketch.component_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        ).scalars().all()
+        return {(row.era_id, row.component_id): row for row in rows}
+
+    def _eras_without_sketches(self, db: Session, era_ids: Set[UUID]) -> Set[UUID]:
+        return era_ids - set(db.execute(
+            select(EraComponentSketch.era_id).where(EraComponentSketch.era_id.in_(era_ids)).distinct()
+        ).scalars())
+
+    def _build_missing(self, db: Session, era_ids: Set[UUID]) -> Set[UUID]:
+        # Builds the eras that have no sketches yet from raw_scores and
+        # returns them. Their first writers and readers wait for each other
+        # on a per-era lock until commit, so one builds and the rest find rows.
+        missing = self._eras_without_sketches(db, era_ids)
+        if missing and db.get_bind().dialect.name == "postgresql":
+            for era_id in sorted(missing):
+                db.execute(select(func.pg_advisory_xact_lock(int.from_bytes(era_id.bytes[:8], "big", signed=True))))
+            # Another writer may have built them while this one waited
+            missing = self._eras_without_sketches(db, missing)
+        if missing:
+            self.rebuild(db, list(missing))
+        return missing
+
+    def record_raw_scores(self, db: Session, scores: List[Dict[str, Any]]) -> None:
+        """
+        Folds raw scores (dicts with era_id, component_id and value) into the
+        stored sketches: the batch is summarized in memory, then merged into
+        each affected row, read with one query locking only the batch's
+        keys. Rows for new components are created empty with INSERT ... ON
+        CONFLICT DO NOTHING and locked before the merge, so concurrent first
+        writers don't fail on the unique key. Call after the raw scores are
+        written: an era without sketches yet is built from raw_scores instead,
+        under a per-era lock. Scores without an era are ignored. Does not
+        commit.
+        """
+        batch = summarize((s["era_id"], s["component_id"], s["value"]) for s in scores if s.get("era_id"))
+        if not batch:
+            return
+        missing = self._build_missing(db, {key[0] for key in batch})
+        keys = [key for key in batch if key[0] not in missing]
+        if not keys:
+            return
+        stored = self._locked_sketches(db, keys)
+        new_keys = [key for key in keys if key not in stored]
+        if new_keys:
+            db.execute(
+                dialect_insert(db)(EraComponentSketch.__table__)
+                .values([
+                    {"id": uuid.uuid4(), "era_id": era_id, "component_id": component_id, **EraStats().to_columns()}
+                    for era_id, component_id in new_keys
+                ])
+                .on_conflict_do_nothing()
+            )
+            stored = self._locked_sketches(db, keys)
+        for key in keys:
+            row = stored[key]
+            merged = EraStats.from_row(row)
+            merged.merge(batch[key])
+            for name, value in merged.to_columns().items():
+                setattr(row, name, value)
+        db.flush()
+
+    def rebuild(self, db: Session, era_ids: List[UUID]) -> int:
+        """
+        Recomputes the sketches of the eras from raw_scores in one streamed
+        pass. Rows are upserted, so a concurrent rebuild of the same era
+        overwrites rather than fails. Does not commit; returns the number of
+        sketches written.
+        """
+        result = db.execute(
+            select(RawScore.era_id, RawScore.component_id, RawScore.value).where(RawScore.era_id.in_(era_ids)),
+            execution_options={"yield_per": REBUILD_BATCH_SIZE},
+        )
+        stats = summarize(result)
+        db.execute(
+            delete(EraComponentSketch).where(
+                EraComponentSketch.era_id.in_(era_ids),
+                tuple_(EraComponentSketch.era_id, EraComponentSketch.component_id).not_in(list(stats))
+                if stats else true(),
+            )
+        )
+        bulk_upsert(
+            db,
+            EraComponentSketch,
+            [
+                {"id": uuid.uuid4(), "era_id": era_id, "component_id": component_id, **stat.to_columns()}
+                for (era_id, component_id), stat in stats.items()
+            ],
+            conflict_columns=("era_id", "component_id"),
+            update_columns=("count", "mean", "m2", "min_value", "max_value", "quantile_sketch"),
+            constraint="_era_component_sketch_uc",
+        )
+        return len(stats)
+
+    def get_stats(self, db: Session, era_ids: List[UUID], component_ids=None) -> Dict[SketchKey, EraStats]:
+        """
+        The summaries of the eras, optionally limited to ``component_ids`` (a
+        list or a subquery). Eras without any stored sketch are built from
+        raw_scores once first.
+        """
+        self._build_missing(db, set(era_ids))
+
+        query = (
+            select(EraComponentSketch)
+            .where(EraComponentSketch.era_id.in_(era_ids))
+            .execution_options(populate_existing=True)  # rebuilds write around the session
+        )
+        if component_ids is not None:
+            query = query.where(EraComponentSketch.component_id.in_(component_ids))
+        return {
+            (row.era_id, row.component_id): EraStats.from_row(row)
+            for row in db.execute(query).scalars()
+        }
+
+
+era_stats_service = EraStatsService()
@@ -1,9 +1,10 @@
-from typing import List, Optional, Dict, Any
+from typing import Iterable, List, Optional, Dict, Any
 from uuid import UUID
 from sqlalchemy import select, func, and_
 from sqlalchemy.orm import Session
 from app.models.expert import Expert, ExpertDomain, ExpertVote, ExpertReputationEvent, ConflictDisclosure, ExpertRole
 from app.models.user import User
+from app.services.dirty_scores import dirty_score_service
 from app.schemas.expert import ExpertCreate, ExpertVoteCreate, ConflictDisclosureCreate
 
 
@@ -65,32 +66,56 @@ class ExpertService:
             **vote_in.model_dump()
         )
         db.add(db_vote)
+        dirty_score_service.mark_dirty(
+            db, [vote_in.entity_id], scoring_model_id=vote_in.scoring_model_id, reason="expert_vote"
+        )
         db.commit()
         db.refresh(db_vote)
         return db_vote
 
-    def calculate_expert_weight(self, db: Session, expert_id: UUID, category_id: UUID, confidence: float) -> float:
-        expert = db.get(Expert, expert_id)
-        if not expert:
-            return 0.0
-            
-        # Base weight (conceptual, can be adjusted)
-        base_weight = 1.0
-        
-        # Reputation factor (0.5 to 1.5)
-        reputation_factor = max(0.5, min(1.5, expert.reputation_score))
-        
-        # Domain match factor
-        domain_match = db.execute(
-            select(ExpertDomain.expertise_level).where(
+    def get_expert_weight_factors(
+        self, db: Session, expert_ids: Iterable[UUID], category_id: UUID
+    ) -> Dict[UUID, float]:
+        """
+        Resolves reputation and domain match for many experts in one joined
+        query. Returns the confidence-independent weight factor per expert;
+        experts that do not exist are left out.
+        """
+        expert_ids = set(expert_ids)
+        if not expert_ids:
+            return {}
+
+        rows = db.execute(
+            select(Expert.id, Expert.reputation_score, ExpertDomain.expertise_level)
+            .outerjoin(
+                ExpertDomain,
                 and_(
-                    ExpertDomain.expert_id == expert_id,
+                    ExpertDomain.expert_id == Expert.id,
                     ExpertDomain.category_id == category_id
                 )
             )
-        ).scalar() or 0.0
-        
+            .where(Expert.id.in_(expert_ids))
+        ).all()
+
+        factors: Dict[UUID, float] = {}
+        for expert_id, reputation_score, expertise_level in rows:
+            if expert_id in factors:
+                continue
+            # Base weight (conceptual, can be adjusted)
+            base_weight = 1.0
+            # Reputation factor (0.5 to 1.5)
+            reputation_factor = max(0.5, min(1.5, reputation_score))
+            # Domain match factor
+            domain_match = expertise_level or 0.0
+            factors[expert_id] = base_weight * reputation_factor * domain_match
+        return factors
+
+    def calculate_expert_weight(self, db: Session, expert_id: UUID, category_id: UUID, confidence: float) -> float:
+        factors = self.get_expert_weight_factors(db, [expert_id], category_id)
+        if expert_id not in factors:
+            return 0.0
+
         # Final weight formula
-        return base_weight * reputation_factor * confidence * domain_match
+        return factors[expert_id] * confidence
 
 expert_service = ExpertService()
@@ -0,0 +1,121 @@
+"""
+Per-vote changes to the fan vote aggregates.
+
+A vote contributes rating·weight and weight to three places: the lifetime
+running sums, the exponentially decayed sums, and the hourly and daily
+buckets of the time it was cast. Decay uses a fixed landmark ("forward
+decay"): a vote cast at t is stored scaled by exp(λ·(t - landmark)). The
+scale cancels in the decayed mean, so nothing has to be rescaled as time
+passes and each vote stays an O(1) update.
+"""
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from app.core.config import settings
+
+DECAY_LANDMARK = datetime(2026, 1, 1, tzinfo=timezone.utc)
+HOUR = "hour"
+DAY = "day"
+GRANULARITIES = (HOUR, DAY)
+# How long buckets are kept; windows longer than two days read daily buckets
+BUCKET_RETENTION = {HOUR: timedelta(days=7), DAY: timedelta(days=400)}
+
+AggregateKey = Tuple[UUID, UUID]  # (entity_id, category_id)
+BucketKey = Tuple[str, datetime]  # (granularity, bucket start)
+
+
+def as_utc(at: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are UTC
+    return at.replace(tzinfo=timezone.utc) if at.tzinfo is None else at.astimezone(timezone.utc)
+
+
+def decay_rate() -> float:
+    """λ in 1/seconds for the configured half-life."""
+    return math.log(2) / (settings.FAN_DECAY_HALF_LIFE_DAYS * 86400)
+
+
+def decay_scale(at: datetime) -> float:
+    return math.exp(decay_rate() * (as_utc(at) - DECAY_LANDMARK).total_seconds())
+
+
+def bucket_start(at: datetime, granularity: str) -> datetime:
+    at = as_utc(at)
+    if granularity == HOUR:
+        return at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+@dataclass
+class AggregateDelta:
+    """Net change of one (entity, category) aggregate; deltas merge by addition."""
+
+    weighted_rating_sum: float = 0.0
+    weight_sum: float = 0.0
+    vote_count: int = 0
+    decayed_weighted_rating_sum: float = 0.0
+    decayed_weight_sum: float = 0.0
+    # (granularity, bucket start) -> [Σ rating·weight, Σ weight, count]
+    buckets: Dict[BucketKey, List[float]] = field(default_factory=dict)
+
+    def add(self, rating: float, weight: float, at: datetime, sign: int = 1) -> None:
+        """Adds (sign=1) or removes (sign=-1) one vote as cast at ``at``."""
+        self.weighted_rating_sum += sign * rating * weight
+        self.weight_sum += sign * weight
+        self.vote_count += sign
+        scale = decay_scale(at)
+        self.decayed_weighted_rating_sum += sign * rating * weight * scale
+        self.decayed_weight_sum += sign * weight * scale
+        now = datetime.now(timezone.utc)
+        for granularity in GRANULARITIES:
+            start = bucket_start(at, granularity)
+            if start < now - BUCKET_RETENTION[granularity]:
+                continue  # already expired; replacing an old vote leaves it alone
+            bucket = self.buckets.setdefault((granularity, start), [0.0, 0.0, 0])
+            bucket[0] += sign * rating * weight
+            bucket[1] += sign * weight
+            bucket[2] += sign
+
+    def merge(self, other: "AggregateDelta") -> None:
+        self.weighted_rating_sum += other.weighted_rating_sum
+        self.weight_sum += other.weight_sum
+        self.vote_count += other.vote_count
+        self.decayed_weighted_rating_sum += other.decayed_weighted_rating_sum
+        self.decayed_weight_sum += other.decayed_weight_sum
+        for key, (weighted_rating, weight, count) in other.buckets.items():
+            bucket = self.buckets.setdefault(key, [0.0, 0.0, 0])
+            bucket[0] += weighted_rating
+            bucket[1] += weight
+            bucket[2] += count
+
+    @classmethod
+    def for_vote(
+        cls,
+        rating: float,
+        weight: float,
+        at: datetime,
+        old_rating: Optional[float] = None,
+        old_weight: Optional[float] = None,
+        old_at: Optional[datetime] = None,
+    ) -> "AggregateDelta":
+        """The change from casting a vote, replacing the previous one if any."""
+        delta = cls()
+        if old_rating is not None:
+            delta.add(old_rating, old_weight, old_at, sign=-1)
+        delta.add(rating, weight, at)
+        return delta
+
+
+def parse_window(window: str) -> timedelta:
+    """
+    Parses a trailing window such as ``24h`` or ``7d``, no longer than the
+    daily buckets are kept.
+    """
+    unit = {"h": timedelta(hours=1), "d": timedelta(days=1)}.get(window[-1:])
+    if unit is None or not window[:-1].isdigit() or int(window[:-1]) < 1:
+        raise ValueError("Window must look like 24h or 7d")
+    # Checked as a count so a huge one cannot overflow timedelta
+    if int(window[:-1]) > BUCKET_RETENTION[DAY] // unit:
+        raise ValueError(f"Windows are limited to {BUCKET_RETENTION[DAY].days} days")
+    return int(window[:-1]) * unit
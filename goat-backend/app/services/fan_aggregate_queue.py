@@ -0,0 +1,168 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.schemas.fan_voting import FanAggregateQueueMetrics
+from app.services.fan_aggregate_deltas import AggregateDelta, AggregateKey
+
+logger = logging.getLogger(__name__)
+
+# Failed flushes a batch survives before it is dropped
+MAX_FLUSH_ATTEMPTS = 3
+
+
+class FanAggregateQueue:
+    """
+    In-process write-behind queue for fan vote aggregates. Votes are
+    committed on their own; their aggregate deltas are merged per
+    (entity, category) here and applied in one statement per flush, so a
+    burst of votes on one entity costs a single aggregate update.
+
+    Deltas still queued when the process dies, or dropped after
+    MAX_FLUSH_ATTEMPTS failed flushes, are lost; an aggregate reconcile
+    (POST /fan-votes/aggregates/reconcile or scripts/reconcile_fan_aggregates.py)
+    repairs the totals.
+    """
+
+    def __init__(
+        self,
+        apply: Callable[[Session, Dict[AggregateKey, AggregateDelta]], None],
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.apply = apply
+        self.session_factory = session_factory
+        self._pending: Dict[AggregateKey, AggregateDelta] = {}
+        self._pending_votes = 0
+        self._oldest_enqueued_at: Optional[float] = None
+        self._failed_attempts = 0  # of the oldest deltas in _pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._interval = 0.0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.votes_applied = 0
+        self.votes_dropped = 0
+        self.last_flush_at: Optional[float] = None
+        self.last_flush_lag: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """Starts the flusher thread; an interval of 0 keeps aggregation synchronous."""
+        interval = settings.FAN_AGGREGATE_FLUSH_INTERVAL_SECONDS if interval is None else interval
+        with self._lock:
+            if interval <= 0 or self._thread:
+                return
+            self._interval = interval
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="fan-aggregate-flusher", daemon=True)
+            self._thread.start()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            self._stop.set()
+            thread.join()
+            # New votes are applied inline from here on; drain what is left
+            self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.flush()
+
+    def enqueue(self, key: AggregateKey, delta: AggregateDelta) -> None:
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending:
+                pending.merge(delta)
+            else:
+                self._pending[key] = delta
+            self._pending_votes += 1
+            if self._oldest_enqueued_at is None:
+                self._oldest_enqueued_at = time.monotonic()
+
+    def _requeue(
+        self, batch: Dict[AggregateKey, AggregateDelta], votes: int, enqueued_at: float, failed_attempts: int
+    ) -> None:
+        with self._lock:
+            self._failed_attempts = failed_attempts
+            for key, delta in batch.items():
+                pending = self._pending.pop(key, None)
+                if pending:
+                    delta.merge(pending)
+                self._pending[key] = delta
+            self._pending_votes += votes
+            if self._oldest_enqueued_at is None or enqueued_at < self._oldest_enqueued_at:
+                self._oldest_enqueued_at = enqueued_at
+
+    def flush(self, db: Optional[Session] = None) -> int:
+        """
+        Applies and commits everything queued so far. Passing ``db`` flushes on
+        that session. A failed batch goes back on the queue for the next
+        flush, merged with whatever arrived meanwhile, until it has failed
+        MAX_FLUSH_ATTEMPTS times; then it is logged and dropped so it cannot
+        hold up every later vote. Returns the number of aggregates updated.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                votes, self._pending_votes = self._pending_votes, 0
+                enqueued_at, self._oldest_enqueued_at = self._oldest_enqueued_at, None
+                failed_attempts, self._failed_attempts = self._failed_attempts, 0
+            if not batch:
+                return 0
+
+            own_session = db is None
+            if own_session:
+                db = self.session_factory()
+            try:
+                self.apply(db, batch)
+                db.commit()
+            except Exception:
+                db.rollback()
+                self.failed_flushes += 1
+                failed_attempts += 1
+                if failed_attempts >= MAX_FLUSH_ATTEMPTS:
+                    logger.exception(
+                        f"Fan aggregate flush of {len(batch)} aggregates ({votes} votes) failed "
+                        f"{failed_attempts} times; dropped, reconcile to repair the totals"
+                    )
+                    self.votes_dropped += votes
+                else:
+                    logger.exception(f"Fan aggregate flush of {len(batch)} aggregates failed; requeued")
+                    self._requeue(batch, votes, enqueued_at, failed_attempts)
+                return 0
+            finally:
+                if own_session:
+                    db.close()
+
+            now = time.monotonic()
+            self.flushes += 1
+            self.votes_applied += votes
+            self.last_flush_at = now
+            self.last_flush_lag = now - enqueued_at
+            return len(batch)
+
+    def metrics(self) -> FanAggregateQueueMetrics:
+        with self._lock:
+            now = time.monotonic()
+            return FanAggregateQueueMetrics(
+                running=self.running,
+                queue_depth=len(self._pending),
+                pending_votes=self._pending_votes,
+                oldest_pending_age_seconds=now - self._oldest_enqueued_at if self._oldest_enqueued_at else 0.0,
+                last_flush_lag_seconds=self.last_flush_lag,
+                seconds_since_last_flush=now - self.last_flush_at if self.last_flush_at else None,
+                flushes=self.flushes,
+                failed_flushes=self.failed_flushes,
+                votes_applied=self.votes_applied,
+                votes_dropped=self.votes_dropped,
+            )
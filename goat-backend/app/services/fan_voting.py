@@ -1,119 +1,540 @@
-from typing import List, Optional, Dict, Any
+import math
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List, Optional, Dict, Any, Tuple, TYPE_CHECKING
 from uuid import UUID
-from sqlalchemy import select, func, and_
-from sqlalchemy.orm import Session
-from app.models.fan_voting import FanVote, FanVoteVersion, FanVoteAggregate, UserTrustScore, VoteAnomaly
-from app.schemas.fan_voting import FanVoteCreate, FanVoteUpdate
+from sqlalchemy import select, func, and_, delete, insert, values, column, Text, Uuid
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.models.category import Category
+from app.models.entity import Entity
+from app.models.fan_voting import FanVote, FanVoteVersion, FanVoteAggregate, FanVoteBucket, VoteAnomaly
+from app.repositories.bulk import bulk_upsert, dialect_insert
+from app.services.dirty_scores import dirty_score_service
+from app.services.trust_scores import trust_score_service
+from app.services.vote_anomalies import vote_anomaly_detector
+from app.services.fan_aggregate_deltas import (
+    AggregateDelta, AggregateKey, BUCKET_RETENTION, DAY, HOUR, bucket_start,
+)
+from app.services.fan_aggregate_queue import FanAggregateQueue
+from app.schemas.fan_voting import BallotRating, FanVoteCreate, FanVoteUpdate, FanAggregateReconcileReport
+
+if TYPE_CHECKING:
+    from app.services.jobs import JobContext
+
+FAN_SCORE_SCALE = 10.0  # mean rating 1-10 -> score 0-100
+RECONCILE_TOLERANCE = 1e-9
+RECONCILE_BATCH_SIZE = 5000
+
+
+def _aggregate_score(weighted_rating_sum: float, weight_sum: float) -> float:
+    return weighted_rating_sum / weight_sum * FAN_SCORE_SCALE if weight_sum else 0.0
+
+
+def _user_lock_key(user_id: UUID) -> int:
+    # pg_advisory_xact_lock takes a bigint; a shared key only serializes two users
+    return int.from_bytes(user_id.bytes[:8], "big", signed=True)
+
+
+def _aggregate_lock_key(category_id: UUID) -> int:
+    # Scoring locks a category on its last eight bytes; aggregates use the first
+    return int.from_bytes(category_id.bytes[:8], "big", signed=True)
 
 
 class FanVotingService:
     def calculate_trust_score(self, db: Session, user_id: UUID) -> float:
-        trust_obj = db.execute(
-            select(UserTrustScore).where(UserTrustScore.user_id == user_id)
-        ).scalar_one_or_none()
-        
-        if not trust_obj:
-            # Create baseline trust for new user
-            trust_obj = UserTrustScore(user_id=user_id, trust_score=1.0)
-            db.add(trust_obj)
-            db.commit()
-            db.refresh(trust_obj)
-            
-        return trust_obj.trust_score
+        """The user's trust score (cached); first-time users get a baseline row. Does not commit."""
+        return trust_score_service.get_trust_score(db, user_id)
 
-    def submit_vote(self, db: Session, user_id: UUID, vote_in: FanVoteCreate) -> FanVote:
-        # 1. Calculate weight
-        trust_score = self.calculate_trust_score(db, user_id)
-        # Simplified weight: trust_score * base (1.0)
-        weight = trust_score
+    def _upsert_votes_postgres(
+        self, db: Session, user_id: UUID, votes: List[FanVoteCreate], weight: float, source: Dict[str, Optional[str]]
+    ) -> List[Any]:
+        # FOR UPDATE below only locks votes that already exist: two concurrent
+        # first votes would both read no previous vote, and the one that loses
+        # the unique index race would be counted as new again. Serializing the
+        # user's vote writes lets each statement see the other's committed vote.
+        db.execute(select(func.pg_advisory_xact_lock(_user_lock_key(user_id))))
 
-        # 2. Check for existing vote
-        existing_vote = db.execute(
-            select(FanVote).where(
+        # One statement: lock and read the previous votes, upsert the new
+        # ones, archive the previous ratings, and return both.
+        votes_table, versions_table = FanVote.__table__, FanVoteVersion.__table__
+        incoming = values(
+            column("entity_id", Uuid), column("category_id", Uuid), column("reason", Text), name="incoming"
+        ).data([(v.entity_id, v.category_id, v.reason) for v in votes])
+        prev = (
+            select(
+                votes_table.c.id,
+                votes_table.c.rating,
+                votes_table.c.weight,
+                votes_table.c.updated_at,
+                incoming.c.reason,
+            )
+            .join(
+                incoming,
                 and_(
-                    FanVote.user_id == user_id,
-                    FanVote.entity_id == vote_in.entity_id,
-                    FanVote.category_id == vote_in.category_id
-                )
+                    votes_table.c.entity_id == incoming.c.entity_id,
+                    votes_table.c.category_id == incoming.c.category_id,
+                ),
+            )
+            .where(votes_table.c.user_id == user_id)
+            .with_for_update(of=votes_table)
+            .cte("prev")
+        )
+        stmt = postgresql.insert(votes_table).values([
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "entity_id": v.entity_id,
+                "category_id": v.category_id,
+                "rating": v.rating,
+                "weight": weight,
+                **source,
+            }
+            for v in votes
+        ])
+        upsert = stmt.on_conflict_do_update(
+            constraint="_user_entity_category_uc",
+            set_={
+                **{key: stmt.excluded[key] for key in ("rating", "weight", *source)},
+                "updated_at": func.now(),
+            },
+        ).returning(*votes_table.c).cte("upsert")
+        archived = insert(versions_table).from_select(
+            ["id", "fan_vote_id", "rating", "weight", "reason"],
+            select(func.gen_random_uuid(), prev.c.id, prev.c.rating, prev.c.weight, prev.c.reason),
+        ).cte("archived")
+        return db.execute(
+            select(
+                upsert,
+                prev.c.rating.label("old_rating"),
+                prev.c.weight.label("old_weight"),
+                prev.c.updated_at.label("old_updated_at"),
             )
-        ).scalar_one_or_none()
-
-        if existing_vote:
-            # Version the old vote
-            version = FanVoteVersion(
-                fan_vote_id=existing_vote.id,
-                rating=existing_vote.rating,
-                weight=existing_vote.weight,
-                reason=vote_in.reason
+            .select_from(upsert.outerjoin(prev, prev.c.id == upsert.c.id))
+            .add_cte(archived)
+        ).all()
+
+    def _upsert_votes_generic(
+        self, db: Session, user_id: UUID, votes: List[FanVoteCreate], weight: float, source: Dict[str, Optional[str]]
+    ) -> List[Any]:
+        # Same writes as the Postgres statement, for SQLite (tests), whose
+        # CTEs can't contain INSERTs.
+        keys = {(v.entity_id, v.category_id) for v in votes}
+        previous = {
+            (row.entity_id, row.category_id): row
+            for row in db.execute(
+                select(
+                    FanVote.id, FanVote.entity_id, FanVote.category_id, FanVote.rating, FanVote.weight,
+                    FanVote.updated_at,
+                )
+                .where(FanVote.user_id == user_id, FanVote.entity_id.in_({key[0] for key in keys}))
             )
-            db.add(version)
-            
-            # Update current vote
-            existing_vote.rating = vote_in.rating
-            existing_vote.weight = weight
-            db.add(existing_vote)
-            db_vote = existing_vote
+            if (row.entity_id, row.category_id) in keys
+        }
+        versions = [
+            {"id": uuid.uuid4(), "fan_vote_id": row.id, "rating": row.rating, "weight": row.weight, "reason": v.reason}
+            for v in votes
+            if (row := previous.get((v.entity_id, v.category_id)))
+        ]
+        if versions:
+            db.execute(insert(FanVoteVersion), versions)
+
+        table = FanVote.__table__
+        stmt = dialect_insert(db)(table).values([
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "entity_id": v.entity_id,
+                "category_id": v.category_id,
+                "rating": v.rating,
+                "weight": weight,
+                **source,
+            }
+            for v in votes
+        ])
+        written = db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["user_id", "entity_id", "category_id"],
+                set_={
+                    **{key: stmt.excluded[key] for key in ("rating", "weight", *source)},
+                    "updated_at": func.now(),
+                },
+            ).returning(*table.c)
+        ).all()
+        rows = []
+        for row in written:
+            old = previous.get((row.entity_id, row.category_id))
+            rows.append(SimpleNamespace(
+                **row._asdict(),
+                old_rating=old.rating if old else None,
+                old_weight=old.weight if old else None,
+                old_updated_at=old.updated_at if old else None,
+            ))
+        return rows
+
+    def upsert_votes(
+        self,
+        db: Session,
+        user_id: UUID,
+        votes: List[FanVoteCreate],
+        weight: float,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ) -> List[Tuple[FanVote, AggregateDelta]]:
+        """
+        Writes a user's votes with INSERT ... ON CONFLICT DO UPDATE, archiving
+        each replaced rating into fan_vote_versions. On Postgres this is a
+        single statement, after a per-user transaction advisory lock held
+        until commit. (entity, category) pairs must be unique. Returns
+        each vote with its aggregate delta. Does not commit.
+        """
+        if not votes:
+            return []
+        source = {"ip_address": ip_address, "user_agent": user_agent}
+        source = {key: value for key, value in source.items() if value is not None}
+        if db.get_bind().dialect.name == "postgresql":
+            rows = self._upsert_votes_postgres(db, user_id, votes, weight, source)
         else:
-            # Create new vote
-            db_vote = FanVote(
-                user_id=user_id,
-                entity_id=vote_in.entity_id,
-                category_id=vote_in.category_id,
-                rating=vote_in.rating,
-                weight=weight
+            rows = self._upsert_votes_generic(db, user_id, votes, weight, source)
+
+        written = []
+        for row in rows:
+            fields = {column.key: getattr(row, column.key) for column in FanVote.__table__.c}
+            vote = FanVote(**fields)
+            make_transient_to_detached(vote)
+            # Attach without a reload, refreshing an instance already in the session
+            vote = db.merge(vote, load=False)
+            delta = AggregateDelta.for_vote(
+                row.rating, row.weight, row.updated_at, row.old_rating, row.old_weight, row.old_updated_at
             )
-            db.add(db_vote)
-        
-        db.commit()
-        db.refresh(db_vote)
-        
-        # 3. Trigger aggregate update (async in production, sync for now)
-        self.update_aggregate(db, vote_in.entity_id, vote_in.category_id)
-        
-        return db_vote
+            written.append((vote, delta))
+        return written
 
-    def update_aggregate(self, db: Session, entity_id: UUID, category_id: UUID):
-        # Calculate weighted average
-        votes_query = select(FanVote).where(
-            and_(
-                FanVote.entity_id == entity_id,
-                FanVote.category_id == category_id
+    def _commit_votes(
+        self,
+        db: Session,
+        deltas: Dict[AggregateKey, AggregateDelta],
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ) -> None:
+        """
+        Commits the votes, with their aggregate deltas applied inline or
+        queued, and feeds them to the anomaly detector.
+        """
+        if fan_aggregate_queue.running:
+            db.commit()
+            # Only committed votes reach the aggregate
+            for key, delta in deltas.items():
+                fan_aggregate_queue.enqueue(key, delta)
+        else:
+            self.apply_vote_deltas(db, deltas)
+            db.commit()
+
+        for entity_id, _ in deltas:
+            vote_anomaly_detector.observe(entity_id, ip_address, user_agent)
+        if not vote_anomaly_detector.running:
+            vote_anomaly_detector.tick()
+            if vote_anomaly_detector.has_pending:
+                vote_anomaly_detector.flush(db)
+
+    def submit_vote(
+        self,
+        db: Session,
+        user_id: UUID,
+        vote_in: FanVoteCreate,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ) -> FanVote:
+        # Simplified weight: trust_score * base (1.0)
+        weight = self.calculate_trust_score(db, user_id)
+        [(vote, delta)] = self.upsert_votes(db, user_id, [vote_in], weight, ip_address, user_agent)
+        self._commit_votes(db, {(vote.entity_id, vote.category_id): delta}, ip_address, user_agent)
+        return vote
+
+    def submit_ballot(
+        self,
+        db: Session,
+        user_id: UUID,
+        category_id: UUID,
+        ratings: List[BallotRating],
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ) -> List[FanVote]:
+        """
+        Casts many ratings in one category at once: the entities are checked
+        with one query, the votes written with one upsert and each entity's
+        aggregate updated once. Nothing is written unless every rating is valid.
+        """
+        entity_ids = [r.entity_id for r in ratings]
+        if len(set(entity_ids)) != len(entity_ids):
+            raise ValueError("A ballot can rate each GOAT only once")
+        found = set(db.execute(
+            select(Entity.id).where(
+                Entity.id.in_(entity_ids),
+                Entity.category_id == category_id,
+                Entity.deleted_at.is_(None),
             )
+        ).scalars())
+        invalid = [str(entity_id) for entity_id in entity_ids if entity_id not in found]
+        if invalid:
+            raise ValueError(f"GOATs do not belong to this category: {', '.join(invalid)}")
+
+        weight = self.calculate_trust_score(db, user_id)
+        votes = [
+            FanVoteCreate(entity_id=r.entity_id, category_id=category_id, rating=r.rating, reason=r.reason)
+            for r in ratings
+        ]
+        written = self.upsert_votes(db, user_id, votes, weight, ip_address, user_agent)
+        self._commit_votes(
+            db, {(vote.entity_id, vote.category_id): delta for vote, delta in written}, ip_address, user_agent
         )
-        votes = db.execute(votes_query).scalars().all()
-        
-        if not votes:
+        return [vote for vote, _ in written]
+
+    def apply_vote_deltas(self, db: Session, deltas: Dict[AggregateKey, AggregateDelta]) -> None:
+        """
+        Adjusts the running sums (lifetime and decayed) of each (entity,
+        category) aggregate and its hourly and daily buckets by the deltas,
+        with one multi-row INSERT ... ON CONFLICT DO UPDATE per table, so
+        concurrent votes never overwrite each other's totals. Deltas of
+        entities deleted since their votes were cast are skipped; the votes
+        went with them. Does not commit.
+        """
+        existing = set(db.execute(
+            select(Entity.id).where(Entity.id.in_({entity_id for entity_id, _ in deltas}))
+        ).scalars()) if deltas else set()
+        deltas = {key: delta for key, delta in deltas.items() if key[0] in existing}
+        if not deltas:
             return
+        self._lock_aggregates(db, {category_id for _, category_id in deltas})
+        table = FanVoteAggregate.__table__
+        stmt = dialect_insert(db)(table).values([
+            {
+                "id": uuid.uuid4(),
+                "entity_id": entity_id,
+                "category_id": category_id,
+                "weighted_rating_sum": delta.weighted_rating_sum,
+                "weight_sum": delta.weight_sum,
+                "vote_count": delta.vote_count,
+                "aggregate_score": _aggregate_score(delta.weighted_rating_sum, delta.weight_sum),
+                "decayed_weighted_rating_sum": delta.decayed_weighted_rating_sum,
+                "decayed_weight_sum": delta.decayed_weight_sum,
+                "decayed_score": _aggregate_score(delta.decayed_weighted_rating_sum, delta.decayed_weight_sum),
+            }
+            for (entity_id, category_id), delta in deltas.items()
+        ])
+        weighted_rating_sum = table.c.weighted_rating_sum + stmt.excluded.weighted_rating_sum
+        weight_sum = table.c.weight_sum + stmt.excluded.weight_sum
+        decayed_weighted_rating_sum = table.c.decayed_weighted_rating_sum + stmt.excluded.decayed_weighted_rating_sum
+        decayed_weight_sum = table.c.decayed_weight_sum + stmt.excluded.decayed_weight_sum
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["entity_id", "category_id"],
+            set_={
+                "weighted_rating_sum": weighted_rating_sum,
+                "weight_sum": weight_sum,
+                "vote_count": table.c.vote_count + stmt.excluded.vote_count,
+                "aggregate_score": func.coalesce(
+                    weighted_rating_sum / func.nullif(weight_sum, 0) * FAN_SCORE_SCALE, 0.0
+                ),
+                "decayed_weighted_rating_sum": decayed_weighted_rating_sum,
+                "decayed_weight_sum": decayed_weight_sum,
+                "decayed_score": func.coalesce(
+                    decayed_weighted_rating_sum / func.nullif(decayed_weight_sum, 0) * FAN_SCORE_SCALE, 0.0
+                ),
+                "last_updated": func.now(),
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
+        self._apply_bucket_deltas(db, deltas)
+        dirty_score_service.mark_dirty(db, {entity_id for entity_id, _ in deltas}, reason="fan_aggregate")
 
-        total_weighted_rating = sum(v.rating * v.weight for v in votes)
-        total_weight = sum(v.weight for v in votes)
-        
-        if total_weight == 0:
+    def _apply_bucket_deltas(self, db: Session, deltas: Dict[AggregateKey, AggregateDelta]) -> None:
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "entity_id": entity_id,
+                "category_id": category_id,
+                "granularity": granularity,
+                "bucket_start": start,
+                "weighted_rating_sum": weighted_rating,
+                "weight_sum": weight,
+                "vote_count": count,
+            }
+            for (entity_id, category_id), delta in deltas.items()
+            for (granularity, start), (weighted_rating, weight, count) in delta.buckets.items()
+        ]
+        if not rows:
             return
+        table = FanVoteBucket.__table__
+        stmt = dialect_insert(db)(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["entity_id", "category_id", "granularity", "bucket_start"],
+            set_={
+                "weighted_rating_sum": table.c.weighted_rating_sum + stmt.excluded.weighted_rating_sum,
+                "weight_sum": table.c.weight_sum + stmt.excluded.weight_sum,
+                "vote_count": table.c.vote_count + stmt.excluded.vote_count,
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
 
-        avg_score = (total_weighted_rating / total_weight) * 10 # Scale 1-10 to 0-100
-        
-        aggregate = db.execute(
-            select(FanVoteAggregate).where(
-                and_(
-                    FanVoteAggregate.entity_id == entity_id,
-                    FanVoteAggregate.category_id == category_id
-                )
-            )
-        ).scalar_one_or_none()
-        
-        if aggregate:
-            aggregate.aggregate_score = avg_score
-            aggregate.vote_count = len(votes)
-        else:
-            aggregate = FanVoteAggregate(
-                entity_id=entity_id,
-                category_id=category_id,
-                aggregate_score=avg_score,
-                vote_count=len(votes)
+    def _lock_aggregates(self, db: Session, category_ids) -> None:
+        # A reconcile rewrites aggregates with absolute totals read from the
+        # votes; delta writes to the same categories wait for it, and it for
+        # them, until commit. Taken in id order so writers cannot deadlock.
+        if db.get_bind().dialect.name == "postgresql":
+            for category_id in sorted(category_ids):
+                db.execute(select(func.pg_advisory_xact_lock(_aggregate_lock_key(category_id))))
+
+    def flush_aggregate_queue(self) -> int:
+        """
+        Applies the aggregate deltas still queued in this process. Run before
+        a reconcile, which counts their committed votes already and would
+        otherwise have them added on top by the next flush.
+        """
+        return fan_aggregate_queue.flush()
+
+    def reconcile_aggregates(
+        self,
+        db: Session,
+        category_id: Optional[UUID] = None,
+        entity_ids: Optional[List[UUID]] = None,
+        context: Optional["JobContext"] = None,
+    ) -> FanAggregateReconcileReport:
+        """
+        Recomputes aggregates from fan_votes in one streamed pass and rewrites
+        those whose running sums (lifetime or decayed) drifted. Aggregates left
+        without votes are removed, and the hourly and daily buckets in scope
+        are rebuilt, which also drops expired ones. A job ``context`` is
+        checked for cancellation after each streamed batch. Vote deltas are
+        held off the categories in scope until commit; flush the aggregate
+        queue first (``flush_aggregate_queue``). Does not commit.
+        """
+        self._lock_aggregates(
+            db, [category_id] if category_id else db.execute(select(Category.id)).scalars().all()
+        )
+        votes = select(
+            FanVote.entity_id, FanVote.category_id, FanVote.rating, FanVote.weight, FanVote.updated_at
+        ).execution_options(yield_per=RECONCILE_BATCH_SIZE)
+        stored = select(FanVoteAggregate)
+        buckets = delete(FanVoteBucket)
+        if category_id:
+            votes = votes.where(FanVote.category_id == category_id)
+            stored = stored.where(FanVoteAggregate.category_id == category_id)
+            buckets = buckets.where(FanVoteBucket.category_id == category_id)
+        if entity_ids is not None:
+            votes = votes.where(FanVote.entity_id.in_(entity_ids))
+            stored = stored.where(FanVoteAggregate.entity_id.in_(entity_ids))
+            buckets = buckets.where(FanVoteBucket.entity_id.in_(entity_ids))
+
+        expected: Dict[AggregateKey, AggregateDelta] = {}
+        for i, row in enumerate(db.execute(votes), 1):
+            if context and i % RECONCILE_BATCH_SIZE == 0:
+                context.check_cancelled()
+                context.progress(0.0, f"{i} votes read")
+            key = (row.entity_id, row.category_id)
+            delta = expected.get(key)
+            if delta is None:
+                delta = expected[key] = AggregateDelta()
+            delta.add(row.rating, row.weight, row.updated_at)
+        current = {(agg.entity_id, agg.category_id): agg for agg in db.execute(stored).scalars()}
+
+        rows = []
+        for (entity_id, category_id_), delta in expected.items():
+            agg = current.get((entity_id, category_id_))
+            if agg is not None and agg.vote_count == delta.vote_count and all(
+                math.isclose(getattr(agg, name), getattr(delta, name), rel_tol=RECONCILE_TOLERANCE)
+                for name in ("weighted_rating_sum", "weight_sum", "decayed_weighted_rating_sum", "decayed_weight_sum")
+            ):
+                continue
+            rows.append({
+                "id": agg.id if agg is not None else uuid.uuid4(),
+                "entity_id": entity_id,
+                "category_id": category_id_,
+                "weighted_rating_sum": delta.weighted_rating_sum,
+                "weight_sum": delta.weight_sum,
+                "vote_count": delta.vote_count,
+                "aggregate_score": _aggregate_score(delta.weighted_rating_sum, delta.weight_sum),
+                "decayed_weighted_rating_sum": delta.decayed_weighted_rating_sum,
+                "decayed_weight_sum": delta.decayed_weight_sum,
+                "decayed_score": _aggregate_score(delta.decayed_weighted_rating_sum, delta.decayed_weight_sum),
+                "last_updated": func.now(),
+            })
+        orphaned = [agg.id for key, agg in current.items() if key not in expected]
+
+        bulk_upsert(
+            db,
+            FanVoteAggregate,
+            rows,
+            conflict_columns=("entity_id", "category_id"),
+            update_columns=(
+                "weighted_rating_sum", "weight_sum", "vote_count", "aggregate_score",
+                "decayed_weighted_rating_sum", "decayed_weight_sum", "decayed_score", "last_updated",
+            ),
+            constraint="_entity_category_aggregate_uc",
+        )
+        if orphaned:
+            db.execute(delete(FanVoteAggregate).where(FanVoteAggregate.id.in_(orphaned)))
+
+        db.execute(buckets)
+        bucket_rows = [
+            {
+                "id": uuid.uuid4(),
+                "entity_id": entity_id,
+                "category_id": category_id_,
+                "granularity": granularity,
+                "bucket_start": start,
+                "weighted_rating_sum": weighted_rating,
+                "weight_sum": weight,
+                "vote_count": count,
+            }
+            for (entity_id, category_id_), delta in expected.items()
+            for (granularity, start), (weighted_rating, weight, count) in delta.buckets.items()
+        ]
+        for i in range(0, len(bucket_rows), RECONCILE_BATCH_SIZE):
+            db.execute(insert(FanVoteBucket), bucket_rows[i:i + RECONCILE_BATCH_SIZE])
+
+        changed = {row["entity_id"] for row in rows} | {key[0] for key in current if key not in expected}
+        dirty_score_service.mark_dirty(db, changed, reason="fan_aggregate")
+        return FanAggregateReconcileReport(
+            checked=len(expected), corrected=len(rows), removed=len(orphaned), buckets=len(bucket_rows)
+        )
+
+    def get_windowed_aggregate(
+        self, db: Session, entity_id: UUID, category_id: UUID, window: timedelta
+    ) -> Tuple[Optional[float], int]:
+        """
+        The weighted mean score (0-100) and number of votes cast on an entity
+        within the trailing window, summed from hourly buckets for windows up
+        to two days and from daily buckets beyond. Bucket edges make the window
+        start up to one bucket early. Returns (None, 0) without votes.
+        """
+        granularity = HOUR if window <= timedelta(days=2) else DAY
+        if window > BUCKET_RETENTION[granularity]:
+            raise ValueError(f"Windows are limited to {BUCKET_RETENTION[DAY].days} days")
+        since = bucket_start(datetime.now(timezone.utc) - window, granularity)
+        weighted_rating_sum, weight_sum, vote_count = db.execute(
+            select(
+                func.coalesce(func.sum(FanVoteBucket.weighted_rating_sum), 0.0),
+                func.coalesce(func.sum(FanVoteBucket.weight_sum), 0.0),
+                func.coalesce(func.sum(FanVoteBucket.vote_count), 0),
+            ).where(
+                FanVoteBucket.entity_id == entity_id,
+                FanVoteBucket.category_id == category_id,
+                FanVoteBucket.granularity == granularity,
+                FanVoteBucket.bucket_start >= since,
             )
-        
-        db.add(aggregate)
+        ).one()
+        if not vote_count:
+            return None, 0
+        return _aggregate_score(weighted_rating_sum, weight_sum), int(vote_count)
+
+    def update_aggregate(self, db: Session, entity_id: UUID, category_id: UUID):
+        """Recomputes one (entity, category) aggregate from its votes."""
+        self.reconcile_aggregates(db, category_id=category_id, entity_ids=[entity_id])
         db.commit()
 
+
 fan_voting_service = FanVotingService()
+fan_aggregate_queue = FanAggregateQueue(fan_voting_service.apply_vote_deltas)
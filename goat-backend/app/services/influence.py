@@ -1,123 +1,287 @@
+import hashlib
 import math
-from typing import List, Optional, Dict, Any
+import time
+import uuid
+from typing import Iterable, List, Optional, Dict, Any, TYPE_CHECKING
 from uuid import UUID
-from datetime import datetime
-from sqlalchemy import select, func, and_, distinct
+from datetime import datetime, timezone
+from sqlalchemy import select, func, case, delete, distinct
 from sqlalchemy.orm import Session
-from app.models.influence import InfluenceSource, InfluenceEvent, InfluenceModel, InfluenceScore
+from app.models.influence import (
+    DirtyInfluenceEntity, InfluenceSource, InfluenceEvent, InfluenceModel, InfluenceScore,
+)
 from app.models.entity import Entity
 from app.models.scoring import FinalScore
+from app.repositories.bulk import bulk_upsert
+from app.schemas.influence import InfluenceBatchReport
+from app.services.dirty_scores import dirty_score_service
 
-class InfluenceService:
-    def calculate_influence_score(self, db: Session, entity_id: UUID, model_id: UUID) -> InfluenceScore:
-        """
-        Calculates the influence score for an entity based on the given model.
-        """
-        model = db.get(InfluenceModel, model_id)
-        if not model:
-            raise ValueError("Influence model not found")
+if TYPE_CHECKING:
+    from app.services.jobs import JobContext
 
-        # Get all events for this entity
-        events = db.execute(
-            select(InfluenceEvent).where(InfluenceEvent.entity_id == entity_id)
-        ).scalars().all()
-
-        if not events:
-            return self._create_empty_score(db, entity_id, model_id)
-
-        # 1. Breadth Score: Number of distinct sources / domains
-        # Simplified: distinct source types + distinct sources
-        distinct_sources = set(e.source_id for e in events)
-        breadth_raw = len(distinct_sources)
-        breadth_score = min(100.0, breadth_raw * 10.0) # Cap at 10 sources for max score
-
-        # 2. Depth Score: Weighted sum of events
-        depth_raw = sum(e.weight for e in events)
-        # Logarithmic scaling for depth to handle power laws
-        depth_score = min(100.0, math.log(depth_raw + 1) * 20.0)
-
-        # 3. Longevity Score: Time span of influence
-        dates = [e.event_date for e in events if e.event_date]
-        if dates:
-            min_date = min(dates)
-            max_date = max(dates)
-            years_active = (max_date - min_date).days / 365.25
-            longevity_score = min(100.0, years_active * 5.0) # 20 years = 100 score
-        else:
-            longevity_score = 0.0
-
-        # 4. Peer Score: Mentions by other high-ranking entities
-        # For now, we simulate this by looking for "peer_mention" event types
-        peer_events = [e for e in events if e.event_type == "peer_mention"]
-        peer_raw = sum(e.weight for e in peer_events)
-        peer_score = min(100.0, peer_raw * 25.0)
-
-        # Calculate Total Weighted Score
-        weights = model.weights
-        total_score = (
-            (breadth_score * weights.get("breadth", 0.25)) +
-            (depth_score * weights.get("depth", 0.25)) +
-            (longevity_score * weights.get("longevity", 0.25)) +
-            (peer_score * weights.get("peer", 0.25))
-        )
+PEER_EVENT_TYPE = "peer_mention"
+# Entities whose scores are compared and upserted per round trip
+WRITE_BATCH_SIZE = 5000
+SCORE_COLUMNS = (
+    "breadth_score", "depth_score", "longevity_score", "peer_score",
+    "total_score", "confidence_score", "breakdown", "explanation",
+)
 
-        # Confidence Score: Based on data density and source credibility
-        avg_credibility = sum(e.source.credibility_score for e in events) / len(events) if events else 0
-        data_density_factor = min(1.0, len(events) / 10.0)
-        confidence_score = avg_credibility * data_density_factor
-
-        # Create or Update Score
-        score_obj = db.execute(
-            select(InfluenceScore).where(
-                and_(
-                    InfluenceScore.entity_id == entity_id,
-                    InfluenceScore.influence_model_id == model_id
-                )
-            )
-        ).scalar_one_or_none()
 
-        if not score_obj:
-            score_obj = InfluenceScore(
-                entity_id=entity_id,
-                influence_model_id=model_id
-            )
-            db.add(score_obj)
-
-        score_obj.breadth_score = breadth_score
-        score_obj.depth_score = depth_score
-        score_obj.longevity_score = longevity_score
-        score_obj.peer_score = peer_score
-        score_obj.total_score = total_score
-        score_obj.confidence_score = confidence_score
-        score_obj.breakdown = {
+def event_content_hash(
+    entity_id: UUID, source_id: UUID, event_type: str, event_date: Optional[datetime], description: str
+) -> str:
+    """
+    Identity of an event for deduplication: the same mention of an entity
+    by a source on the same (UTC) day. Mirrored in SQL by the migration that
+    backfilled existing events.
+    """
+    if event_date is not None:
+        utc = event_date.replace(tzinfo=timezone.utc) if event_date.tzinfo is None else event_date.astimezone(timezone.utc)
+        day = utc.date().isoformat()
+    else:
+        day = ""
+    canonical = "\x1f".join((str(entity_id), str(source_id), event_type, day, description))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _score_columns(stats: Any, weights: Dict[str, float]) -> Dict[str, Any]:
+    """InfluenceScore column values from one entity's grouped event stats."""
+    if not stats.event_count:
+        return {
+            "breadth_score": 0.0,
+            "depth_score": 0.0,
+            "longevity_score": 0.0,
+            "peer_score": 0.0,
+            "total_score": 0.0,
+            "confidence_score": 0.0,
+            "breakdown": {},
+            "explanation": "No influence events found.",
+        }
+
+    # 1. Breadth Score: Number of distinct sources
+    breadth_score = min(100.0, stats.source_count * 10.0) # Cap at 10 sources for max score
+
+    # 2. Depth Score: Weighted sum of events
+    # Logarithmic scaling for depth to handle power laws
+    depth_score = min(100.0, math.log(stats.weight_sum + 1) * 20.0)
+
+    # 3. Longevity Score: Time span of influence
+    if stats.first_event_date and stats.last_event_date:
+        years_active = (stats.last_event_date - stats.first_event_date).days / 365.25
+        longevity_score = min(100.0, years_active * 5.0) # 20 years = 100 score
+    else:
+        longevity_score = 0.0
+
+    # 4. Peer Score: Mentions by other high-ranking entities
+    # For now, we simulate this by looking for "peer_mention" event types
+    peer_score = min(100.0, stats.peer_weight_sum * 25.0)
+
+    # Calculate Total Weighted Score
+    total_score = (
+        (breadth_score * weights.get("breadth", 0.25)) +
+        (depth_score * weights.get("depth", 0.25)) +
+        (longevity_score * weights.get("longevity", 0.25)) +
+        (peer_score * weights.get("peer", 0.25))
+    )
+
+    # Confidence Score: Based on data density and source credibility
+    data_density_factor = min(1.0, stats.event_count / 10.0)
+    confidence_score = (stats.avg_credibility or 0.0) * data_density_factor
+
+    return {
+        "breadth_score": breadth_score,
+        "depth_score": depth_score,
+        "longevity_score": longevity_score,
+        "peer_score": peer_score,
+        "total_score": total_score,
+        "confidence_score": confidence_score,
+        "breakdown": {
             "breadth": breadth_score,
             "depth": depth_score,
             "longevity": longevity_score,
             "peer": peer_score,
-            "event_count": len(events)
-        }
-        score_obj.explanation = (
-            f"Influence calculated from {len(events)} events. "
+            "event_count": stats.event_count,
+        },
+        "explanation": (
+            f"Influence calculated from {stats.event_count} events. "
             f"Breadth: {breadth_score:.1f}, Depth: {depth_score:.1f}, "
             f"Longevity: {longevity_score:.1f}, Peer: {peer_score:.1f}."
+        ),
+    }
+
+
+class InfluenceService:
+    def _event_stats_query(self):
+        """
+        Breadth, depth, longevity, peer and credibility inputs per entity,
+        aggregated in SQL with the sources joined in. Entities without events
+        get a row of zeros.
+        """
+        return (
+            select(
+                Entity.id.label("entity_id"),
+                func.count(InfluenceEvent.id).label("event_count"),
+                func.count(distinct(InfluenceEvent.source_id)).label("source_count"),
+                func.coalesce(func.sum(InfluenceEvent.weight), 0.0).label("weight_sum"),
+                func.min(InfluenceEvent.event_date).label("first_event_date"),
+                func.max(InfluenceEvent.event_date).label("last_event_date"),
+                func.coalesce(
+                    func.sum(case((InfluenceEvent.event_type == PEER_EVENT_TYPE, InfluenceEvent.weight), else_=0.0)),
+                    0.0,
+                ).label("peer_weight_sum"),
+                func.avg(InfluenceSource.credibility_score).label("avg_credibility"),
+            )
+            .select_from(Entity)
+            .outerjoin(InfluenceEvent, InfluenceEvent.entity_id == Entity.id)
+            .outerjoin(InfluenceSource, InfluenceSource.id == InfluenceEvent.source_id)
+            .group_by(Entity.id)
         )
 
+    def _write_scores(self, db: Session, model: InfluenceModel, stats_rows: List[Any]) -> List[UUID]:
+        """
+        Upserts the scores computed from ``stats_rows`` where they changed
+        and marks those entities for re-scoring. Returns the changed entity ids.
+        """
+        current = {
+            row.entity_id: row
+            for row in db.execute(
+                select(
+                    InfluenceScore.entity_id,
+                    InfluenceScore.total_score,
+                    InfluenceScore.confidence_score,
+                    InfluenceScore.breakdown,
+                ).where(
+                    InfluenceScore.influence_model_id == model.id,
+                    InfluenceScore.entity_id.in_([row.entity_id for row in stats_rows]),
+                )
+            )
+        }
+        weights = model.weights or {}
+        rows = []
+        for stats in stats_rows:
+            columns = _score_columns(stats, weights)
+            existing = current.get(stats.entity_id)
+            if existing is not None and (existing.total_score, existing.confidence_score, existing.breakdown) == (
+                columns["total_score"], columns["confidence_score"], columns["breakdown"]
+            ):
+                continue
+            rows.append({
+                "id": uuid.uuid4(),
+                "entity_id": stats.entity_id,
+                "influence_model_id": model.id,
+                **columns,
+            })
+
+        bulk_upsert(
+            db,
+            InfluenceScore,
+            rows,
+            conflict_columns=("entity_id", "influence_model_id"),
+            update_columns=SCORE_COLUMNS,
+            constraint="_entity_model_uc",
+        )
+        changed = [row["entity_id"] for row in rows]
+        dirty_score_service.mark_dirty(db, changed, reason="influence_score")
+        return changed
+
+    def mark_dirty(self, db: Session, entity_ids: Iterable[UUID], reason: Optional[str] = None) -> int:
+        """
+        Marks entities for re-scoring by every influence model of their
+        category, so ``calculate_model_scores(dirty_only=True)`` picks them
+        up. Does not commit.
+        """
+        entity_ids = set(entity_ids)
+        if not entity_ids:
+            return 0
+        pairs = db.execute(
+            select(Entity.id, InfluenceModel.id)
+            .join(InfluenceModel, InfluenceModel.category_id == Entity.category_id)
+            .where(Entity.id.in_(entity_ids), InfluenceModel.deleted_at.is_(None))
+        ).all()
+        return bulk_upsert(
+            db,
+            DirtyInfluenceEntity,
+            [
+                {"id": uuid.uuid4(), "entity_id": entity_id, "influence_model_id": model_id, "reason": reason}
+                for entity_id, model_id in pairs
+            ],
+            conflict_columns=("entity_id", "influence_model_id"),
+            update_columns=("reason",),
+            constraint="uq_influence_dirty_entity_model",
+        )
+
+    def _claim_dirty(self, db: Session, model_id: UUID) -> List[UUID]:
+        # Locked until the caller commits, like DirtyScoreService.claim_dirty
+        dirty = db.execute(
+            select(DirtyInfluenceEntity.id, DirtyInfluenceEntity.entity_id)
+            .where(DirtyInfluenceEntity.influence_model_id == model_id)
+            .with_for_update()
+        ).all()
+        if dirty:
+            db.execute(delete(DirtyInfluenceEntity).where(DirtyInfluenceEntity.id.in_([row.id for row in dirty])))
+        return [row.entity_id for row in dirty]
+
+    def calculate_influence_score(self, db: Session, entity_id: UUID, model_id: UUID) -> InfluenceScore:
+        """
+        Calculates the influence score for an entity based on the given model.
+        """
+        model = db.get(InfluenceModel, model_id)
+        if not model:
+            raise ValueError("Influence model not found")
+
+        stats = db.execute(self._event_stats_query().where(Entity.id == entity_id)).one_or_none()
+        if stats is None:
+            raise ValueError("Entity not found")
+        self._write_scores(db, model, [stats])
         db.commit()
-        db.refresh(score_obj)
-        return score_obj
-
-    def _create_empty_score(self, db: Session, entity_id: UUID, model_id: UUID) -> InfluenceScore:
-        score = InfluenceScore(
-            entity_id=entity_id,
-            influence_model_id=model_id,
-            total_score=0.0,
-            confidence_score=0.0,
-            breakdown={},
-            explanation="No influence events found."
+        return db.execute(
+            select(InfluenceScore)
+            .where(InfluenceScore.entity_id == entity_id, InfluenceScore.influence_model_id == model_id)
+            .execution_options(populate_existing=True)
+        ).scalar_one()
+
+    def calculate_model_scores(
+        self,
+        db: Session,
+        model_id: UUID,
+        dirty_only: bool = False,
+        context: Optional["JobContext"] = None,
+    ) -> InfluenceBatchReport:
+        """
+        Scores every entity in the influence model's category, or with
+        ``dirty_only`` just those marked since their last scoring: the event
+        inputs come from one grouped query joined to influence_sources, and
+        changed scores are written with a bulk upsert per batch of entities.
+        A job ``context`` gets progress and is checked for cancellation
+        between batches. Commits once, at the end.
+        """
+        started = time.perf_counter()
+        model = db.get(InfluenceModel, model_id)
+        if not model:
+            raise ValueError("Influence model not found")
+
+        query = self._event_stats_query().where(
+            Entity.category_id == model.category_id,
+            Entity.deleted_at.is_(None),
         )
-        db.add(score)
+        if dirty_only:
+            query = query.where(Entity.id.in_(self._claim_dirty(db, model.id)))
+        stats_rows = db.execute(query).all()
+        changed = []
+        for start in range(0, len(stats_rows), WRITE_BATCH_SIZE):
+            if context:
+                context.check_cancelled()
+                context.progress(start / len(stats_rows), f"{start}/{len(stats_rows)} entities scored")
+            changed.extend(self._write_scores(db, model, stats_rows[start:start + WRITE_BATCH_SIZE]))
         db.commit()
-        db.refresh(score)
-        return score
+        return InfluenceBatchReport(
+            influence_model_id=model.id,
+            category_id=model.category_id,
+            entities_scored=len(stats_rows),
+            entities_changed=len(changed),
+            entities_without_events=sum(1 for row in stats_rows if not row.event_count),
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
 
 influence_service = InfluenceService()
@@ -0,0 +1,150 @@
+import json
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.models.entity import Entity
+from app.models.influence import InfluenceEvent, InfluenceSource
+from app.repositories.bulk import dialect_insert
+from app.schemas.influence import (
+    InfluenceEventCreate, InfluenceEventIngestError, InfluenceEventIngestReport, InfluenceEventBatchStats,
+)
+from app.services.influence import event_content_hash, influence_service
+from app.services.line_records import LineRecordReader, ParsedRow, batched
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+
+class InfluenceEventIngestService:
+    """
+    Bulk influence event loading from NDJSON or CSV, chunk by chunk. Events
+    are deduplicated by content hash against a unique index (INSERT ... ON
+    CONFLICT DO NOTHING), so re-sending a crawl is harmless. The index covers
+    soft-deleted events too, so they count as duplicates and stay deleted.
+    Each chunk is committed on its own and marks its entities for influence
+    re-scoring.
+    """
+
+    def _add_error(self, report: InfluenceEventIngestReport, line: int, error: str) -> None:
+        report.failed += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(InfluenceEventIngestError(line=line, error=error))
+        else:
+            report.errors_truncated = True
+
+    def _validate(
+        self, db: Session, rows: List[ParsedRow], report: InfluenceEventIngestReport
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        events: List[Tuple[int, InfluenceEventCreate]] = []
+        for line, fields, error in rows:
+            if error:
+                self._add_error(report, line, error)
+                continue
+            try:
+                if isinstance(fields.get("metadata_json"), str):
+                    # CSV cells carry the evidence as JSON text
+                    fields["metadata_json"] = json.loads(fields["metadata_json"])
+                events.append((line, InfluenceEventCreate.model_validate(fields)))
+            except json.JSONDecodeError as e:
+                self._add_error(report, line, f"metadata_json: Invalid JSON: {e.msg}")
+            except ValidationError as e:
+                problems = "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                self._add_error(report, line, problems)
+        if not events:
+            return []
+
+        entity_ids = set(db.execute(
+            select(Entity.id).where(Entity.id.in_({e.entity_id for _, e in events}))
+        ).scalars())
+        source_ids = set(db.execute(
+            select(InfluenceSource.id).where(InfluenceSource.id.in_({e.source_id for _, e in events}))
+        ).scalars())
+
+        valid = []
+        for line, event in events:
+            if event.entity_id not in entity_ids:
+                self._add_error(report, line, "Entity not found")
+            elif event.source_id not in source_ids:
+                self._add_error(report, line, "Influence source not found")
+            else:
+                valid.append((line, {
+                    "id": uuid.uuid4(),
+                    "content_hash": event_content_hash(
+                        event.entity_id, event.source_id, event.event_type, event.event_date, event.description
+                    ),
+                    **event.model_dump(),
+                }))
+        return valid
+
+    def ingest_rows(self, db: Session, rows: List[ParsedRow], report: InfluenceEventIngestReport) -> None:
+        """
+        Validates, deduplicates and loads one chunk of parsed rows, updating
+        ``report``. Commits the chunk.
+        """
+        started = time.perf_counter()
+        failed_before = report.failed
+        report.received += len(rows)
+        valid = self._validate(db, rows, report)
+
+        inserted = 0
+        if valid:
+            # Repeats within the chunk collapse to their first occurrence
+            unique = list({event["content_hash"]: event for _, event in reversed(valid)}.values())
+            table = InfluenceEvent.__table__
+            stmt = (
+                dialect_insert(db)(table)
+                .on_conflict_do_nothing(index_elements=["content_hash"])
+                .returning(table.c.entity_id)
+            )
+            try:
+                written = db.execute(stmt, unique).scalars().all()
+                influence_service.mark_dirty(db, written, reason="influence_event")
+                db.commit()
+            except SQLAlchemyError:
+                db.rollback()
+                for line, _ in valid:
+                    self._add_error(report, line, "Database error, chunk not loaded")
+                valid, written = [], []
+            inserted = len(written)
+            report._marked.update(written)
+
+        duplicates = len(valid) - inserted
+        report.inserted += inserted
+        report.duplicates += duplicates
+        report.entities_marked = len(report._marked)
+        report.batches.append(InfluenceEventBatchStats(
+            batch=len(report.batches) + 1,
+            received=len(rows),
+            inserted=inserted,
+            duplicates=duplicates,
+            failed=report.failed - failed_before,
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+        ))
+
+    def ingest(
+        self,
+        db: Session,
+        lines: Iterable[str],
+        fmt: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> InfluenceEventIngestReport:
+        """
+        Loads influence events from NDJSON or CSV text lines, chunk by chunk.
+        Quoted CSV cells, such as descriptions, may span lines.
+        """
+        reader = LineRecordReader(fmt)
+        report = InfluenceEventIngestReport()
+        for batch in batched(lines, chunk_size):
+            self.ingest_rows(db, reader.read(batch), report)
+        if leftover := reader.finish():
+            self.ingest_rows(db, leftover, report)
+        return report
+
+
+influence_event_ingest_service = InfluenceEventIngestService()
@@ -0,0 +1,393 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import (
+    BackgroundJob,
+    ACTIVE_JOB_STATUSES,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    JOB_FAILED,
+    JOB_CANCELLED,
+)
+from app.services.era import era_service
+from app.services.fan_voting import fan_voting_service
+from app.services.influence import influence_service
+from app.services.score_all import score_all_service
+from app.services.scoring import scoring_service
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_DELAY_SECONDS = 2.0
+# Failures that a retry won't fix (missing rows, invalid input)
+PERMANENT_ERRORS = (ValueError,)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobContext:
+    """
+    Handed to job handlers for progress reporting and cancellation checks.
+    Writes go through a separate session so they are visible while the
+    handler's own transaction is still open.
+    """
+
+    def __init__(self, job_id: UUID, status_db: Session):
+        self.job_id = job_id
+        self.status_db = status_db
+
+    def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        self.status_db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == self.job_id)
+            .values(progress=max(0.0, min(1.0, fraction)), progress_message=message, heartbeat_at=_now())
+        )
+        self.status_db.commit()
+
+    def check_cancelled(self) -> None:
+        requested = self.status_db.execute(
+            select(BackgroundJob.cancel_requested).where(BackgroundJob.id == self.job_id)
+        ).scalar_one()
+        if requested:
+            raise JobCancelled()
+
+
+JobHandler = Callable[[Session, Dict[str, Any], JobContext], Optional[Dict[str, Any]]]
+
+
+class JobRunner:
+    """
+    In-process background jobs: rows in ``background_jobs`` executed by a
+    thread pool. Claiming is a conditional UPDATE, so several app processes
+    can share the table without running a job twice.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self.handlers: Dict[str, JobHandler] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def register(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        def decorator(handler: JobHandler) -> JobHandler:
+            self.handlers[kind] = handler
+            return handler
+        return decorator
+
+    def start(self, workers: Optional[int] = None) -> None:
+        """
+        Starts the worker pool, re-queues jobs whose worker stopped sending
+        heartbeats and dispatches everything queued.
+        """
+        workers = settings.JOB_WORKERS if workers is None else workers
+        with self._lock:
+            if workers <= 0 or self._executor:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-worker")
+
+        db = self.session_factory()
+        try:
+            stale_before = _now() - timedelta(seconds=settings.JOB_STALE_AFTER_SECONDS)
+            db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.status == JOB_RUNNING, BackgroundJob.heartbeat_at < stale_before)
+                .values(status=JOB_QUEUED)
+            )
+            db.commit()
+            queued = db.execute(
+                select(BackgroundJob.id)
+                .where(BackgroundJob.status == JOB_QUEUED)
+                .order_by(BackgroundJob.created_at)
+            ).scalars().all()
+        finally:
+            db.close()
+        for job_id in queued:
+            self._dispatch(job_id)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            # Running jobs finish; anything still queued is picked up on next start
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch(self, job_id: UUID) -> None:
+        with self._lock:
+            if self._executor:
+                self._executor.submit(self.run_job, job_id)
+
+    def _active_job(self, db: Session, dedup_key: str) -> Optional[BackgroundJob]:
+        return db.execute(
+            select(BackgroundJob).where(
+                BackgroundJob.dedup_key == dedup_key,
+                BackgroundJob.status.in_(ACTIVE_JOB_STATUSES),
+            )
+        ).scalar_one_or_none()
+
+    def enqueue(
+        self,
+        db: Session,
+        kind: str,
+        params: Dict[str, Any],
+        *,
+        dedup_key: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        created_by: Optional[UUID] = None,
+    ) -> BackgroundJob:
+        """
+        Queues a job and hands it to the worker pool. When a queued or running
+        job already holds ``dedup_key``, that job is returned instead.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if dedup_key:
+            existing = self._active_job(db, dedup_key)
+            if existing:
+                return existing
+
+        job = BackgroundJob(
+            kind=kind,
+            params=params,
+            dedup_key=dedup_key,
+            status=JOB_QUEUED,
+            progress=0.0,
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            cancel_requested=False,
+            created_by=created_by,
+        )
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Lost the race for the dedup key to a concurrent request
+            db.rollback()
+            existing = self._active_job(db, dedup_key) if dedup_key else None
+            if existing:
+                return existing
+            raise
+        db.refresh(job)
+        self._dispatch(job.id)
+        return job
+
+    def get(self, db: Session, job_id: UUID) -> Optional[BackgroundJob]:
+        return db.get(BackgroundJob, job_id)
+
+    def list_jobs(
+        self,
+        db: Session,
+        status: Optional[str] = None,
+        kind: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[BackgroundJob]:
+        query = select(BackgroundJob).order_by(BackgroundJob.created_at.desc())
+        if status:
+            query = query.where(BackgroundJob.status == status)
+        if kind:
+            query = query.where(BackgroundJob.kind == kind)
+        return db.execute(query.offset(skip).limit(limit)).scalars().all()
+
+    def cancel(self, db: Session, job_id: UUID) -> BackgroundJob:
+        """
+        Cancels a queued job outright. A running job is flagged and stops at
+        its handler's next cancellation check.
+        """
+        job = db.get(BackgroundJob, job_id)
+        if not job:
+            raise ValueError("Job not found")
+        if job.status in ACTIVE_JOB_STATUSES:
+            job.cancel_requested = True
+            if job.status == JOB_QUEUED:
+                job.status = JOB_CANCELLED
+                job.finished_at = _now()
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def _heartbeat(self, job_id: UUID, stop: threading.Event) -> None:
+        # Keeps a long handler from looking stale to start(); on its own
+        # session, as the worker thread's sessions are busy with the handler
+        while not stop.wait(settings.JOB_HEARTBEAT_INTERVAL_SECONDS):
+            db = self.session_factory()
+            try:
+                db.execute(
+                    update(BackgroundJob)
+                    .where(BackgroundJob.id == job_id, BackgroundJob.status == JOB_RUNNING)
+                    .values(heartbeat_at=_now())
+                )
+                db.commit()
+            except Exception:
+                logger.exception(f"Heartbeat for job {job_id} failed")
+            finally:
+                db.close()
+
+    def _finish(self, status_db: Session, job_id: UUID, **values: Any) -> None:
+        status_db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id)
+            .values(finished_at=_now(), **values)
+        )
+        status_db.commit()
+
+    def run_job(self, job_id: UUID, db: Optional[Session] = None) -> Optional[BackgroundJob]:
+        """
+        Claims a queued job and runs its handler. Called by the worker pool;
+        passing ``db`` runs the job inline on that session. Returns None when
+        the job was no longer queued.
+        """
+        own_sessions = db is None
+        if own_sessions:
+            db = self.session_factory()
+            status_db = self.session_factory()
+        else:
+            status_db = db
+
+        try:
+            claimed = status_db.execute(
+                update(BackgroundJob)
+                .where(
+                    BackgroundJob.id == job_id,
+                    BackgroundJob.status == JOB_QUEUED,
+                    BackgroundJob.cancel_requested == False,
+                )
+                .values(
+                    status=JOB_RUNNING,
+                    attempts=BackgroundJob.attempts + 1,
+                    started_at=_now(),
+                    heartbeat_at=_now(),
+                )
+            ).rowcount
+            status_db.commit()
+            if not claimed:
+                return None
+
+            job = status_db.get(BackgroundJob, job_id)
+            status_db.refresh(job)
+            context = JobContext(job_id, status_db)
+            stop_heartbeat = threading.Event()
+            heartbeat = threading.Thread(
+                target=self._heartbeat, args=(job_id, stop_heartbeat), name=f"job-heartbeat-{job_id}", daemon=True
+            )
+            heartbeat.start()
+            try:
+                result = self.handlers[job.kind](db, dict(job.params), context)
+                db.commit()
+            except JobCancelled:
+                db.rollback()
+                self._finish(status_db, job_id, status=JOB_CANCELLED)
+            except Exception as e:
+                db.rollback()
+                logger.exception(f"Job {job_id} ({job.kind}) failed on attempt {job.attempts}")
+                if isinstance(e, PERMANENT_ERRORS) or job.attempts >= job.max_attempts:
+                    self._finish(status_db, job_id, status=JOB_FAILED, error=str(e))
+                else:
+                    status_db.execute(
+                        update(BackgroundJob)
+                        .where(BackgroundJob.id == job_id)
+                        .values(status=JOB_QUEUED, error=str(e))
+                    )
+                    status_db.commit()
+                    delay = RETRY_BASE_DELAY_SECONDS * 2 ** (job.attempts - 1)
+                    timer = threading.Timer(delay, self._dispatch, args=(job_id,))
+                    timer.daemon = True
+                    timer.start()
+            else:
+                self._finish(
+                    status_db, job_id,
+                    status=JOB_SUCCEEDED, result=result, error=None, progress=1.0,
+                )
+            finally:
+                stop_heartbeat.set()
+                heartbeat.join()
+
+            status_db.refresh(job)
+            return job
+        finally:
+            if own_sessions:
+                db.close()
+                status_db.close()
+
+
+job_runner = JobRunner()
+
+
+@job_runner.register("scoring.run")
+def _run_scoring(db: Session, params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    context.check_cancelled()
+    context.progress(0.0, "Scoring category")
+    summary = scoring_service.score_category(db, category_id=UUID(params["category_id"]), context=context)
+    return summary.model_dump(mode="json")
+
+
+@job_runner.register("scoring.incremental")
+def _run_incremental_scoring(db: Session, params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    context.check_cancelled()
+    context.progress(0.0, "Re-scoring changed entities")
+    summary = scoring_service.score_dirty(db, category_id=UUID(params["category_id"]), context=context)
+    return summary.model_dump(mode="json")
+
+
+@job_runner.register("scoring.run_all")
+def _run_scoring_all(db: Session, params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    context.check_cancelled()
+    context.progress(0.0, "Scoring all categories")
+    report = score_all_service.score_all(db, max_workers=params.get("max_workers"), context=context)
+    return report.model_dump(mode="json")
+
+
+@job_runner.register("era.recalculate")
+def _recalculate_era_factors(db: Session, params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    context.check_cancelled()
+    context.progress(0.0, "Recalculating era factors")
+    if params.get("category_id"):
+        written = era_service.calculate_category_era_factors(db, UUID(params["category_id"]), context=context)
+        return {"category_id": params["category_id"], "factors": written}
+    written = era_service.calculate_era_factors(db, UUID(params["era_id"]), context=context)
+    return {"era_id": params["era_id"], "factors": written}
+
+
+@job_runner.register("fan_votes.reconcile")
+def _reconcile_fan_aggregates(db: Session, params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    context.check_cancelled()
+    context.progress(0.0, "Reconciling fan vote aggregates")
+    fan_voting_service.flush_aggregate_queue()
+    category_id = params.get("category_id")
+    report = fan_voting_service.reconcile_aggregates(
+        db, category_id=UUID(category_id) if category_id else None, context=context
+    )
+    return report.model_dump(mode="json")
+
+
+@job_runner.register("influence.calculate")
+def _calculate_influence(db: Session, params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    context.check_cancelled()
+    context.progress(0.0, "Calculating influence score")
+    score = influence_service.calculate_influence_score(
+        db, UUID(params["entity_id"]), UUID(params["model_id"])
+    )
+    return {"influence_score_id": str(score.id), "total_score": score.total_score}
+
+
+@job_runner.register("influence.calculate_model")
+def _calculate_model_influence(db: Session, params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    context.check_cancelled()
+    context.progress(0.0, "Calculating influence scores")
+    report = influence_service.calculate_model_scores(
+        db, UUID(params["model_id"]), dirty_only=params.get("dirty_only", False), context=context
+    )
+    return report.model_dump(mode="json")
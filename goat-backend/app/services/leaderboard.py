@@ -0,0 +1,115 @@
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import select, func, delete, insert
+from sqlalchemy.orm import Session
+from app.models.entity import Entity
+from app.models.scoring import FinalScore, LeaderboardEntry, ScoringModel
+
+
+class LeaderboardService:
+    """
+    Maintains and serves ``leaderboard_entries``: FinalScores ranked per
+    (category, scoring model), rebuilt set-based after each scoring run.
+    """
+
+    def refresh(self, db: Session, category_id: UUID, scoring_model_id: UUID) -> int:
+        """
+        Re-ranks the model's FinalScores for the category in one
+        INSERT ... SELECT. Ties are broken by entity id so every rank is
+        unique. Does not commit; returns the number of ranked entities.
+        """
+        rank = func.row_number().over(
+            order_by=(FinalScore.score.desc(), FinalScore.entity_id)
+        )
+        ranked = (
+            select(
+                FinalScore.id,
+                Entity.category_id,
+                FinalScore.scoring_model_id,
+                FinalScore.entity_id,
+                rank,
+                FinalScore.score,
+                Entity.name,
+                Entity.slug,
+                Entity.image_url,
+            )
+            .join(Entity, FinalScore.entity_id == Entity.id)
+            .where(
+                FinalScore.scoring_model_id == scoring_model_id,
+                Entity.category_id == category_id,
+                Entity.deleted_at.is_(None),
+            )
+        )
+
+        db.execute(
+            delete(LeaderboardEntry).where(
+                LeaderboardEntry.category_id == category_id,
+                LeaderboardEntry.scoring_model_id == scoring_model_id,
+            )
+        )
+        result = db.execute(
+            insert(LeaderboardEntry).from_select(
+                [
+                    "id", "category_id", "scoring_model_id", "entity_id", "rank", "score",
+                    "entity_name", "entity_slug", "entity_image_url",
+                ],
+                ranked,
+            )
+        )
+        return result.rowcount
+
+    def resolve_model_id(
+        self, db: Session, category_id: UUID, scoring_model_id: Optional[UUID] = None
+    ) -> UUID:
+        """The given scoring model if it belongs to the category, else the active one."""
+        query = select(ScoringModel.id).where(ScoringModel.category_id == category_id)
+        if scoring_model_id:
+            query = query.where(ScoringModel.id == scoring_model_id)
+        else:
+            query = query.where(ScoringModel.is_active == True)
+        model_id = db.execute(query).scalars().first()
+        if not model_id:
+            raise ValueError("No active scoring model found for this category")
+        return model_id
+
+    def get_page(
+        self,
+        db: Session,
+        category_id: UUID,
+        scoring_model_id: UUID,
+        after_rank: int = 0,
+        limit: int = 50,
+    ) -> List[LeaderboardEntry]:
+        """Keyset page: the ``limit`` entries ranked after ``after_rank``."""
+        return db.execute(
+            select(LeaderboardEntry)
+            .where(
+                LeaderboardEntry.category_id == category_id,
+                LeaderboardEntry.scoring_model_id == scoring_model_id,
+                LeaderboardEntry.rank > after_rank,
+            )
+            .order_by(LeaderboardEntry.rank)
+            .limit(limit)
+        ).scalars().all()
+
+    def get_entity_rank(
+        self, db: Session, scoring_model_id: UUID, entity_id: UUID
+    ) -> Optional[LeaderboardEntry]:
+        return db.execute(
+            select(LeaderboardEntry).where(
+                LeaderboardEntry.scoring_model_id == scoring_model_id,
+                LeaderboardEntry.entity_id == entity_id,
+            )
+        ).scalar_one_or_none()
+
+    def count(self, db: Session, category_id: UUID, scoring_model_id: UUID) -> int:
+        # Ranks are contiguous from 1, so the highest rank is the count
+        return db.execute(
+            select(func.coalesce(func.max(LeaderboardEntry.rank), 0)).where(
+                LeaderboardEntry.category_id == category_id,
+                LeaderboardEntry.scoring_model_id == scoring_model_id,
+            )
+        ).scalar_one()
+
+
+leaderboard_service = LeaderboardService()
@@ -0,0 +1,126 @@
+"""
+Line-oriented NDJSON and CSV records for the bulk ingest endpoints and
+scripts: batching of text lines or a streamed request body, and an
+incremental parser yielding one (line number, fields, error) per record.
+
+NDJSON records are one per line. A CSV record is one line unless a quoted
+cell spans line breaks, as free-text cells may; such a record is reported
+under the line it starts on.
+"""
+import csv
+import json
+from itertools import islice
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SUPPORTED_FORMATS = ("ndjson", "csv")
+CONTENT_TYPE_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+# A quoted CSV cell still open after this much text is taken to be unterminated
+MAX_RECORD_CHARS = 1_000_000
+
+# (line number, parsed fields, parse error)
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def format_for_content_type(content_type: Optional[str]) -> Optional[str]:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return CONTENT_TYPE_FORMATS.get(media_type)
+
+
+def batched(lines: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Splits lines into batches of at most ``size``."""
+    it = iter(lines)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+async def stream_line_batches(chunks: AsyncIterable[bytes], size: int) -> AsyncIterator[List[str]]:
+    """Splits a streamed request body into batches of at most ``size`` lines."""
+    buffer = b""
+    batch: List[str] = []
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            batch.append(line.decode("utf-8", errors="replace"))
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if buffer:
+        batch.append(buffer.decode("utf-8", errors="replace"))
+    if batch:
+        yield batch
+
+
+class LineRecordReader:
+    """
+    Incremental NDJSON/CSV parser. Lines can be fed in any number of
+    batches; line numbers, the CSV header and a CSV record still inside a
+    quoted cell carry over. Call ``finish`` after the last batch.
+    """
+
+    def __init__(self, fmt: str):
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        self.fmt = fmt
+        self.line = 0
+        self.header: Optional[List[str]] = None
+        self._partial: Optional[str] = None  # CSV record inside a quoted cell
+        self._partial_line = 0
+
+    def _parse_ndjson(self, line: int, text: str) -> ParsedRow:
+        try:
+            fields = json.loads(text)
+        except json.JSONDecodeError as e:
+            return line, None, f"Invalid JSON: {e.msg}"
+        if not isinstance(fields, dict):
+            return line, None, "Expected a JSON object"
+        return line, fields, None
+
+    def _parse_csv(self, line: int, text: str) -> Optional[ParsedRow]:
+        values = next(csv.reader([text]))
+        if self.header is None:
+            self.header = [value.strip() for value in values]
+            return None
+        if len(values) != len(self.header):
+            return line, None, f"Expected {len(self.header)} columns, got {len(values)}"
+        # An empty cell means the field was not given (e.g. no era)
+        return line, {key: value for key, value in zip(self.header, values) if value != ""}, None
+
+    def read(self, lines: Iterable[str]) -> List[ParsedRow]:
+        parsed = []
+        for text in lines:
+            self.line += 1
+            if self._partial is not None:
+                # Inside a quoted cell the line break and spacing are content
+                line, text = self._partial_line, self._partial + "\n" + text.rstrip("\r\n")
+                self._partial = None
+            else:
+                line, text = self.line, text.strip()
+                if not text:
+                    continue
+            if self.fmt == "ndjson":
+                parsed.append(self._parse_ndjson(line, text))
+                continue
+            # Quotes are doubled inside quoted cells, so an odd count leaves one open
+            if text.count('"') % 2:
+                if len(text) > MAX_RECORD_CHARS:
+                    parsed.append((line, None, "Unterminated quoted field"))
+                else:
+                    self._partial, self._partial_line = text, line
+                continue
+            row = self._parse_csv(line, text)
+            if row:
+                parsed.append(row)
+        return parsed
+
+    def finish(self) -> List[ParsedRow]:
+        """Rows left over at the end of the input: a CSV record whose quoted cell never closed."""
+        if self._partial is None:
+            return []
+        line, self._partial = self._partial_line, None
+        return [(line, None, "Unterminated quoted field")]
@@ -0,0 +1,302 @@
+"""
+Ranking snapshots in packed columnar form.
+
+A snapshot stores its ranking as fixed-width little-endian arrays in rank
+order (entity ids, scores, breakdown rows) plus a UTF-8 names blob indexed
+by an offsets array. Breakdown keys are stored once per snapshot rather than
+once per entity. Because every array is fixed width, a page of entries is
+read by fetching byte ranges with ``substr`` instead of loading the blobs.
+On Postgres the blob columns use EXTERNAL (uncompressed) storage so that a
+range read only touches the TOAST chunks it covers.
+"""
+import math
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.models.scoring import FinalScore, LeaderboardEntry, RankingSnapshot
+from app.schemas.scoring import SnapshotDiff, SnapshotDiffEntry
+from app.services.leaderboard import leaderboard_service
+
+UUID_BYTES = 16
+SCORE_DTYPE = np.dtype("<f8")
+OFFSET_DTYPE = np.dtype("<u4")
+DIFF_CACHE_SIZE = 128
+
+# entity_id -> (rank, score, entity_name)
+Ranking = Dict[UUID, Tuple[int, float, str]]
+
+
+def pack_entries(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Packs rank-ordered entries (entity_id, entity_name, score, breakdown) into
+    the RankingSnapshot column values.
+    """
+    keys: List[str] = []
+    key_index: Dict[str, int] = {}
+    for entry in entries:
+        for key in entry["breakdown"]:
+            if key not in key_index:
+                key_index[key] = len(keys)
+                keys.append(key)
+
+    breakdowns = np.full((len(entries), len(keys)), np.nan, dtype=SCORE_DTYPE)
+    names = bytearray()
+    offsets = np.zeros(len(entries) + 1, dtype=OFFSET_DTYPE)
+    for i, entry in enumerate(entries):
+        for key, value in entry["breakdown"].items():
+            breakdowns[i, key_index[key]] = value
+        names += entry["entity_name"].encode("utf-8")
+        offsets[i + 1] = len(names)
+
+    return {
+        "entry_count": len(entries),
+        "entity_ids": b"".join(entry["entity_id"].bytes for entry in entries),
+        "scores": np.array([entry["score"] for entry in entries], dtype=SCORE_DTYPE).tobytes(),
+        "name_offsets": offsets.tobytes(),
+        "names": bytes(names),
+        "breakdown_keys": keys,
+        "breakdown_values": breakdowns.tobytes(),
+    }
+
+
+def _byte_range(column, start: int, length: int):
+    # substr is 1-based on both Postgres (bytea) and SQLite (blob)
+    return func.substr(column, start + 1, length)
+
+
+class RankingSnapshotService:
+    def __init__(self):
+        # Snapshots are immutable, so a diff between two of them never changes
+        self._diff_cache: "OrderedDict[Tuple[UUID, UUID], SnapshotDiff]" = OrderedDict()
+        self._diff_cache_lock = threading.Lock()
+
+    def create(
+        self, db: Session, category_id: UUID, label: str, scoring_model_id: Optional[UUID] = None
+    ) -> RankingSnapshot:
+        """
+        Snapshots the current leaderboard of a scoring model (the category's
+        active one by default), read with a single query.
+        """
+        model_id = leaderboard_service.resolve_model_id(db, category_id, scoring_model_id)
+        rows = db.execute(
+            select(
+                LeaderboardEntry.entity_id,
+                LeaderboardEntry.entity_name,
+                LeaderboardEntry.score,
+                FinalScore.breakdown,
+            )
+            .join(
+                FinalScore,
+                (FinalScore.entity_id == LeaderboardEntry.entity_id)
+                & (FinalScore.scoring_model_id == LeaderboardEntry.scoring_model_id),
+            )
+            .where(
+                LeaderboardEntry.category_id == category_id,
+                LeaderboardEntry.scoring_model_id == model_id,
+            )
+            .order_by(LeaderboardEntry.rank)
+        ).all()
+        if not rows:
+            raise ValueError("No scores found to create a snapshot for this category")
+
+        snapshot = RankingSnapshot(
+            id=uuid.uuid4(),
+            category_id=category_id,
+            scoring_model_id=model_id,
+            label=label,
+            **pack_entries([row._asdict() for row in rows]),
+        )
+        db.add(snapshot)
+        db.commit()
+        db.refresh(snapshot)
+        return snapshot
+
+    def get(self, db: Session, snapshot_id: UUID) -> RankingSnapshot:
+        snapshot = db.get(RankingSnapshot, snapshot_id)
+        if not snapshot:
+            raise ValueError("Snapshot not found")
+        return snapshot
+
+    def exists(self, db: Session, snapshot_id: UUID) -> bool:
+        return db.execute(
+            select(RankingSnapshot.id).where(RankingSnapshot.id == snapshot_id)
+        ).first() is not None
+
+    def get_entries(
+        self, db: Session, snapshot: RankingSnapshot, offset: int = 0, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns entries ``offset + 1`` to ``offset + limit`` by rank, reading
+        only those byte ranges of the packed columns.
+        """
+        offset = max(0, min(offset, snapshot.entry_count))
+        limit = max(0, min(limit, snapshot.entry_count - offset))
+        if not limit:
+            return []
+        if snapshot.breakdown_keys is None:
+            # Created before snapshots were packed
+            return [
+                {"rank": offset + i + 1, "entity_id": None, **entry}
+                for i, entry in enumerate((snapshot.snapshot_data or [])[offset:offset + limit])
+            ]
+
+        n_keys = len(snapshot.breakdown_keys)
+        row = db.execute(
+            select(
+                _byte_range(RankingSnapshot.entity_ids, offset * UUID_BYTES, limit * UUID_BYTES),
+                _byte_range(RankingSnapshot.scores, offset * SCORE_DTYPE.itemsize, limit * SCORE_DTYPE.itemsize),
+                _byte_range(
+                    RankingSnapshot.name_offsets, offset * OFFSET_DTYPE.itemsize, (limit + 1) * OFFSET_DTYPE.itemsize
+                ),
+                _byte_range(
+                    RankingSnapshot.breakdown_values,
+                    offset * n_keys * SCORE_DTYPE.itemsize,
+                    limit * n_keys * SCORE_DTYPE.itemsize,
+                ),
+            ).where(RankingSnapshot.id == snapshot.id)
+        ).one()
+        entity_ids, scores, name_offsets, breakdown_values = (bytes(col or b"") for col in row)
+
+        offsets = np.frombuffer(name_offsets, dtype=OFFSET_DTYPE)
+        names = bytes(db.execute(
+            select(
+                _byte_range(RankingSnapshot.names, int(offsets[0]), int(offsets[-1] - offsets[0]))
+            ).where(RankingSnapshot.id == snapshot.id)
+        ).scalar_one() or b"")
+        scores = np.frombuffer(scores, dtype=SCORE_DTYPE)
+        breakdowns = np.frombuffer(breakdown_values, dtype=SCORE_DTYPE).reshape(limit, n_keys)
+
+        entries = []
+        for i in range(limit):
+            start, end = int(offsets[i] - offsets[0]), int(offsets[i + 1] - offsets[0])
+            entries.append({
+                "rank": offset + i + 1,
+                "entity_id": UUID(bytes=entity_ids[i * UUID_BYTES:(i + 1) * UUID_BYTES]),
+                "entity_name": names[start:end].decode("utf-8"),
+                "score": float(scores[i]),
+                "breakdown": {
+                    key: float(value)
+                    for key, value in zip(snapshot.breakdown_keys, breakdowns[i])
+                    if not math.isnan(value)
+                },
+            })
+        return entries
+
+    def _load_ranking(self, db: Session, snapshot: RankingSnapshot) -> Ranking:
+        if snapshot.breakdown_keys is None:
+            raise ValueError("Snapshot predates recorded entity ids and cannot be diffed")
+        entity_ids, scores, name_offsets, names = db.execute(
+            select(
+                RankingSnapshot.entity_ids,
+                RankingSnapshot.scores,
+                RankingSnapshot.name_offsets,
+                RankingSnapshot.names,
+            ).where(RankingSnapshot.id == snapshot.id)
+        ).one()
+        entity_ids, names = bytes(entity_ids or b""), bytes(names or b"")
+        scores = np.frombuffer(bytes(scores or b""), dtype=SCORE_DTYPE)
+        offsets = np.frombuffer(bytes(name_offsets or b""), dtype=OFFSET_DTYPE)
+        return {
+            UUID(bytes=entity_ids[i * UUID_BYTES:(i + 1) * UUID_BYTES]): (
+                i + 1,
+                float(scores[i]),
+                names[offsets[i]:offsets[i + 1]].decode("utf-8"),
+            )
+            for i in range(snapshot.entry_count)
+        }
+
+    def _load_live_ranking(self, db: Session, category_id: UUID, scoring_model_id: UUID) -> Ranking:
+        rows = db.execute(
+            select(
+                LeaderboardEntry.entity_id,
+                LeaderboardEntry.rank,
+                LeaderboardEntry.score,
+                LeaderboardEntry.entity_name,
+            ).where(
+                LeaderboardEntry.category_id == category_id,
+                LeaderboardEntry.scoring_model_id == scoring_model_id,
+            )
+        ).all()
+        return {row.entity_id: (row.rank, row.score, row.entity_name) for row in rows}
+
+    def _diff_rankings(self, before: Ranking, after: Ranking) -> Dict[str, Any]:
+        movers, entrants, exits = [], [], []
+        unchanged = 0
+        for entity_id, (new_rank, new_score, name) in after.items():
+            old = before.get(entity_id)
+            if old is None:
+                entrants.append(SnapshotDiffEntry(
+                    entity_id=entity_id, entity_name=name, new_rank=new_rank, new_score=new_score,
+                ))
+                continue
+            old_rank, old_score, _ = old
+            if old_rank == new_rank and old_score == new_score:
+                unchanged += 1
+                continue
+            movers.append(SnapshotDiffEntry(
+                entity_id=entity_id,
+                entity_name=name,
+                old_rank=old_rank,
+                new_rank=new_rank,
+                rank_change=old_rank - new_rank,
+                old_score=old_score,
+                new_score=new_score,
+                score_change=new_score - old_score,
+            ))
+        for entity_id, (old_rank, old_score, name) in before.items():
+            if entity_id not in after:
+                exits.append(SnapshotDiffEntry(
+                    entity_id=entity_id, entity_name=name, old_rank=old_rank, old_score=old_score,
+                ))
+
+        movers.sort(key=lambda e: (-abs(e.rank_change), e.new_rank))
+        entrants.sort(key=lambda e: e.new_rank)
+        exits.sort(key=lambda e: e.old_rank)
+        return {"movers": movers, "entrants": entrants, "exits": exits, "unchanged_count": unchanged}
+
+    def diff(self, db: Session, from_snapshot_id: UUID, to_snapshot_id: Optional[UUID] = None) -> SnapshotDiff:
+        """
+        Rank and score movement from one snapshot to another, or to the live
+        leaderboard of the snapshot's scoring model when ``to_snapshot_id`` is
+        omitted. Both sides are hashed on entity id. Snapshot-to-snapshot
+        diffs are cached.
+        """
+        key = (from_snapshot_id, to_snapshot_id)
+        if to_snapshot_id is not None:
+            with self._diff_cache_lock:
+                cached = self._diff_cache.get(key)
+                if cached is not None:
+                    self._diff_cache.move_to_end(key)
+                    return cached
+
+        before = self.get(db, from_snapshot_id)
+        if to_snapshot_id is None:
+            after_ranking = self._load_live_ranking(db, before.category_id, before.scoring_model_id)
+        else:
+            after = self.get(db, to_snapshot_id)
+            if after.category_id != before.category_id:
+                raise ValueError("Snapshots belong to different categories")
+            after_ranking = self._load_ranking(db, after)
+
+        result = SnapshotDiff(
+            from_snapshot_id=from_snapshot_id,
+            to_snapshot_id=to_snapshot_id,
+            category_id=before.category_id,
+            **self._diff_rankings(self._load_ranking(db, before), after_ranking),
+        )
+        if to_snapshot_id is not None:
+            with self._diff_cache_lock:
+                self._diff_cache[key] = result
+                while len(self._diff_cache) > DIFF_CACHE_SIZE:
+                    self._diff_cache.popitem(last=False)
+        return result
+
+
+ranking_snapshot_service = RankingSnapshotService()
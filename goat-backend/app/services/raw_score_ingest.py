@@ -0,0 +1,134 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.models.entity import Entity
+from app.models.era import Era
+from app.models.scoring import RawScore, ScoringComponent
+from app.schemas.scoring import RawScoreCreate, RawScoreIngestError, RawScoreIngestReport
+from app.services.component_stats import component_stats_service
+from app.services.dirty_scores import dirty_score_service
+from app.services.era_stats import era_stats_service
+from app.services.line_records import LineRecordReader, ParsedRow, batched
+from app.services.scoring import scoring_service
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+
+class RawScoreIngestService:
+    """
+    Bulk raw score loading. Each chunk is validated with one lookup query per
+    referenced table, written with multi-row inserts and committed on its
+    own, so a bad row or chunk never aborts the rest of the batch.
+    """
+
+    def _add_error(self, report: RawScoreIngestReport, line: int, error: str) -> None:
+        report.failed += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(RawScoreIngestError(line=line, error=error))
+        else:
+            report.errors_truncated = True
+
+    def _validate(
+        self, db: Session, rows: List[ParsedRow], report: RawScoreIngestReport
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        scores: List[Tuple[int, RawScoreCreate]] = []
+        for line, fields, error in rows:
+            if error:
+                self._add_error(report, line, error)
+                continue
+            try:
+                scores.append((line, RawScoreCreate.model_validate(fields)))
+            except ValidationError as e:
+                problems = "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                self._add_error(report, line, problems)
+        if not scores:
+            return []
+
+        entity_categories = dict(db.execute(
+            select(Entity.id, Entity.category_id).where(Entity.id.in_({s.entity_id for _, s in scores}))
+        ).all())
+        component_ids = set(db.execute(
+            select(ScoringComponent.id).where(ScoringComponent.id.in_({s.component_id for _, s in scores}))
+        ).scalars())
+        wanted_eras = {s.era_id for _, s in scores if s.era_id}
+        era_ids = set(db.execute(select(Era.id).where(Era.id.in_(wanted_eras))).scalars()) if wanted_eras else set()
+
+        valid = []
+        for line, score in scores:
+            if score.entity_id not in entity_categories:
+                self._add_error(report, line, "Entity not found")
+            elif score.component_id not in component_ids:
+                self._add_error(report, line, "Scoring component not found")
+            elif score.era_id and score.era_id not in era_ids:
+                self._add_error(report, line, "Era not found")
+            else:
+                valid.append((line, {
+                    "id": uuid.uuid4(),
+                    "category_id": entity_categories[score.entity_id],
+                    **score.model_dump(),
+                }))
+        return valid
+
+    def ingest_rows(self, db: Session, rows: List[ParsedRow], report: RawScoreIngestReport) -> None:
+        """
+        Validates and loads one chunk of parsed rows, updating ``report``.
+        Commits the chunk.
+        """
+        report.received += len(rows)
+        valid = self._validate(db, rows, report)
+        if not valid:
+            return
+
+        scores = [score for _, score in valid]
+        # One server-side now() would tie every row of the chunk, leaving
+        # repeats of an (entity, component) unordered in the history; step
+        # the timestamps in file order so the last line is the latest value
+        loaded_at = datetime.now(timezone.utc)
+        try:
+            component_stats_service.record_raw_scores(db, scores)
+            db.execute(
+                insert(RawScore),
+                [
+                    {
+                        **{key: value for key, value in score.items() if key != "category_id"},
+                        "created_at": loaded_at + timedelta(microseconds=i),
+                    }
+                    for i, score in enumerate(scores)
+                ],
+            )
+            scoring_service.record_latest_raw_scores(db, scores)
+            era_stats_service.record_raw_scores(db, scores)
+            dirty_score_service.mark_dirty(db, {score["entity_id"] for score in scores}, reason="raw_score")
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            for line, _ in valid:
+                self._add_error(report, line, "Database error, chunk not loaded")
+            return
+        report.inserted += len(valid)
+
+    def ingest(
+        self,
+        db: Session,
+        lines: Iterable[str],
+        fmt: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> RawScoreIngestReport:
+        """Loads raw scores from NDJSON or CSV text lines, chunk by chunk."""
+        reader = LineRecordReader(fmt)
+        report = RawScoreIngestReport()
+        for batch in batched(lines, chunk_size):
+            self.ingest_rows(db, reader.read(batch), report)
+        if leftover := reader.finish():
+            self.ingest_rows(db, leftover, report)
+        return report
+
+
+raw_score_ingest_service = RawScoreIngestService()
@@ -0,0 +1,161 @@
+"""
+Platform-wide rescoring: every category with an active scoring model is
+scored in its own worker process, each with its own engine and session.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, TYPE_CHECKING
+from uuid import UUID
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.database import _build_connect_args
+from app.models.scoring import ScoringModel
+from app.schemas.scoring import CategoryScoringResult, ScoreAllReport
+from app.services.scoring import scoring_service
+
+if TYPE_CHECKING:
+    from app.services.jobs import JobContext
+
+# Set once per worker process by _init_worker
+_worker_session_factory: Optional[sessionmaker] = None
+
+
+def _init_worker(database_url: str) -> None:
+    global _worker_session_factory
+    engine = create_engine(
+        database_url,
+        pool_pre_ping=True,
+        pool_size=1,
+        max_overflow=0,
+        connect_args=_build_connect_args(database_url),
+    )
+    _worker_session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _score_one(db: Session, category_id: UUID) -> CategoryScoringResult:
+    started = time.perf_counter()
+    try:
+        summary = scoring_service.score_category(db, category_id=category_id)
+    except Exception as e:
+        db.rollback()
+        return CategoryScoringResult(
+            category_id=category_id,
+            status="failed",
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
+            error=str(e),
+        )
+    return CategoryScoringResult(
+        category_id=category_id,
+        status="succeeded",
+        entities_scored=summary.entities_scored,
+        duration_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+
+
+def _score_in_worker(category_id: UUID) -> Dict:
+    db = _worker_session_factory()
+    try:
+        return _score_one(db, category_id).model_dump()
+    finally:
+        db.close()
+
+
+class ScoreAllService:
+    def category_ids(self, db: Session) -> List[UUID]:
+        """Categories with an active scoring model."""
+        return db.execute(
+            select(ScoringModel.category_id)
+            .where(ScoringModel.is_active == True, ScoringModel.deleted_at.is_(None))
+            .distinct()
+        ).scalars().all()
+
+    def worker_count(self, n_categories: int, max_workers: Optional[int] = None) -> int:
+        """
+        Worker processes to use: the requested or configured limit, capped by
+        the connection pool size and the number of cores and categories.
+        """
+        limit = max_workers or settings.SCORE_ALL_MAX_WORKERS
+        return max(1, min(limit, settings.DATABASE_POOL_SIZE, os.cpu_count() or 1, n_categories))
+
+    def score_all(
+        self,
+        db: Session,
+        category_ids: Optional[List[UUID]] = None,
+        max_workers: Optional[int] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        context: Optional["JobContext"] = None,
+    ) -> ScoreAllReport:
+        """
+        Runs a full scoring pass for each category and returns a combined
+        report. A failing category is recorded and does not stop the rest.
+        SQLite databases, and single-worker runs, are scored in-process on
+        ``db``. A job ``context`` gets progress after each category and is
+        checked for cancellation before the next; categories already scored
+        stay committed.
+        """
+        started = time.perf_counter()
+        if category_ids is None:
+            category_ids = self.category_ids(db)
+        workers = self.worker_count(len(category_ids), max_workers)
+        report = ScoreAllReport(workers=workers)
+
+        def collect(result: CategoryScoringResult) -> None:
+            report.categories.append(result)
+            if result.status == "succeeded":
+                report.succeeded += 1
+                report.entities_scored += result.entities_scored
+            else:
+                report.failed += 1
+            done = len(report.categories)
+            if on_progress:
+                on_progress(done, len(category_ids))
+            if context:
+                context.progress(done / len(category_ids), f"{done}/{len(category_ids)} categories scored")
+
+        database_url = settings.DATABASE_URL
+        if workers == 1 or database_url.startswith("sqlite"):
+            report.workers = 1
+            for category_id in category_ids:
+                if context:
+                    context.check_cancelled()
+                collect(_score_one(db, category_id))
+        else:
+            # Spawned, not forked: workers must not inherit this process's
+            # connections or the job runner's threads.
+            mp_context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp_context,
+                initializer=_init_worker,
+                initargs=(database_url,),
+            ) as executor:
+                futures = {
+                    executor.submit(_score_in_worker, category_id): category_id
+                    for category_id in category_ids
+                }
+                for future in as_completed(futures):
+                    try:
+                        result = CategoryScoringResult(**future.result())
+                    except Exception as e:
+                        result = CategoryScoringResult(
+                            category_id=futures[future], status="failed", error=str(e)
+                        )
+                    collect(result)
+                    if context:
+                        try:
+                            context.check_cancelled()
+                        except Exception:
+                            # Categories not yet started are dropped; running ones finish
+                            for pending in futures:
+                                pending.cancel()
+                            raise
+
+        report.categories.sort(key=lambda r: r.duration_ms or 0.0, reverse=True)
+        report.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        return report
+
+
+score_all_service = ScoreAllService()
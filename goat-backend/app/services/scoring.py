@@ -1,15 +1,35 @@
 import math
-from typing import List, Dict, Any, Optional, Tuple
+import time
+import uuid
+from typing import Iterable, List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from uuid import UUID
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, delete, insert
 from sqlalchemy.orm import Session
-from app.models.scoring import ScoringModel, ScoringComponent, ScoringWeight, RawScore, FinalScore, RankingSnapshot
+from app.core import score_explanations as codes
+from app.core.score_explanations import ExplanationCodes
+from app.models.scoring import ScoringModel, ScoringComponent, ScoringWeight, RawScore, LatestRawScore, FinalScore, RankingSnapshot
 from app.models.expert import ExpertVote
 from app.models.fan_voting import FanVoteAggregate
 from app.models.era import EraFactor
 from app.models.influence import InfluenceScore, InfluenceModel
 from app.models.entity import Entity
+from app.repositories.bulk import bulk_upsert
+from app.schemas.scoring import RawScoreCreate, ScoringRunSummary
+from app.services import scoring_kernel
+from app.services.scoring_kernel import ScoredEntity, ScoringInputs, fan_score
+from app.services.component_stats import component_stats_service
+from app.services.dirty_scores import dirty_score_service
+from app.services.era_stats import era_stats_service
 from app.services.expert import expert_service
+from app.services.leaderboard import leaderboard_service
+from app.services.ranking_snapshots import ranking_snapshot_service
+
+if TYPE_CHECKING:
+    from app.services.jobs import JobContext
+
+# Relative move in a component's stats, as a share of its value range, that
+# forces a full re-score instead of an incremental one.
+NORMALIZATION_DRIFT_TOLERANCE = 0.01
 
 
 class ScoringService:
@@ -68,35 +88,98 @@ class ScoringService:
     def _blend_score(self, base_score: float, overlay_score: float, weight: float) -> float:
         return (base_score * (1 - weight)) + (overlay_score * weight)
 
-    def _latest_raw_scores_subquery(self, entity_ids: List[UUID], component_ids: List[UUID]):
-        if not entity_ids or not component_ids:
-            return None
+    def record_latest_raw_scores(self, db: Session, raw_scores: List[Dict[str, Any]]) -> int:
+        """
+        Upserts latest_raw_scores from freshly inserted raw score rows (dicts
+        with id, entity_id, component_id, value, era_id), oldest first. Only
+        the last row per (entity, component) is kept. Does not commit.
+        """
+        latest: Dict[Tuple[UUID, UUID], Dict[str, Any]] = {}
+        for raw in raw_scores:
+            latest[(raw["entity_id"], raw["component_id"])] = {
+                "id": raw["id"],
+                "entity_id": raw["entity_id"],
+                "component_id": raw["component_id"],
+                "raw_score_id": raw["id"],
+                "value": raw["value"],
+                "era_id": raw["era_id"],
+            }
+        return bulk_upsert(
+            db,
+            LatestRawScore,
+            list(latest.values()),
+            conflict_columns=("entity_id", "component_id"),
+            update_columns=("raw_score_id", "value", "era_id"),
+            constraint="uq_latest_raw_scores_entity_component",
+        )
 
+    def submit_raw_score(self, db: Session, score_in: RawScoreCreate) -> RawScore:
+        """
+        Records a raw score in the history and as the entity's latest value
+        for the component, folding it into the component statistics and
+        marking the entity for re-scoring.
+        """
+        component_stats_service.record_raw_score(
+            db,
+            entity_id=score_in.entity_id,
+            component_id=score_in.component_id,
+            value=score_in.value,
+            era_id=score_in.era_id,
+        )
+        db_obj = RawScore(**score_in.model_dump())
+        db.add(db_obj)
+        db.flush()
+        self.record_latest_raw_scores(db, [{
+            "id": db_obj.id,
+            "entity_id": db_obj.entity_id,
+            "component_id": db_obj.component_id,
+            "value": db_obj.value,
+            "era_id": db_obj.era_id,
+        }])
+        era_stats_service.record_raw_scores(db, [score_in.model_dump()])
+        dirty_score_service.mark_dirty(db, [score_in.entity_id], reason="raw_score")
+        db.commit()
+        return db_obj
+
+    def rebuild_latest_raw_scores(self, db: Session, category_id: Optional[UUID] = None) -> int:
+        """
+        Recomputes latest_raw_scores from the raw score history, for one
+        category or for everything. Does not commit; returns the row count.
+        """
         rn = func.row_number().over(
             partition_by=(RawScore.entity_id, RawScore.component_id),
             order_by=RawScore.created_at.desc(),
         ).label("rn")
-
-        return (
-            select(
-                RawScore.entity_id.label("entity_id"),
-                RawScore.component_id.label("component_id"),
-                RawScore.value.label("value"),
-                RawScore.era_id.label("era_id"),
-                rn,
-            )
-            .where(
-                RawScore.entity_id.in_(entity_ids),
-                RawScore.component_id.in_(component_ids),
+        ranked = select(RawScore.id, RawScore.entity_id, RawScore.component_id, RawScore.value, RawScore.era_id, rn)
+        stale = delete(LatestRawScore)
+        if category_id:
+            entity_ids = select(Entity.id).where(Entity.category_id == category_id)
+            ranked = ranked.where(RawScore.entity_id.in_(entity_ids))
+            stale = stale.where(LatestRawScore.entity_id.in_(entity_ids))
+        ranked = ranked.subquery()
+
+        db.execute(stale)
+        result = db.execute(
+            insert(LatestRawScore).from_select(
+                ["id", "entity_id", "component_id", "raw_score_id", "value", "era_id"],
+                select(
+                    ranked.c.id, ranked.c.entity_id, ranked.c.component_id,
+                    ranked.c.id, ranked.c.value, ranked.c.era_id,
+                ).where(ranked.c.rn == 1),
             )
-            .subquery()
         )
-
-    def run_scoring_for_category(self, db: Session, category_id: UUID, model_id: Optional[UUID] = None) -> List[FinalScore]:
-        """
-        Runs the full scoring pipeline for all entities in a category.
-        """
-        # 1. Get the active scoring model
+        return result.rowcount
+
+    def _lock_category(self, db: Session, category_id: UUID) -> None:
+        # Full, incremental and score-all runs of a category claim the same
+        # dirty marks and rebuild the same leaderboard: whichever way they were
+        # started (a job under scoring:{id}, the scoring:all pool, a request),
+        # they wait for each other until commit. Re-entrant within a transaction.
+        if db.get_bind().dialect.name == "postgresql":
+            key = int.from_bytes(category_id.bytes[8:], "big", signed=True)
+            db.execute(select(func.pg_advisory_xact_lock(key)))
+
+    def _get_scoring_model(self, db: Session, category_id: UUID, model_id: Optional[UUID] = None) -> ScoringModel:
         if model_id:
             model = db.get(ScoringModel, model_id)
         else:
@@ -108,23 +191,48 @@ class ScoringService:
 
         if not model:
             raise ValueError("No active scoring model found for this category")
+        return model
+
+    def _load_scoring_inputs(
+        self,
+        db: Session,
+        category_id: UUID,
+        model_id: Optional[UUID] = None,
+        entity_ids: Optional[Iterable[UUID]] = None,
+    ) -> Optional[ScoringInputs]:
+        """
+        Loads the scoring model and every dataset a scoring pass reads, in bulk.
+        ``entity_ids`` restricts the pass to a subset of the category; the
+        normalization statistics always cover the whole category.
+        Returns None when there is nothing to score.
+        """
+        # 1. Get the active scoring model
+        model = self._get_scoring_model(db, category_id, model_id)
 
         # 2. Get all entities in this category
-        entities_query = select(Entity).where(Entity.category_id == category_id)
-        entities = db.execute(entities_query).scalars().all()
-        if not entities:
-            return []
+        category_entity_ids = db.execute(
+            select(Entity.id).where(Entity.category_id == category_id)
+        ).scalars().all()
+        if entity_ids is None:
+            entity_ids = category_entity_ids
+        else:
+            wanted = set(entity_ids)
+            entity_ids = [e for e in category_entity_ids if e in wanted]
+        if not entity_ids:
+            return None
 
-        entity_ids = [e.id for e in entities]
         component_ids = [w.component_id for w in model.weights]
 
-        # 3. Prepare bulk data
-        latest_raw_subq = self._latest_raw_scores_subquery(entity_ids, component_ids)
-        if latest_raw_subq is None:
-            return []
+        if not component_ids:
+            return None
 
+        # 3. Prepare bulk data
         latest_raw_rows = db.execute(
-            select(latest_raw_subq).where(latest_raw_subq.c.rn == 1)
+            select(LatestRawScore.entity_id, LatestRawScore.component_id, LatestRawScore.value, LatestRawScore.era_id)
+            .where(
+                LatestRawScore.entity_id.in_(entity_ids),
+                LatestRawScore.component_id.in_(component_ids),
+            )
         ).all()
 
         latest_raw: Dict[Tuple[UUID, UUID], Dict[str, Any]] = {}
@@ -134,44 +242,9 @@ class ScoringService:
                 "era_id": row.era_id,
             }
 
-        stats_rows = db.execute(
-            select(
-                latest_raw_subq.c.component_id,
-                func.min(latest_raw_subq.c.value),
-                func.max(latest_raw_subq.c.value),
-                func.avg(latest_raw_subq.c.value),
-                func.stddev_samp(latest_raw_subq.c.value),
-            )
-            .where(latest_raw_subq.c.rn == 1)
-            .group_by(latest_raw_subq.c.component_id)
-        ).all()
-
-        component_stats: Dict[UUID, Dict[str, Optional[float]]] = {
-            row.component_id: {
-                "min": row[1],
-                "max": row[2],
-                "avg": row[3],
-                "std": row[4],
-            }
-            for row in stats_rows
-        }
-
-        era_mean_rows = db.execute(
-            select(
-                latest_raw_subq.c.era_id,
-                latest_raw_subq.c.component_id,
-                func.avg(latest_raw_subq.c.value),
-            )
-            .where(
-                latest_raw_subq.c.rn == 1,
-                latest_raw_subq.c.era_id.is_not(None),
-            )
-            .group_by(latest_raw_subq.c.era_id, latest_raw_subq.c.component_id)
-        ).all()
-
-        era_means: Dict[Tuple[UUID, UUID], float] = {
-            (row[0], row[1]): row[2] for row in era_mean_rows
-        }
+        component_stats, era_means = component_stats_service.get_normalization_stats(
+            db, category_id, component_ids
+        )
 
         era_factors = db.execute(
             select(EraFactor).where(EraFactor.component_id.in_(component_ids))
@@ -190,6 +263,9 @@ class ScoringService:
         expert_votes_by_entity: Dict[UUID, List[ExpertVote]] = {}
         for vote in expert_votes:
             expert_votes_by_entity.setdefault(vote.entity_id, []).append(vote)
+        expert_weight_factors = expert_service.get_expert_weight_factors(
+            db, {vote.expert_id for vote in expert_votes}, category_id
+        )
 
         fan_aggs = db.execute(
             select(FanVoteAggregate).where(
@@ -217,24 +293,52 @@ class ScoringService:
             ).scalars().all()
             inf_scores_by_entity = {s.entity_id: s for s in inf_scores}
 
+        return ScoringInputs(
+            model=model,
+            entity_ids=list(entity_ids),
+            weight_map=self._cap_and_renormalize_weights(model.weights),
+            latest_raw=latest_raw,
+            component_stats=component_stats,
+            era_means=era_means,
+            era_factor_map=era_factor_map,
+            expert_votes_by_entity=expert_votes_by_entity,
+            expert_weight_factors=expert_weight_factors,
+            fan_aggs_by_entity=fan_aggs_by_entity,
+            inf_scores_by_entity=inf_scores_by_entity,
+        )
+
+    def _score_entities_reference(
+        self, db: Session, category_id: UUID, inputs: ScoringInputs
+    ) -> List[ScoredEntity]:
+        """
+        Per-entity scoring loop. Reference implementation for the columnar
+        kernel in app.services.scoring_kernel; both must produce the same scores.
+        """
+        model = inputs.model
+        latest_raw = inputs.latest_raw
+        component_stats = inputs.component_stats
+        era_means = inputs.era_means
+        era_factor_map = inputs.era_factor_map
+        expert_votes_by_entity = inputs.expert_votes_by_entity
+        expert_weight_factors = inputs.expert_weight_factors
+        fan_aggs_by_entity = inputs.fan_aggs_by_entity
+        inf_scores_by_entity = inputs.inf_scores_by_entity
+        weight_map = inputs.weight_map
         results = []
-        weight_map = self._cap_and_renormalize_weights(model.weights)
 
         # 4. For each entity, calculate the score
-        for entity in entities:
+        for entity_id in inputs.entity_ids:
             total_score = 0.0
             breakdown = {}
-            explanations = []
+            explanation: ExplanationCodes = []
 
             for sw in model.weights:
                 component = sw.component
                 weight = weight_map.get(component.id, 0.0)
                 if component.is_subjective and sw.weight > 0.1:
-                    explanations.append(
-                        f"{component.name}: Popularity weight capped at 10% and renormalized"
-                    )
+                    explanation.append([codes.WEIGHT_CAPPED, component.name])
 
-                raw_key = (entity.id, component.id)
+                raw_key = (entity_id, component.id)
                 raw_entry = latest_raw.get(raw_key)
                 if not raw_entry:
                     breakdown[component.slug] = 0.0
@@ -258,9 +362,7 @@ class ScoringService:
                     era_factor = era_factor_map.get((era_id, component.id))
                     if era_factor:
                         normalized_val *= era_factor.multiplier
-                        explanations.append(
-                            f"{component.name}: Era multiplier {era_factor.multiplier} applied"
-                        )
+                        explanation.append([codes.ERA_MULTIPLIER, component.name, era_factor.multiplier])
 
                     era_mean = None
                     if era_factor and era_factor.mean_value > 0:
@@ -275,24 +377,20 @@ class ScoringService:
                     # Clamp to avoid outlier explosions
                     dominance_factor = max(0.5, min(2.0, dominance_factor))
                     normalized_val *= dominance_factor
-                    explanations.append(
-                        f"{component.name}: Era dominance factor {dominance_factor:.2f} applied"
-                    )
+                    explanation.append([codes.ERA_DOMINANCE, component.name, round(dominance_factor, 2)])
 
                 component_contribution = normalized_val * weight * 100
                 total_score += component_contribution
                 breakdown[component.slug] = round(component_contribution, 2)
 
             # 4. Integrate Expert Votes
-            expert_votes = expert_votes_by_entity.get(entity.id, [])
+            expert_votes = expert_votes_by_entity.get(entity_id, [])
             if expert_votes:
                 expert_total = 0.0
                 expert_weight_sum = 0.0
                 
                 for ev in expert_votes:
-                    ev_weight = expert_service.calculate_expert_weight(
-                        db, ev.expert_id, category_id, ev.confidence
-                    )
+                    ev_weight = expert_weight_factors.get(ev.expert_id, 0.0) * ev.confidence
                     expert_total += ev.score * ev_weight
                     expert_weight_sum += ev_weight
                 
@@ -304,92 +402,253 @@ class ScoringService:
                     total_score = self._blend_score(total_score, avg_expert_score, expert_influence_weight)
                     
                     breakdown["expert_influence"] = round(avg_expert_score * expert_influence_weight, 2)
-                    explanations.append(f"Expert Influence: {len(expert_votes)} votes aggregated (20% weight)")
+                    explanation.append([codes.EXPERT_VOTES, len(expert_votes)])
 
             # 5. Integrate Fan Votes
-            fan_aggregate = fan_aggs_by_entity.get(entity.id)
+            fan_aggregate = fan_aggs_by_entity.get(entity_id)
             if fan_aggregate:
                 # Fan influence is capped at 10% of the final score
                 fan_influence_weight = 0.1
-                total_score = self._blend_score(total_score, fan_aggregate.aggregate_score, fan_influence_weight)
+                fan_aggregate_score = fan_score(fan_aggregate, model.fan_score_mode)
+                total_score = self._blend_score(total_score, fan_aggregate_score, fan_influence_weight)
                 
-                breakdown["fan_sentiment"] = round(fan_aggregate.aggregate_score * fan_influence_weight, 2)
-                explanations.append(f"Fan Sentiment: {fan_aggregate.vote_count} votes aggregated (10% weight)")
+                breakdown["fan_sentiment"] = round(fan_aggregate_score * fan_influence_weight, 2)
+                explanation.append([codes.FAN_VOTES, fan_aggregate.vote_count])
 
             # 6. Integrate Influence Score (AI-Assisted)
             # Fetch active influence model for this category
-            if inf_model:
-                inf_score = inf_scores_by_entity.get(entity.id)
+            if inf_scores_by_entity:
+                inf_score = inf_scores_by_entity.get(entity_id)
                 if inf_score:
                     # Influence is capped at 15% of the final score
                     inf_weight = 0.15
                     total_score = self._blend_score(total_score, inf_score.total_score, inf_weight)
 
                     breakdown["ai_influence"] = round(inf_score.total_score * inf_weight, 2)
-                    explanations.append(f"AI Influence: {inf_score.total_score:.1f} (15% weight)")
+                    explanation.append([codes.AI_INFLUENCE, round(inf_score.total_score, 1)])
 
-            # 7. Save Final Score
-            final_score = db.execute(
-                select(FinalScore).where(
-                    FinalScore.entity_id == entity.id,
-                    FinalScore.scoring_model_id == model.id,
-                )
-            ).scalar_one_or_none()
-
-            if final_score:
-                final_score.score = round(total_score, 2)
-                final_score.breakdown = breakdown
-                final_score.explanation = " | ".join(explanations)
-            else:
-                final_score = FinalScore(
-                    entity_id=entity.id,
-                    scoring_model_id=model.id,
-                    score=round(total_score, 2),
-                    breakdown=breakdown,
-                    explanation=" | ".join(explanations)
-                )
-                db.add(final_score)
-            results.append(final_score)
+            results.append(ScoredEntity(
+                entity_id=entity_id,
+                score=round(total_score, 2),
+                breakdown=breakdown,
+                explanation_codes=explanation,
+            ))
 
-        db.commit()
         return results
 
-    def create_snapshot(self, db: Session, category_id: UUID, label: str) -> RankingSnapshot:
-        """
-        Creates an immutable snapshot of the current rankings.
-        """
-        # Get latest final scores for this category
-        query = select(FinalScore).join(Entity, FinalScore.entity_id == Entity.id).join(
-            Entity.subcategory
-        ).where(
-            Entity.subcategory.has(category_id=category_id)
-        ).order_by(FinalScore.score.desc())
-        
-        scores = db.execute(query).scalars().all()
-        
-        if not scores:
-            raise ValueError("No scores found to create a snapshot for this category")
-            
-        snapshot_data = [
+    def _upsert_final_scores(self, db: Session, model_id: UUID, scored: List[ScoredEntity]) -> int:
+        # 7. Save Final Scores as one chunked INSERT ... ON CONFLICT DO UPDATE
+        rows = [
             {
-                "entity_name": s.entity.name,
-                "score": s.score,
-                "breakdown": s.breakdown,
-                "rank": i + 1
+                "id": uuid.uuid4(),
+                "entity_id": entity_score.entity_id,
+                "scoring_model_id": model_id,
+                "score": entity_score.score,
+                "breakdown": entity_score.breakdown,
+                "explanation": None,
+                "explanation_codes": entity_score.explanation_codes,
             }
-            for i, s in enumerate(scores)
+            for entity_score in scored
         ]
-        
-        snapshot = RankingSnapshot(
+        return bulk_upsert(
+            db,
+            FinalScore,
+            rows,
+            conflict_columns=("entity_id", "scoring_model_id"),
+            update_columns=("score", "breakdown", "explanation", "explanation_codes"),
+            constraint="uq_final_scores_entity_model",
+        )
+
+    def _normalization_snapshot(self, inputs: ScoringInputs) -> Dict[str, Any]:
+        return {
+            "components": {
+                str(component_id): stats for component_id, stats in inputs.component_stats.items()
+            },
+            "era_means": {
+                f"{era_id}:{component_id}": mean
+                for (era_id, component_id), mean in inputs.era_means.items()
+            },
+        }
+
+    def _normalization_drifted(
+        self,
+        previous: Optional[Dict[str, Any]],
+        current: Dict[str, Any],
+        tolerance: float = NORMALIZATION_DRIFT_TOLERANCE,
+    ) -> bool:
+        """
+        True when component stats or era means moved by more than ``tolerance``
+        of the component's previous value range, i.e. enough to shift the
+        normalized scores of entities that were not re-scored.
+        """
+        if not previous:
+            return True
+
+        prev_components = previous.get("components", {})
+        if prev_components.keys() != current["components"].keys():
+            return True
+
+        def moved(old: Optional[float], new: Optional[float], scale: float) -> bool:
+            if old is None or new is None:
+                return old is not new
+            return abs(new - old) > tolerance * scale
+
+        for component_id, stats in current["components"].items():
+            old = prev_components[component_id]
+            scale = 1.0
+            if old.get("min") is not None and old.get("max") is not None:
+                scale = max(old["max"] - old["min"], abs(old["max"]), 1e-9)
+            if any(moved(old.get(k), stats.get(k), scale) for k in ("min", "max", "avg", "std")):
+                return True
+
+        prev_era_means = previous.get("era_means", {})
+        if prev_era_means.keys() != current["era_means"].keys():
+            return True
+        return any(
+            moved(prev_era_means[key], mean, max(abs(prev_era_means[key]), 1e-9))
+            for key, mean in current["era_means"].items()
+        )
+
+    def _score_and_save(
+        self,
+        db: Session,
+        category_id: UUID,
+        inputs: ScoringInputs,
+        reference: bool = False,
+    ) -> List[ScoredEntity]:
+        if reference:
+            scored = self._score_entities_reference(db, category_id, inputs)
+        else:
+            scored = scoring_kernel.score_category(inputs)
+        self._upsert_final_scores(db, inputs.model.id, scored)
+        leaderboard_service.refresh(db, category_id, inputs.model.id)
+        return scored
+
+    def _summarize(
+        self,
+        category_id: UUID,
+        model_id: UUID,
+        scored: List[ScoredEntity],
+        started: float,
+        mode: str,
+    ) -> ScoringRunSummary:
+        scores = [s.score for s in scored]
+        return ScoringRunSummary(
             category_id=category_id,
-            scoring_model_id=scores[0].scoring_model_id if scores else None,
-            snapshot_data=snapshot_data,
-            label=label
+            scoring_model_id=model_id,
+            mode=mode,
+            entities_scored=len(scored),
+            min_score=min(scores, default=None),
+            max_score=max(scores, default=None),
+            mean_score=round(sum(scores) / len(scores), 2) if scores else None,
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
         )
-        db.add(snapshot)
+
+    def score_category(
+        self,
+        db: Session,
+        category_id: UUID,
+        model_id: Optional[UUID] = None,
+        reference: bool = False,
+        context: Optional["JobContext"] = None,
+    ) -> ScoringRunSummary:
+        """
+        Scores every entity in a category and writes the FinalScores, returning
+        a summary rather than the rows themselves.
+
+        Scores are computed by the columnar kernel; ``reference=True`` uses the
+        per-entity Python loop instead. A job ``context`` is told the progress
+        and checked for cancellation between loading and writing; nothing is
+        committed when the job is cancelled.
+        """
+        started = time.perf_counter()
+        self._lock_category(db, category_id)
+        model = self._get_scoring_model(db, category_id, model_id)
+        # Everything is about to be re-scored; marks made after this point
+        # are picked up by the next incremental run.
+        dirty_score_service.claim_dirty(db, model.id)
+
+        inputs = self._load_scoring_inputs(db, category_id, model.id)
+        if inputs is None:
+            db.commit()
+            return ScoringRunSummary(category_id=category_id, scoring_model_id=model.id, entities_scored=0)
+        if context:
+            context.check_cancelled()
+            context.progress(0.5, "Scoring and writing entities")
+
+        scored = self._score_and_save(db, category_id, inputs, reference=reference)
+        model.normalization_snapshot = self._normalization_snapshot(inputs)
         db.commit()
-        db.refresh(snapshot)
-        return snapshot
+        return self._summarize(category_id, model.id, scored, started, mode="full")
+
+    def score_dirty(
+        self,
+        db: Session,
+        category_id: UUID,
+        model_id: Optional[UUID] = None,
+        context: Optional["JobContext"] = None,
+    ) -> ScoringRunSummary:
+        """
+        Re-scores only the entities marked dirty since the last run. Falls back
+        to a full run when the normalization statistics have drifted.
+        """
+        started = time.perf_counter()
+        self._lock_category(db, category_id)
+        model = self._get_scoring_model(db, category_id, model_id)
+        dirty_ids = dirty_score_service.claim_dirty(db, model.id)
+        if not dirty_ids:
+            db.commit()
+            return ScoringRunSummary(
+                category_id=category_id, scoring_model_id=model.id, mode="incremental", entities_scored=0
+            )
+
+        inputs = self._load_scoring_inputs(db, category_id, model.id, entity_ids=dirty_ids)
+        if inputs is None:
+            db.commit()
+            return ScoringRunSummary(
+                category_id=category_id, scoring_model_id=model.id, mode="incremental", entities_scored=0
+            )
+
+        if self._normalization_drifted(model.normalization_snapshot, self._normalization_snapshot(inputs)):
+            return self.score_category(db, category_id, model_id=model.id, context=context)
+        if context:
+            context.check_cancelled()
+            context.progress(0.5, "Scoring and writing entities")
+
+        scored = self._score_and_save(db, category_id, inputs)
+        db.commit()
+        return self._summarize(category_id, model.id, scored, started, mode="incremental")
+
+    def run_scoring_for_category(
+        self,
+        db: Session,
+        category_id: UUID,
+        model_id: Optional[UUID] = None,
+        reference: bool = False,
+    ) -> List[FinalScore]:
+        """
+        Runs the full scoring pipeline for all entities in a category.
+        """
+        summary = self.score_category(db, category_id, model_id=model_id, reference=reference)
+        if not summary.entities_scored:
+            return []
+
+        return db.execute(
+            select(FinalScore)
+            .join(Entity, FinalScore.entity_id == Entity.id)
+            .where(
+                FinalScore.scoring_model_id == summary.scoring_model_id,
+                Entity.category_id == category_id,
+            )
+        ).scalars().all()
+
+    def create_snapshot(
+        self, db: Session, category_id: UUID, label: str, scoring_model_id: Optional[UUID] = None
+    ) -> RankingSnapshot:
+        """
+        Creates an immutable snapshot of the current rankings.
+        """
+        return ranking_snapshot_service.create(db, category_id, label, scoring_model_id)
 
 
 scoring_service = ScoringService()
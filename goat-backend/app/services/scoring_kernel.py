@@ -0,0 +1,298 @@
+"""
+Columnar scoring kernel.
+
+Evaluates a scoring model for a whole category at once: the latest raw scores
+are laid out as an entity x component matrix and normalization, era
+adjustments and the expert/fan/influence blends are applied as NumPy array
+operations. ``ScoringService._score_entities_reference`` is the per-entity
+equivalent and is kept so the two can be checked against each other.
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.core import score_explanations as codes
+from app.core.score_explanations import ExplanationCodes
+from app.models.era import EraFactor
+from app.models.expert import ExpertVote
+from app.models.fan_voting import FanVoteAggregate
+from app.models.influence import InfluenceScore
+from app.models.scoring import ScoringModel
+
+EXPERT_INFLUENCE_WEIGHT = 0.2
+FAN_INFLUENCE_WEIGHT = 0.1
+AI_INFLUENCE_WEIGHT = 0.15
+DOMINANCE_MIN = 0.5
+DOMINANCE_MAX = 2.0
+
+# math.erf has no NumPy counterpart; vectorizing it keeps z-score output
+# bit-identical to ScoringService.normalize_value.
+_erf = np.vectorize(math.erf, otypes=[float])
+
+
+def fan_score(agg: FanVoteAggregate, mode: Optional[str]) -> float:
+    """The aggregate's score for a model's fan_score_mode ("lifetime" or "decayed")."""
+    if mode == "decayed" and agg.decayed_weight_sum:
+        return agg.decayed_score
+    return agg.aggregate_score
+
+
+@dataclass
+class ScoringInputs:
+    """Everything a scoring pass reads, loaded up front in bulk."""
+
+    model: ScoringModel
+    entity_ids: List[UUID]
+    weight_map: Dict[UUID, float]
+    latest_raw: Dict[Tuple[UUID, UUID], Dict[str, Any]]
+    component_stats: Dict[UUID, Dict[str, Optional[float]]]
+    era_means: Dict[Tuple[UUID, UUID], float]
+    era_factor_map: Dict[Tuple[UUID, UUID], EraFactor]
+    expert_votes_by_entity: Dict[UUID, List[ExpertVote]] = field(default_factory=dict)
+    # Confidence-independent weight per expert, see ExpertService.get_expert_weight_factors
+    expert_weight_factors: Dict[UUID, float] = field(default_factory=dict)
+    fan_aggs_by_entity: Dict[UUID, FanVoteAggregate] = field(default_factory=dict)
+    inf_scores_by_entity: Dict[UUID, InfluenceScore] = field(default_factory=dict)
+
+
+@dataclass
+class ScoredEntity:
+    entity_id: UUID
+    score: float
+    breakdown: Dict[str, float]
+    explanation_codes: ExplanationCodes
+
+
+@dataclass
+class ExpertConsensus:
+    """Weighted expert average (0-100) per entity, NaN where there is none."""
+
+    scores: np.ndarray
+    vote_counts: np.ndarray
+
+
+def normalize_column(
+    values: np.ndarray,
+    min_val: Optional[float],
+    max_val: Optional[float],
+    avg_val: Optional[float],
+    std_dev: Optional[float],
+    method: str = "min-max",
+) -> np.ndarray:
+    """
+    Array form of ScoringService.normalize_value for one component column.
+    """
+    if min_val is None or max_val is None:
+        return np.zeros_like(values)
+
+    if method == "log":
+        if max_val <= 0:
+            return np.zeros_like(values)
+        normalized = np.log(np.maximum(values, 0.0) + 1) / math.log(max_val + 1)
+    elif method == "z-score":
+        if avg_val is None or std_dev in (None, 0):
+            return np.full_like(values, 0.5)
+        z = (values - avg_val) / std_dev
+        normalized = 0.5 * (1.0 + _erf(z / math.sqrt(2.0)))
+    else:
+        # min-max, and the default for unknown methods
+        if max_val == min_val:
+            return np.where(values >= (max_val or 0.0), 1.0, 0.0)
+        normalized = (values - min_val) / (max_val - min_val)
+
+    return np.clip(normalized, 0.0, 1.0)
+
+
+def _blend(base: np.ndarray, overlay: np.ndarray, weight: float, mask: np.ndarray) -> np.ndarray:
+    return np.where(mask, (base * (1 - weight)) + (overlay * weight), base)
+
+
+def expert_consensus(inputs: ScoringInputs) -> ExpertConsensus:
+    """
+    Confidence- and reputation-weighted expert average for every entity, as
+    grouped sums over flat per-vote arrays.
+    """
+    n_entities = len(inputs.entity_ids)
+    entity_index = {entity_id: i for i, entity_id in enumerate(inputs.entity_ids)}
+    rows, scores, weights = [], [], []
+    for entity_id, votes in inputs.expert_votes_by_entity.items():
+        i = entity_index.get(entity_id)
+        if i is None:
+            continue
+        for ev in votes:
+            rows.append(i)
+            scores.append(ev.score)
+            weights.append(inputs.expert_weight_factors.get(ev.expert_id, 0.0) * ev.confidence)
+
+    rows = np.asarray(rows, dtype=np.int64)
+    weights = np.asarray(weights, dtype=float)
+    weighted_total = np.bincount(rows, weights=np.asarray(scores, dtype=float) * weights, minlength=n_entities)
+    weight_sum = np.bincount(rows, weights=weights, minlength=n_entities)
+    vote_counts = np.bincount(rows, minlength=n_entities)
+
+    has_weight = weight_sum > 0
+    consensus = np.full(n_entities, np.nan)
+    np.divide(weighted_total, weight_sum, out=consensus, where=has_weight)
+    consensus *= 10  # Scale 0-10 to 0-100
+    return ExpertConsensus(scores=consensus, vote_counts=np.where(has_weight, vote_counts, 0))
+
+
+def score_category(inputs: ScoringInputs, experts: Optional[ExpertConsensus] = None) -> List[ScoredEntity]:
+    """
+    Scores every entity in ``inputs`` and returns them in ``entity_ids`` order.
+    """
+    if experts is None:
+        experts = expert_consensus(inputs)
+    weights = inputs.model.weights
+    components = [sw.component for sw in weights]
+    n_entities, n_components = len(inputs.entity_ids), len(components)
+    entity_index = {entity_id: i for i, entity_id in enumerate(inputs.entity_ids)}
+    component_index = {component.id: j for j, component in enumerate(components)}
+
+    # 1. Entity x component matrices of raw values and era codes
+    values = np.full((n_entities, n_components), np.nan)
+    era_codes = np.full((n_entities, n_components), -1, dtype=np.int64)
+    era_index: Dict[UUID, int] = {}
+    for (entity_id, component_id), entry in inputs.latest_raw.items():
+        i = entity_index.get(entity_id)
+        j = component_index.get(component_id)
+        if i is None or j is None:
+            continue
+        values[i, j] = entry["value"]
+        if entry.get("era_id"):
+            era_codes[i, j] = era_index.setdefault(entry["era_id"], len(era_index))
+    present = ~np.isnan(values)
+
+    # 2. Normalize column by column (one method and one set of stats each)
+    normalized = np.zeros_like(values)
+    for j, component in enumerate(components):
+        stats = inputs.component_stats.get(component.id, {})
+        normalized[:, j] = normalize_column(
+            values[:, j],
+            stats.get("min"),
+            stats.get("max"),
+            stats.get("avg"),
+            stats.get("std"),
+            method=component.normalization_type,
+        )
+
+    # 3. Era multipliers and dominance via (era, component) lookup tables
+    has_era = era_codes >= 0
+    dominance = np.ones_like(values)
+    has_factor = np.zeros_like(has_era)
+    if era_index:
+        n_eras = len(era_index)
+        multipliers = np.full((n_eras, n_components), np.nan)
+        factor_means = np.full((n_eras, n_components), np.nan)
+        era_means = np.full((n_eras, n_components), np.nan)
+        for era_id, e in era_index.items():
+            for j, component in enumerate(components):
+                factor = inputs.era_factor_map.get((era_id, component.id))
+                if factor:
+                    multipliers[e, j] = factor.multiplier
+                    factor_means[e, j] = factor.mean_value
+                era_mean = inputs.era_means.get((era_id, component.id))
+                if era_mean is not None:
+                    era_means[e, j] = era_mean
+
+        rows = np.where(has_era, era_codes, 0)
+        cols = np.broadcast_to(np.arange(n_components), values.shape)
+        cell_multipliers = multipliers[rows, cols]
+        has_factor = has_era & ~np.isnan(cell_multipliers)
+        normalized = np.where(has_factor, normalized * cell_multipliers, normalized)
+
+        cell_factor_means = factor_means[rows, cols]
+        cell_era_means = np.where(
+            has_factor & (cell_factor_means > 0), cell_factor_means, era_means[rows, cols]
+        )
+        dominant = has_era & (cell_era_means > 0) & (values > 0)
+        np.divide(values, cell_era_means, out=dominance, where=dominant)
+        dominance = np.clip(dominance, DOMINANCE_MIN, DOMINANCE_MAX)
+        normalized = np.where(has_era, normalized * dominance, normalized)
+
+    # 4. Weighted contributions
+    component_weights = np.array([inputs.weight_map.get(c.id, 0.0) for c in components])
+    contributions = np.where(present, normalized * component_weights * 100, 0.0)
+    total = contributions.sum(axis=1)
+
+    # 5. Expert, fan and influence blends
+    has_expert = ~np.isnan(experts.scores)
+    total = _blend(total, np.nan_to_num(experts.scores), EXPERT_INFLUENCE_WEIGHT, has_expert)
+
+    fan_scores = np.array([
+        fan_score(agg, inputs.model.fan_score_mode) if (agg := inputs.fan_aggs_by_entity.get(e)) else np.nan
+        for e in inputs.entity_ids
+    ])
+    has_fan = ~np.isnan(fan_scores)
+    total = _blend(total, np.nan_to_num(fan_scores), FAN_INFLUENCE_WEIGHT, has_fan)
+
+    inf_scores = np.array([
+        s.total_score if (s := inputs.inf_scores_by_entity.get(e)) else np.nan
+        for e in inputs.entity_ids
+    ])
+    has_inf = ~np.isnan(inf_scores)
+    total = _blend(total, np.nan_to_num(inf_scores), AI_INFLUENCE_WEIGHT, has_inf)
+
+    # 6. Assemble per-entity rows
+    slugs = [c.slug for c in components]
+    rounded = np.round(contributions, 2).tolist()
+    scores = np.round(total, 2).tolist()
+    results = []
+    for i, entity_id in enumerate(inputs.entity_ids):
+        breakdown = dict(zip(slugs, rounded[i]))
+        if has_expert[i]:
+            breakdown["expert_influence"] = round(experts.scores[i] * EXPERT_INFLUENCE_WEIGHT, 2)
+        if has_fan[i]:
+            breakdown["fan_sentiment"] = round(fan_scores[i] * FAN_INFLUENCE_WEIGHT, 2)
+        if has_inf[i]:
+            breakdown["ai_influence"] = round(inf_scores[i] * AI_INFLUENCE_WEIGHT, 2)
+
+        results.append(ScoredEntity(
+            entity_id=entity_id,
+            score=scores[i],
+            breakdown={k: float(v) for k, v in breakdown.items()},
+            explanation_codes=_explain(
+                inputs, components, entity_id, i,
+                present[i], has_era[i], has_factor[i], dominance[i],
+                int(experts.vote_counts[i]) if has_expert[i] else 0,
+            ),
+        ))
+    return results
+
+
+def _explain(
+    inputs: ScoringInputs,
+    components: list,
+    entity_id: UUID,
+    i: int,
+    present: np.ndarray,
+    has_era: np.ndarray,
+    has_factor: np.ndarray,
+    dominance: np.ndarray,
+    expert_vote_count: int,
+) -> ExplanationCodes:
+    explanation: ExplanationCodes = []
+    weights = inputs.model.weights
+    for j, component in enumerate(components):
+        if component.is_subjective and weights[j].weight > 0.1:
+            explanation.append([codes.WEIGHT_CAPPED, component.name])
+        if not present[j] or not has_era[j]:
+            continue
+        if has_factor[j]:
+            era_id = inputs.latest_raw[(entity_id, component.id)]["era_id"]
+            multiplier = inputs.era_factor_map[(era_id, component.id)].multiplier
+            explanation.append([codes.ERA_MULTIPLIER, component.name, multiplier])
+        explanation.append([codes.ERA_DOMINANCE, component.name, round(float(dominance[j]), 2)])
+
+    if expert_vote_count:
+        explanation.append([codes.EXPERT_VOTES, expert_vote_count])
+    fan_aggregate = inputs.fan_aggs_by_entity.get(entity_id)
+    if fan_aggregate:
+        explanation.append([codes.FAN_VOTES, fan_aggregate.vote_count])
+    inf_score = inputs.inf_scores_by_entity.get(entity_id)
+    if inf_score:
+        explanation.append([codes.AI_INFLUENCE, round(inf_score.total_score, 1)])
+    return explanation
@@ -0,0 +1,106 @@
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.fan_voting import UserTrustScore
+from app.repositories.bulk import dialect_insert
+
+BASELINE_TRUST_SCORE = 1.0
+TRUST_CACHE_MAX_ENTRIES = 100_000
+
+
+class TrustScoreService:
+    """
+    Reads user trust scores through a process-local TTL cache. Users without
+    a row get the baseline trust, created in the caller's transaction.
+    """
+
+    def __init__(self):
+        self._cache: Dict[UUID, Tuple[float, float]] = {}  # user_id -> (trust score, expires at)
+        self._lock = threading.Lock()
+
+    def _cached(self, user_ids: Iterable[UUID]) -> Dict[UUID, float]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for user_id in user_ids:
+                entry = self._cache.get(user_id)
+                if entry and entry[1] > now:
+                    found[user_id] = entry[0]
+        return found
+
+    def _store(self, scores: Dict[UUID, float]) -> None:
+        ttl = settings.TRUST_SCORE_CACHE_TTL_SECONDS
+        if ttl <= 0:
+            return
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            if len(self._cache) + len(scores) > TRUST_CACHE_MAX_ENTRIES:
+                now = time.monotonic()
+                self._cache = {k: v for k, v in self._cache.items() if v[1] > now}
+                if len(self._cache) + len(scores) > TRUST_CACHE_MAX_ENTRIES:
+                    self._cache.clear()
+            for user_id, score in scores.items():
+                self._cache[user_id] = (score, expires_at)
+
+    def invalidate(self, user_ids: Optional[Iterable[UUID]] = None) -> None:
+        """Drops the given users from the cache, or everyone when none are given."""
+        with self._lock:
+            if user_ids is None:
+                self._cache.clear()
+            else:
+                for user_id in user_ids:
+                    self._cache.pop(user_id, None)
+
+    def get_trust_scores(self, db: Session, user_ids: Iterable[UUID]) -> Dict[UUID, float]:
+        """
+        Trust scores for many users: cache hits first, then one query for the
+        rest and one upsert creating baseline rows for users seen for the
+        first time. Does not commit.
+        """
+        user_ids = set(user_ids)
+        scores = self._cached(user_ids)
+        missing = user_ids - scores.keys()
+        if not missing:
+            return scores
+
+        query = select(UserTrustScore.user_id, UserTrustScore.trust_score)
+        loaded = dict(db.execute(query.where(UserTrustScore.user_id.in_(missing))).all())
+        new_users = missing - loaded.keys()
+        if new_users:
+            db.execute(
+                dialect_insert(db)(UserTrustScore.__table__)
+                .values([
+                    {"id": uuid.uuid4(), "user_id": user_id, "trust_score": BASELINE_TRUST_SCORE,
+                     "account_age_days": 0, "engagement_level": 0, "is_flagged": False}
+                    for user_id in new_users
+                ])
+                .on_conflict_do_nothing(index_elements=["user_id"])
+            )
+            # A concurrent request may have created some of them first
+            loaded.update(db.execute(query.where(UserTrustScore.user_id.in_(new_users))).all())
+
+        self._store(loaded)
+        scores.update(loaded)
+        return scores
+
+    def get_trust_score(self, db: Session, user_id: UUID) -> float:
+        return self.get_trust_scores(db, [user_id])[user_id]
+
+    def set_trust_score(
+        self, db: Session, user_id: UUID, trust_score: float, is_flagged: Optional[bool] = None
+    ) -> None:
+        """Updates a user's trust and evicts the cached value. Does not commit."""
+        self.get_trust_scores(db, [user_id])
+        values = {"trust_score": trust_score}
+        if is_flagged is not None:
+            values["is_flagged"] = is_flagged
+        db.execute(update(UserTrustScore).where(UserTrustScore.user_id == user_id).values(**values))
+        self.invalidate([user_id])
+
+
+trust_score_service = TrustScoreService()
@@ -0,0 +1,287 @@
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.fan_voting import VoteAnomaly
+
+logger = logging.getLogger(__name__)
+
+# Sliding window: WINDOW_BUCKETS buckets of BUCKET_SECONDS each
+BUCKET_SECONDS = 10.0
+WINDOW_BUCKETS = 6
+SKETCH_WIDTH = 4096
+SKETCH_DEPTH = 4
+# Votes within one window on one entity from the same source
+IP_VOTE_THRESHOLD = 30  # -> "clustering"
+USER_AGENT_VOTE_THRESHOLD = 300  # -> "bot"
+# Entity surge: a bucket this many EWMA standard deviations above the mean
+SURGE_Z_THRESHOLD = 4.0
+SURGE_MIN_VOTES = 20
+SURGE_WARMUP_BUCKETS = WINDOW_BUCKETS
+EWMA_ALPHA = 0.1
+# Caps keeping memory bounded regardless of traffic
+MAX_TRACKED_ENTITIES = 100_000
+MAX_FLAGGED_KEYS = 10_000
+FLAG_COOLDOWN_SECONDS = 600.0
+
+_PRIME = (1 << 61) - 1
+
+
+class CountMinSketch:
+    """
+    Count-min sketch over a ring of time buckets: estimates how often a key
+    was seen within the window in fixed memory. Estimates never undercount.
+    A running window total makes each update O(depth).
+    """
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH, buckets: int = WINDOW_BUCKETS, seed: int = 0):
+        rng = random.Random(seed)
+        self.width = width
+        self._hashes = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME), row * width) for row in range(depth)]
+        self.buckets = [[0] * (width * depth) for _ in range(buckets)]
+        self.window = [0] * (width * depth)
+        self.current = 0
+
+    def add(self, key: Any) -> int:
+        """Counts one occurrence of ``key`` and returns its windowed estimate."""
+        h = hash(key)
+        bucket, window = self.buckets[self.current], self.window
+        estimate = None
+        for a, b, offset in self._hashes:
+            cell = offset + (a * h + b) % _PRIME % self.width
+            bucket[cell] += 1
+            window[cell] += 1
+            if estimate is None or window[cell] < estimate:
+                estimate = window[cell]
+        return estimate
+
+    def advance(self) -> None:
+        """Moves to the next bucket, dropping the oldest one from the window."""
+        self.current = (self.current + 1) % len(self.buckets)
+        oldest = self.buckets[self.current]
+        self.window = [total - old for total, old in zip(self.window, oldest)]
+        self.buckets[self.current] = [0] * len(oldest)
+
+
+class Ewma:
+    __slots__ = ("mean", "var", "buckets")
+
+    def __init__(self):
+        self.mean = 0.0
+        self.var = 0.0
+        self.buckets = 0
+
+    def update(self, value: float) -> None:
+        delta = value - self.mean
+        self.mean += EWMA_ALPHA * delta
+        self.var = (1 - EWMA_ALPHA) * (self.var + EWMA_ALPHA * delta * delta)
+        self.buckets += 1
+
+
+class VoteAnomalyDetector:
+    """
+    Watches the fan vote stream in memory and records VoteAnomaly rows:
+
+    - ``surge``: an entity's votes in a bucket far above its EWMA baseline
+    - ``clustering``: many votes on an entity from one IP address
+    - ``bot``: many votes on an entity from one user agent
+
+    ``observe`` is O(sketch depth) per vote and only counts. Buckets are
+    closed by ``tick`` on the writer thread, which checks the entity
+    baselines and slides the sketch windows; bucket edges therefore lag by
+    up to one writer interval. Memory is fixed by the sketch sizes and the
+    caps above. Detected anomalies are buffered and written by ``flush``.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, clock: Callable[[], float] = time.monotonic):
+        self.session_factory = session_factory
+        self.clock = clock
+        self._lock = threading.Lock()
+        # Serializes tick(); the baselines are only touched under it
+        self._tick_lock = threading.Lock()
+        self._ip_sketch = CountMinSketch(seed=1)
+        self._user_agent_sketch = CountMinSketch(seed=2)
+        self._bucket_started: Optional[float] = None
+        self._bucket_counts: Dict[UUID, int] = {}
+        self._baselines: Dict[UUID, Ewma] = {}
+        self._flagged: Dict[Tuple[str, Any], float] = {}
+        self._pending: List[Dict[str, Any]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._interval = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """Starts the writer thread; an interval of 0 leaves writing to the vote path."""
+        interval = settings.VOTE_ANOMALY_FLUSH_INTERVAL_SECONDS if interval is None else interval
+        with self._lock:
+            if interval <= 0 or self._thread:
+                return
+            self._interval = interval
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="vote-anomaly-writer", daemon=True)
+            self._thread.start()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            self._stop.set()
+            thread.join()
+            self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.tick()
+            self.flush()
+
+    def _flag(self, anomaly_type: str, key: Any, now: float, entity_id: UUID, severity: float,
+              description: str, metadata: Dict[str, Any]) -> None:
+        flag_key = (anomaly_type, key)
+        if self._flagged.get(flag_key, 0.0) > now:
+            return
+        if len(self._flagged) >= MAX_FLAGGED_KEYS:
+            self._flagged = {k: until for k, until in self._flagged.items() if until > now}
+            if len(self._flagged) >= MAX_FLAGGED_KEYS:
+                self._flagged.clear()
+        self._flagged[flag_key] = now + FLAG_COOLDOWN_SECONDS
+        self._pending.append({
+            "id": uuid.uuid4(),
+            "entity_id": entity_id,
+            "anomaly_type": anomaly_type,
+            "severity": severity,
+            "description": description,
+            "is_resolved": False,
+            "metadata_json": metadata,
+        })
+
+    def _check_baselines(self, counts: Dict[UUID, int]) -> List[Tuple[UUID, int, float, float, float]]:
+        # One closed bucket's counts against the EWMA baselines; returns
+        # (entity, votes, z, mean, std) for the surges found
+        surges = []
+        for entity_id in counts.keys() | self._baselines.keys():
+            count = counts.get(entity_id, 0)
+            baseline = self._baselines.get(entity_id)
+            if baseline is None:
+                if len(self._baselines) >= MAX_TRACKED_ENTITIES:
+                    continue
+                baseline = self._baselines[entity_id] = Ewma()
+            if baseline.buckets >= SURGE_WARMUP_BUCKETS and count >= SURGE_MIN_VOTES:
+                std = math.sqrt(baseline.var)
+                z = (count - baseline.mean) / max(std, 1.0)
+                if z >= SURGE_Z_THRESHOLD:
+                    surges.append((entity_id, count, z, baseline.mean, std))
+            baseline.update(count)
+            if count == 0 and baseline.mean < 0.01:
+                # Idle again; forget it to keep the table small
+                del self._baselines[entity_id]
+        return surges
+
+    def tick(self) -> None:
+        """
+        Closes the buckets that have ended. Only the counter swap and the
+        sketch slide hold the lock voters take; the pass over the entity
+        baselines runs outside it. Called by the writer thread, or by the
+        vote path when there is none.
+        """
+        if not self._tick_lock.acquire(blocking=False):
+            return  # another thread is closing the same buckets
+        try:
+            now = self.clock()
+            with self._lock:
+                if self._bucket_started is None:
+                    return
+                elapsed = int((now - self._bucket_started) // BUCKET_SECONDS)
+                if not elapsed:
+                    return
+                self._bucket_started += elapsed * BUCKET_SECONDS
+                counts, self._bucket_counts = self._bucket_counts, {}
+                # Beyond a full window every bucket is empty anyway
+                closed = min(elapsed, WINDOW_BUCKETS + 1)
+                for _ in range(closed):
+                    self._ip_sketch.advance()
+                    self._user_agent_sketch.advance()
+
+            surges = self._check_baselines(counts)
+            for _ in range(closed - 1):
+                surges += self._check_baselines({})
+            if not surges:
+                return
+            with self._lock:
+                for entity_id, count, z, mean, std in surges:
+                    self._flag(
+                        "surge", entity_id, now, entity_id, severity=round(z, 2),
+                        description=f"{count} votes in {BUCKET_SECONDS:.0f}s against a baseline of {mean:.1f}",
+                        metadata={"votes": count, "baseline_mean": mean, "baseline_std": std,
+                                  "bucket_seconds": BUCKET_SECONDS},
+                    )
+        finally:
+            self._tick_lock.release()
+
+    def observe(self, entity_id: UUID, ip_address: Optional[str] = None, user_agent: Optional[str] = None) -> None:
+        """Feeds one committed vote to the detector."""
+        now = self.clock()
+        with self._lock:
+            if self._bucket_started is None:
+                self._bucket_started = now
+            self._bucket_counts[entity_id] = self._bucket_counts.get(entity_id, 0) + 1
+            if ip_address:
+                votes = self._ip_sketch.add((ip_address, entity_id))
+                if votes >= IP_VOTE_THRESHOLD:
+                    self._flag(
+                        "clustering", (ip_address, entity_id), now, entity_id,
+                        severity=round(votes / IP_VOTE_THRESHOLD, 2),
+                        description=f"~{votes} votes from {ip_address} within {WINDOW_BUCKETS * BUCKET_SECONDS:.0f}s",
+                        metadata={"ip_address": ip_address, "estimated_votes": votes},
+                    )
+            if user_agent:
+                votes = self._user_agent_sketch.add((user_agent, entity_id))
+                if votes >= USER_AGENT_VOTE_THRESHOLD:
+                    self._flag(
+                        "bot", (user_agent, entity_id), now, entity_id,
+                        severity=round(votes / USER_AGENT_VOTE_THRESHOLD, 2),
+                        description=f"~{votes} votes from one user agent within {WINDOW_BUCKETS * BUCKET_SECONDS:.0f}s",
+                        metadata={"user_agent": user_agent[:512], "estimated_votes": votes},
+                    )
+
+    def flush(self, db: Optional[Session] = None) -> int:
+        """Writes buffered anomalies and commits. Returns the number written."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        own_session = db is None
+        if own_session:
+            db = self.session_factory()
+        try:
+            db.execute(insert(VoteAnomaly), pending)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception(f"Writing {len(pending)} vote anomalies failed; requeued")
+            with self._lock:
+                self._pending = (pending + self._pending)[-MAX_FLAGGED_KEYS:]
+            return 0
+        finally:
+            if own_session:
+                db.close()
+        return len(pending)
+
+
+vote_anomaly_detector = VoteAnomalyDetector()
@@ -0,0 +1,46 @@
+import sys
+import os
+import argparse
+from sqlalchemy.orm import Session
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import SessionLocal
+from app.services.influence_ingest import influence_event_ingest_service, DEFAULT_CHUNK_SIZE
+
+def ingest_influence_events(path: str, fmt: str, chunk_size: int) -> int:
+    db: Session = SessionLocal()
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            report = influence_event_ingest_service.ingest(db, f, fmt, chunk_size=chunk_size)
+    finally:
+        db.close()
+
+    for batch in report.batches:
+        print(
+            f"Batch {batch.batch}: {batch.received} received, {batch.inserted} inserted, "
+            f"{batch.duplicates} duplicates, {batch.failed} failed in {batch.duration_ms} ms"
+        )
+    print(
+        f"Received {report.received} events: {report.inserted} inserted, {report.duplicates} duplicates, "
+        f"{report.failed} failed. {report.entities_marked} entities marked for re-scoring."
+    )
+    for error in report.errors:
+        print(f"  line {error.line}: {error.error}")
+    if report.errors_truncated:
+        print("  (further errors not shown)")
+    return 1 if report.failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bulk load influence events from an NDJSON or CSV file. Events already stored, "
+                    "soft-deleted ones included, are skipped as duplicates."
+    )
+    parser.add_argument("path", help="File with one influence event per line")
+    parser.add_argument("--format", choices=("ndjson", "csv"), help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    sys.exit(ingest_influence_events(args.path, fmt, args.chunk_size))
@@ -0,0 +1,35 @@
+import sys
+import os
+import argparse
+from sqlalchemy.orm import Session
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import SessionLocal
+from app.services.raw_score_ingest import raw_score_ingest_service, DEFAULT_CHUNK_SIZE
+
+def ingest_raw_scores(path: str, fmt: str, chunk_size: int) -> int:
+    db: Session = SessionLocal()
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            report = raw_score_ingest_service.ingest(db, f, fmt, chunk_size=chunk_size)
+    finally:
+        db.close()
+
+    print(f"Received {report.received} rows: {report.inserted} inserted, {report.failed} failed.")
+    for error in report.errors:
+        print(f"  line {error.line}: {error.error}")
+    if report.errors_truncated:
+        print("  (further errors not shown)")
+    return 1 if report.failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk load raw scores from an NDJSON or CSV file.")
+    parser.add_argument("path", help="File with one raw score per line")
+    parser.add_argument("--format", choices=("ndjson", "csv"), help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    sys.exit(ingest_raw_scores(args.path, fmt, args.chunk_size))
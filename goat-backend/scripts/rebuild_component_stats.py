@@ -0,0 +1,32 @@
+import sys
+import os
+import argparse
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import SessionLocal
+from app.services.component_stats import component_stats_service
+from app.services.scoring import scoring_service
+
+def rebuild_component_stats(category_id=None):
+    db: Session = SessionLocal()
+    try:
+        latest = scoring_service.rebuild_latest_raw_scores(db, category_id)
+        rows = component_stats_service.rebuild(db, category_id)
+        db.commit()
+        scope = f"category {category_id}" if category_id else "all categories"
+        print(f"Rebuilt {latest} latest raw scores and {rows} component statistic rows for {scope}.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild latest raw scores and normalization statistics from raw score history.")
+    parser.add_argument("--category-id", type=UUID, help="Only rebuild this category")
+    args = parser.parse_args()
+    rebuild_component_stats(args.category_id)
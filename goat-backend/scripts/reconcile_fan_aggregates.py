@@ -0,0 +1,36 @@
+import sys
+import os
+import argparse
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import SessionLocal
+from app.services.fan_voting import fan_voting_service
+
+def reconcile_fan_aggregates(category_id=None):
+    db: Session = SessionLocal()
+    try:
+        fan_voting_service.flush_aggregate_queue()
+        report = fan_voting_service.reconcile_aggregates(db, category_id=category_id)
+        db.commit()
+        scope = f"category {category_id}" if category_id else "all categories"
+        print(
+            f"Checked {report.checked} fan vote aggregates for {scope}: "
+            f"{report.corrected} corrected, {report.removed} removed."
+        )
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute fan vote aggregates from fan_votes, repairing drift and deltas lost with a stopped API process."
+    )
+    parser.add_argument("--category-id", type=UUID, help="Only reconcile this category")
+    args = parser.parse_args()
+    reconcile_fan_aggregates(args.category_id)
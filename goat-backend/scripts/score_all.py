@@ -0,0 +1,36 @@
+import sys
+import os
+import argparse
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import SessionLocal
+from app.services.score_all import score_all_service
+
+def score_all(category_ids=None, workers=None) -> int:
+    db: Session = SessionLocal()
+    try:
+        report = score_all_service.score_all(db, category_ids=category_ids, max_workers=workers)
+    finally:
+        db.close()
+
+    for result in report.categories:
+        line = f"{result.category_id}  {result.status:<9}  {result.entities_scored:>7} entities  {result.duration_ms or 0:>10.1f} ms"
+        if result.error:
+            line += f"  {result.error}"
+        print(line)
+    print(
+        f"Scored {report.entities_scored} entities in {report.succeeded} categories "
+        f"({report.failed} failed) with {report.workers} workers in {report.duration_ms / 1000:.1f}s."
+    )
+    return 1 if report.failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rescore every category with an active scoring model.")
+    parser.add_argument("--category-id", type=UUID, action="append", help="Limit to these categories (repeatable)")
+    parser.add_argument("--workers", type=int, help="Worker processes (capped by DATABASE_POOL_SIZE)")
+    args = parser.parse_args()
+    sys.exit(score_all(args.category_id, args.workers))
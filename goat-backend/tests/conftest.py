@@ -62,6 +62,20 @@ def db_engine():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(scope="session")
+def pg_engine():
+    # Postgres-only statements (CTE upserts, advisory locks) can't run on
+    # SQLite; these tests create and drop every table in the given database.
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    pg_engine = create_engine(url)
+    Base.metadata.create_all(bind=pg_engine)
+    yield pg_engine
+    Base.metadata.drop_all(bind=pg_engine)
+    pg_engine.dispose()
+
+
 @pytest.fixture(scope="function")
 def db(db_engine) -> Generator[Session, None, None]:
     connection = db_engine.connect()
@@ -76,7 +76,7 @@ def test_full_goat_flow(client):
     assert fan_res.status_code == 200, f"Fan vote failed: {fan_res.text}"
     
     # 7. Run Scoring
-    res = client.post(f"/api/v1/scoring/run/{cat_id}", json={})
+    res = client.post(f"/api/v1/scoring/run/{cat_id}?background=false", json={})
     assert res.status_code == 200, f"Scoring run failed: {res.text}"
     data = res.json()
     
@@ -73,8 +73,80 @@ def test_run_scoring_api(client):
     })
     
     # 3. Run Scoring
-    res = client.post(f"/api/v1/scoring/run/{cat_id}", json={})
+    res = client.post(f"/api/v1/scoring/run/{cat_id}?background=false", json={})
     assert res.status_code == 200
     data = res.json()
     assert len(data) == 1
     assert data[0]["score"] == 100.0
+
+def test_run_scoring_api_summary(client):
+    cat_res = client.post("/api/v1/categories/", json={"name": "SummaryCat", "domain": "Sports", "slug": "summary-cat"})
+    cat_id = cat_res.json()["id"]
+    sub_res = client.post("/api/v1/subcategories/", json={"name": "Sub", "slug": "summary-sub", "category_id": cat_id})
+    sub_id = sub_res.json()["id"]
+    ent_res = client.post("/api/v1/entities/", json={
+        "name": "SummaryEnt",
+        "slug": "summary-ent",
+        "subcategory_id": sub_id,
+        "category_id": cat_id,
+        "image_url": "https://example.com/image.jpg"
+    })
+    ent_id = ent_res.json()["id"]
+    comp_res = client.post("/api/v1/scoring/components", json={"name": "SummaryComp", "slug": "summary-comp"})
+    comp_id = comp_res.json()["id"]
+    client.post("/api/v1/scoring/models", json={
+        "name": "Model", "version": "1.0", "category_id": cat_id,
+        "weights": [{"component_id": comp_id, "weight": 1.0}]
+    })
+    client.post("/api/v1/scoring/raw-scores", json={
+        "entity_id": ent_id, "component_id": comp_id, "value": 100.0
+    })
+
+    res = client.post(f"/api/v1/scoring/run/{cat_id}?summary=true&background=false")
+    assert res.status_code == 200
+    data = res.json()
+    assert data["entities_scored"] == 1
+    assert data["max_score"] == 100.0
+
+def test_run_scoring_api_queues_job(client, db):
+    from uuid import UUID
+    from app.services.jobs import job_runner
+
+    cat_res = client.post("/api/v1/categories/", json={"name": "JobCat", "domain": "Sports", "slug": "job-cat"})
+    cat_id = cat_res.json()["id"]
+    sub_res = client.post("/api/v1/subcategories/", json={"name": "Sub", "slug": "job-sub", "category_id": cat_id})
+    ent_res = client.post("/api/v1/entities/", json={
+        "name": "JobEnt",
+        "slug": "job-ent",
+        "subcategory_id": sub_res.json()["id"],
+        "category_id": cat_id,
+        "image_url": "https://example.com/image.jpg"
+    })
+    comp_res = client.post("/api/v1/scoring/components", json={"name": "JobComp", "slug": "job-comp"})
+    comp_id = comp_res.json()["id"]
+    client.post("/api/v1/scoring/models", json={
+        "name": "Model", "version": "1.0", "category_id": cat_id,
+        "weights": [{"component_id": comp_id, "weight": 1.0}]
+    })
+    client.post("/api/v1/scoring/raw-scores", json={
+        "entity_id": ent_res.json()["id"], "component_id": comp_id, "value": 100.0
+    })
+
+    res = client.post(f"/api/v1/scoring/run/{cat_id}")
+    assert res.status_code == 202
+    job = res.json()
+    assert job["status"] == "queued"
+
+    # A second request while the first is pending gets the same job
+    again = client.post(f"/api/v1/scoring/run/{cat_id}")
+    assert again.json()["id"] == job["id"]
+
+    job_runner.run_job(UUID(job["id"]), db=db)
+    # Jobs are visible to whoever queued them: the superuser here
+    from app.api import deps
+    from app.main import app
+    app.dependency_overrides[deps.get_current_user] = app.dependency_overrides[deps.get_current_active_superuser]
+    polled = client.get(f"/api/v1/jobs/{job['id']}").json()
+    assert polled["status"] == "succeeded"
+    assert polled["progress"] == 1.0
+    assert polled["result"]["entities_scored"] == 1
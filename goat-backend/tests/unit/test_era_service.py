@@ -0,0 +1,226 @@
+import bisect
+import random
+import statistics
+import threading
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+from app.models.category import Category
+from app.models.entity import Entity
+from app.models.era import Era, EraAdjustedScore, EraComponentSketch, EraFactor, EraModel
+from app.models.scoring import RawScore, ScoringComponent, ScoringModel, ScoringWeight
+from app.models.subcategory import SubCategory
+from app.schemas.era import EraValue
+from app.schemas.scoring import RawScoreCreate
+from app.services.era import era_service
+from app.services.era_stats import EraStats, era_stats_service
+from app.services.scoring import scoring_service
+
+
+def _seed_era_category(db):
+    cat = Category(name="EraCat", slug="eracat", domain="Sports")
+    db.add(cat)
+    db.flush()
+    sub = SubCategory(name="EraSub", slug="erasub", category_id=cat.id)
+    db.add(sub)
+    db.flush()
+    entities = [
+        Entity(name=f"EraEntity{i}", slug=f"era-entity-{i}", subcategory_id=sub.id,
+               category_id=cat.id, image_url="https://example.com/image.jpg")
+        for i in range(4)
+    ]
+    db.add_all(entities)
+    used = ScoringComponent(name="EraGoals", slug="era-goals")
+    unused = ScoringComponent(name="EraOther", slug="era-other")
+    db.add_all([used, unused])
+    model = ScoringModel(name="EraModel", version="1.0", category_id=cat.id, is_active=True)
+    db.add(model)
+    db.flush()
+    db.add(ScoringWeight(scoring_model_id=model.id, component_id=used.id, weight=1.0))
+    eras = [Era(name=f"Era{i}", category_id=cat.id) for i in range(2)]
+    db.add_all(eras)
+    db.flush()
+
+    values = {eras[0].id: [10.0, 20.0, 30.0, 40.0], eras[1].id: [5.0, 5.0, 5.0, 5.0]}
+    for era_id, era_values in values.items():
+        for entity, value in zip(entities, era_values):
+            db.add(RawScore(entity_id=entity.id, component_id=used.id, era_id=era_id, value=value))
+            db.add(RawScore(entity_id=entity.id, component_id=unused.id, era_id=era_id, value=value * 3))
+    db.commit()
+    return cat, eras, used, unused, values
+
+
+def test_era_factors_from_grouped_stats(db):
+    cat, eras, used, unused, values = _seed_era_category(db)
+    db.add(EraFactor(era_id=eras[0].id, component_id=used.id, mean_value=0.0, std_dev=1.0, multiplier=1.2))
+    db.commit()
+
+    assert era_service.calculate_era_factors(db, eras[0].id) == 1
+    factor = db.execute(
+        select(EraFactor).where(EraFactor.era_id == eras[0].id).execution_options(populate_existing=True)
+    ).scalar_one()
+    assert factor.component_id == used.id
+    assert factor.mean_value == pytest.approx(25.0)
+    assert factor.std_dev == pytest.approx(statistics.pstdev(values[eras[0].id]))
+    # Curated multipliers survive a recalculation
+    assert factor.multiplier == pytest.approx(1.2)
+
+    with pytest.raises(ValueError):
+        era_service.calculate_era_factors(db, cat.id)
+
+
+def test_category_era_factors_in_one_pass(db):
+    cat, eras, used, unused, _ = _seed_era_category(db)
+
+    assert era_service.calculate_category_era_factors(db, cat.id) == 2
+    factors = {
+        f.era_id: f
+        for f in db.execute(select(EraFactor).where(EraFactor.era_id.in_([e.id for e in eras]))).scalars()
+    }
+    assert set(factors) == {eras[0].id, eras[1].id}
+    assert all(f.component_id == used.id for f in factors.values())
+    assert factors[eras[1].id].mean_value == pytest.approx(5.0)
+    assert factors[eras[1].id].std_dev == pytest.approx(0.1)
+    assert factors[eras[1].id].multiplier == pytest.approx(1.0)
+
+
+def test_batch_adjustment_and_persisted_audit_rows(db):
+    cat, eras, used, unused, _ = _seed_era_category(db)
+    db.add(EraFactor(era_id=eras[0].id, component_id=used.id, mean_value=20.0, std_dev=5.0, multiplier=1.5))
+    db.add(EraFactor(era_id=eras[1].id, component_id=used.id, mean_value=5.0, std_dev=0.0, multiplier=2.0))
+    db.commit()
+    entity_id = db.execute(select(Entity.id).where(Entity.category_id == cat.id)).scalars().first()
+
+    values = [
+        EraValue(entity_id=entity_id, era_id=eras[0].id, component_id=used.id, raw_value=30.0),
+        EraValue(entity_id=entity_id, era_id=eras[1].id, component_id=used.id, raw_value=7.0),
+        EraValue(entity_id=entity_id, era_id=eras[0].id, component_id=unused.id, raw_value=9.0),
+    ]
+    results = era_service.adjust_values(db, values, persist=True)
+    db.commit()
+    assert [(r["adjusted_value"], r["z_score"]) for r in results] == [(45.0, 2.0), (7.0, None), (9.0, None)]
+    assert era_service.get_adjusted_value(db, entity_id, eras[0].id, used.id, 10.0) == pytest.approx(15.0)
+
+    # Persisting again updates the audit rows in place
+    era_service.adjust_values(db, [values[0].model_copy(update={"raw_value": 40.0})], persist=True)
+    db.commit()
+    stored = db.execute(
+        select(EraAdjustedScore).where(EraAdjustedScore.entity_id == entity_id)
+        .execution_options(populate_existing=True)
+    ).scalars().all()
+    assert len(stored) == 3
+    assert {s.adjusted_value for s in stored if s.era_id == eras[0].id and s.component_id == used.id} == {60.0}
+
+
+def test_persisted_adjustments_keep_last_repeat_and_check_ids(db):
+    cat, eras, used, _, _ = _seed_era_category(db)
+    entity_id = db.execute(select(Entity.id).where(Entity.category_id == cat.id)).scalars().first()
+    value = EraValue(entity_id=entity_id, era_id=eras[0].id, component_id=used.id, raw_value=30.0)
+
+    results = era_service.adjust_values(db, [value, value.model_copy(update={"raw_value": 35.0})], persist=True)
+    db.commit()
+    assert len(results) == 2
+    stored = db.execute(select(EraAdjustedScore).where(EraAdjustedScore.entity_id == entity_id)).scalars().all()
+    assert [s.raw_value for s in stored] == [35.0]
+
+    with pytest.raises(ValueError, match="Era not found"):
+        era_service.adjust_values(db, [value.model_copy(update={"era_id": cat.id})], persist=True)
+
+
+def test_entity_adjustments_from_latest_raw_scores(db):
+    cat, eras, used, _, _ = _seed_era_category(db)
+    db.add(EraFactor(era_id=eras[0].id, component_id=used.id, mean_value=20.0, std_dev=10.0, multiplier=0.5))
+    entity = db.execute(select(Entity).where(Entity.category_id == cat.id)).scalars().first()
+    scoring_service.submit_raw_score(
+        db, RawScoreCreate(entity_id=entity.id, component_id=used.id, value=50.0, era_id=eras[0].id)
+    )
+    db.commit()
+
+    [result] = era_service.adjust_entity(db, entity.id)
+    assert (result["raw_value"], result["adjusted_value"], result["z_score"]) == (50.0, 25.0, 3.0)
+
+
+def test_kll_sketch_quantiles_merge_and_round_trip():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(8, 2) for _ in range(20_000)]
+    left, right = EraStats(), EraStats()
+    for i, value in enumerate(values):
+        (left if i % 2 else right).add(value)
+    # Through the stored form, as merges into the database happen
+    left.merge(EraStats.from_row(SimpleNamespace(**right.to_columns())))
+
+    ordered = sorted(values)
+    assert left.count == len(values)
+    assert left.mean == pytest.approx(statistics.fmean(values))
+    assert left.std_dev == pytest.approx(statistics.pstdev(values))
+    assert left.quantiles.size < 2_000
+    for q in (0.25, 0.5, 0.75):
+        rank = bisect.bisect_left(ordered, left.quantiles.quantile(q)) / len(values)
+        assert rank == pytest.approx(q, abs=0.02)
+
+
+def test_median_iqr_normalization_from_sketches(db):
+    cat, eras, used, _, _ = _seed_era_category(db)
+    db.add(EraModel(name="Robust", version="1", category_id=cat.id, config={"normalization": "median_iqr"}))
+    db.commit()
+    era_service.calculate_era_factors(db, eras[0].id)
+
+    # Folded into the stored sketch as it arrives, with no rescan
+    entity = db.execute(select(Entity).where(Entity.category_id == cat.id)).scalars().first()
+    scoring_service.submit_raw_score(
+        db, RawScoreCreate(entity_id=entity.id, component_id=used.id, value=1e6, era_id=eras[0].id)
+    )
+    db.commit()
+    sketch = db.execute(
+        select(EraComponentSketch).where(EraComponentSketch.era_id == eras[0].id, EraComponentSketch.component_id == used.id)
+    ).scalar_one()
+    assert sketch.count == 5
+
+    era_service.calculate_era_factors(db, eras[0].id)
+    factor = db.execute(
+        select(EraFactor).where(EraFactor.era_id == eras[0].id).execution_options(populate_existing=True)
+    ).scalar_one()
+    # The outlier moves neither the median nor the IQR much
+    assert factor.mean_value == pytest.approx(30.0)
+    assert factor.std_dev == pytest.approx((40.0 - 20.0) / 1.349)
+
+    db.execute(update(EraModel).values(config={"normalization": "mode"}))
+    with pytest.raises(ValueError):
+        era_service.calculate_era_factors(db, eras[0].id)
+
+
+@pytest.mark.postgres
+def test_postgres_first_writers_to_an_era_keep_both_batches(pg_engine):
+    Session = sessionmaker(bind=pg_engine, autoflush=False)
+    with Session() as setup:
+        cat, eras, used, _, values = _seed_era_category(setup)
+        era_id, component_id = eras[0].id, used.id
+        entity_ids = setup.execute(select(Entity.id).where(Entity.category_id == cat.id)).scalars().all()
+
+    def write(session, entity_id, value):
+        session.add(RawScore(entity_id=entity_id, component_id=component_id, era_id=era_id, value=value))
+        session.flush()
+        era_stats_service.record_raw_scores(
+            session, [{"era_id": era_id, "component_id": component_id, "value": value}]
+        )
+
+    # Neither sees sketches for the era; the second waits for the first's build
+    first, second = Session(), Session()
+    try:
+        write(first, entity_ids[0], 100.0)
+        thread = threading.Thread(target=lambda: (write(second, entity_ids[1], 200.0), second.commit()))
+        thread.start()
+        thread.join(0.5)
+        assert thread.is_alive()
+        first.commit()
+        thread.join(30)
+        assert not thread.is_alive()
+    finally:
+        first.close()
+        second.close()
+
+    with Session() as check:
+        stats = era_stats_service.get_stats(check, [era_id], [component_id])[(era_id, component_id)]
+    assert stats.count == len(values[era_id]) + 2
+    assert stats.max_value == 200.0
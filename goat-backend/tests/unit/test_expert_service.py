@@ -0,0 +1,37 @@
+from uuid import uuid4
+from app.services.expert import expert_service
+from app.models.category import Category
+from app.models.expert import Expert, ExpertDomain
+
+
+def test_expert_weight_factors_batch(db):
+    cat = Category(name="ExpertCat", slug="expertcat", domain="Sports")
+    other = Category(name="ExpertOtherCat", slug="expertothercat", domain="Music")
+    db.add_all([cat, other])
+    db.flush()
+
+    primary = Expert(name="Primary", reputation_score=2.0)
+    secondary = Expert(name="Secondary", reputation_score=0.8)
+    outsider = Expert(name="Outsider", reputation_score=1.0)
+    db.add_all([primary, secondary, outsider])
+    db.flush()
+    db.add_all([
+        ExpertDomain(expert_id=primary.id, category_id=cat.id, expertise_level=1.0),
+        ExpertDomain(expert_id=secondary.id, category_id=cat.id, expertise_level=0.5),
+        ExpertDomain(expert_id=outsider.id, category_id=other.id, expertise_level=1.0),
+    ])
+    db.commit()
+
+    missing_id = uuid4()
+    factors = expert_service.get_expert_weight_factors(
+        db, [primary.id, secondary.id, outsider.id, missing_id], cat.id
+    )
+
+    # Reputation is clamped to 0.5-1.5; no domain in the category means no weight
+    assert factors[primary.id] == 1.5
+    assert factors[secondary.id] == 0.4
+    assert factors[outsider.id] == 0.0
+    assert missing_id not in factors
+
+    assert expert_service.calculate_expert_weight(db, secondary.id, cat.id, 0.5) == 0.2
+    assert expert_service.calculate_expert_weight(db, missing_id, cat.id, 1.0) == 0.0
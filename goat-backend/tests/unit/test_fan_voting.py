@@ -0,0 +1,348 @@
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+from app.models.category import Category
+from app.models.entity import Entity
+from app.models.fan_voting import FanVote, FanVoteAggregate, FanVoteBucket, FanVoteVersion, UserTrustScore
+from app.models.subcategory import SubCategory
+from app.schemas.fan_voting import FanVoteCreate
+from app.services.fan_aggregate_deltas import AggregateDelta
+from app.services.fan_voting import fan_voting_service
+from app.services.scoring_kernel import fan_score
+
+
+def _setup(db, n_entities=2):
+    cat = Category(name="FanCat", slug="fancat", domain="Sports")
+    db.add(cat)
+    db.flush()
+    sub = SubCategory(name="FanSub", slug="fansub", category_id=cat.id)
+    db.add(sub)
+    db.flush()
+    entities = [
+        Entity(name=f"FanEntity{i}", slug=f"fan-entity-{i}", subcategory_id=sub.id,
+               category_id=cat.id, image_url="https://example.com/image.jpg")
+        for i in range(n_entities)
+    ]
+    db.add_all(entities)
+    db.commit()
+    return cat, entities
+
+
+def _aggregate(db, entity_id, category_id):
+    return db.execute(
+        select(FanVoteAggregate)
+        .where(FanVoteAggregate.entity_id == entity_id, FanVoteAggregate.category_id == category_id)
+        .execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+
+
+def test_aggregate_maintained_by_vote_deltas(db):
+    cat, (entity, _) = _setup(db)
+    users = [uuid.uuid4() for _ in range(3)]
+    db.add(UserTrustScore(user_id=users[2], trust_score=0.5))
+    db.commit()
+
+    for user_id, rating in zip(users, (8.0, 6.0, 10.0)):
+        fan_voting_service.submit_vote(db, user_id, FanVoteCreate(entity_id=entity.id, category_id=cat.id, rating=rating))
+    # Changing a vote replaces its contribution instead of adding a new one
+    first = db.execute(select(FanVote).where(FanVote.user_id == users[0])).scalar_one()
+    changed = fan_voting_service.submit_vote(
+        db, users[0], FanVoteCreate(entity_id=entity.id, category_id=cat.id, rating=4.0, reason="Rewatched")
+    )
+    assert changed.id == first.id
+    assert changed.rating == 4.0
+    version = db.execute(select(FanVoteVersion).where(FanVoteVersion.fan_vote_id == first.id)).scalar_one()
+    assert (version.rating, version.weight, version.reason) == (8.0, 1.0, "Rewatched")
+
+    agg = _aggregate(db, entity.id, cat.id)
+    assert agg.vote_count == 3
+    assert agg.weight_sum == pytest.approx(2.5)
+    assert agg.weighted_rating_sum == pytest.approx(4.0 + 6.0 + 5.0)
+    assert agg.aggregate_score == pytest.approx(15.0 / 2.5 * 10)
+
+
+def test_reconcile_corrects_drift_and_removes_orphans(db):
+    cat, (entity, other) = _setup(db)
+    for rating in (7.0, 9.0):
+        fan_voting_service.submit_vote(db, uuid.uuid4(), FanVoteCreate(entity_id=entity.id, category_id=cat.id, rating=rating))
+    db.execute(
+        update(FanVoteAggregate)
+        .where(FanVoteAggregate.entity_id == entity.id)
+        .values(weighted_rating_sum=1.0, aggregate_score=1.0)
+    )
+    db.add(FanVoteAggregate(entity_id=other.id, category_id=cat.id, aggregate_score=50.0, vote_count=1,
+                            weighted_rating_sum=5.0, weight_sum=1.0))
+    db.commit()
+
+    report = fan_voting_service.reconcile_aggregates(db, category_id=cat.id)
+    db.commit()
+    assert (report.checked, report.corrected, report.removed) == (1, 1, 1)
+    agg = _aggregate(db, entity.id, cat.id)
+    assert agg.weighted_rating_sum == pytest.approx(16.0)
+    assert agg.aggregate_score == pytest.approx(80.0)
+    assert _aggregate(db, other.id, cat.id) is None
+
+    again = fan_voting_service.reconcile_aggregates(db, category_id=cat.id)
+    assert (again.corrected, again.removed) == (0, 0)
+
+
+def test_queued_votes_coalesce_into_one_aggregate_update(db, monkeypatch):
+    from app.services import fan_voting
+    from app.services.fan_aggregate_queue import FanAggregateQueue
+
+    cat, (entity, other) = _setup(db)
+    applied = []
+
+    def apply(session, batch):
+        applied.append(dict(batch))
+        fan_voting_service.apply_vote_deltas(session, batch)
+
+    queue = FanAggregateQueue(apply, session_factory=lambda: db)
+    queue.start(interval=3600)
+    monkeypatch.setattr(fan_voting, "fan_aggregate_queue", queue)
+    try:
+        for rating in (4.0, 6.0, 8.0):
+            fan_voting_service.submit_vote(db, uuid.uuid4(), FanVoteCreate(entity_id=entity.id, category_id=cat.id, rating=rating))
+        fan_voting_service.submit_vote(db, uuid.uuid4(), FanVoteCreate(entity_id=other.id, category_id=cat.id, rating=5.0))
+
+        assert _aggregate(db, entity.id, cat.id) is None
+        metrics = queue.metrics()
+        assert (metrics.queue_depth, metrics.pending_votes) == (2, 4)
+
+        assert queue.flush(db) == 2
+    finally:
+        queue.shutdown()
+
+    assert len(applied) == 1
+    delta = applied[0][(entity.id, cat.id)]
+    assert (delta.weighted_rating_sum, delta.weight_sum, delta.vote_count) == (18.0, 3.0, 3)
+    agg = _aggregate(db, entity.id, cat.id)
+    assert (agg.vote_count, agg.aggregate_score) == (3, pytest.approx(60.0))
+    metrics = queue.metrics()
+    assert (metrics.queue_depth, metrics.votes_applied, metrics.flushes) == (0, 4, 1)
+    assert metrics.last_flush_lag_seconds >= 0
+
+
+def test_flush_skips_deleted_entities_and_drops_failing_batches(db):
+    from app.services.fan_aggregate_queue import FanAggregateQueue, MAX_FLUSH_ATTEMPTS
+
+    cat, (entity, other) = _setup(db)
+    deltas = {}
+    for entity_ in (entity, other):
+        delta = AggregateDelta()
+        delta.add(6.0, 1.0, datetime.now(timezone.utc))
+        deltas[(entity_.id, cat.id)] = delta
+    db.delete(other)
+    db.commit()
+
+    # A vote whose entity was deleted before the flush does not hold up the rest
+    queue = FanAggregateQueue(fan_voting_service.apply_vote_deltas, session_factory=lambda: db)
+    for key, delta in deltas.items():
+        queue.enqueue(key, delta)
+    assert queue.flush(db) == 2
+    assert _aggregate(db, entity.id, cat.id).vote_count == 1
+
+    def fail(session, batch):
+        raise RuntimeError("database down")
+
+    broken = FanAggregateQueue(fail, session_factory=lambda: db)
+    broken.enqueue((entity.id, cat.id), AggregateDelta())
+    for _ in range(MAX_FLUSH_ATTEMPTS - 1):
+        assert broken.flush(db) == 0
+        assert broken.metrics().queue_depth == 1
+    assert broken.flush(db) == 0
+    metrics = broken.metrics()
+    assert (metrics.queue_depth, metrics.failed_flushes, metrics.votes_dropped) == (0, MAX_FLUSH_ATTEMPTS, 1)
+
+
+def test_reconcile_job_flushes_queued_deltas_first(db, monkeypatch):
+    from app.services import fan_voting
+    from app.services.fan_aggregate_queue import FanAggregateQueue
+    from app.services.jobs import JobContext, job_runner, _reconcile_fan_aggregates
+
+    cat, (entity, _) = _setup(db)
+    cat_id, entity_id = cat.id, entity.id
+    # The job flushes on a session of its own, which it closes afterwards
+    queue = FanAggregateQueue(fan_voting_service.apply_vote_deltas, session_factory=lambda: db)
+    queue.start(interval=3600)
+    monkeypatch.setattr(fan_voting, "fan_aggregate_queue", queue)
+    try:
+        for rating in (4.0, 8.0):
+            fan_voting_service.submit_vote(db, uuid.uuid4(), FanVoteCreate(entity_id=entity_id, category_id=cat_id, rating=rating))
+        job_id = job_runner.enqueue(db, "fan_votes.reconcile", {"category_id": str(cat_id)}).id
+        _reconcile_fan_aggregates(db, {"category_id": str(cat_id)}, JobContext(job_id, db))
+        db.commit()
+        # Nothing left to add on top of the reconciled totals
+        assert queue.flush(db) == 0
+    finally:
+        queue.shutdown()
+
+    agg = _aggregate(db, entity_id, cat_id)
+    assert (agg.vote_count, agg.weight_sum) == (2, pytest.approx(2.0))
+
+
+def test_parse_window_limits():
+    from app.services.fan_aggregate_deltas import parse_window
+
+    assert parse_window("24h") == timedelta(hours=24)
+    assert parse_window("400d") == timedelta(days=400)
+    for window in ("0d", "7w", "401d", "9601h", "99999999999d"):
+        with pytest.raises(ValueError):
+            parse_window(window)
+
+
+def test_trust_scores_cached_and_created_in_callers_transaction(db):
+    from app.services.trust_scores import trust_score_service
+
+    known, new_a, new_b = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    db.add(UserTrustScore(user_id=known, trust_score=0.4))
+    db.commit()
+
+    scores = trust_score_service.get_trust_scores(db, [known, new_a, new_b])
+    assert scores == {known: 0.4, new_a: 1.0, new_b: 1.0}
+    # Baseline rows are pending in this transaction, not committed separately
+    assert db.in_transaction()
+    db.commit()
+    rows = db.execute(
+        select(UserTrustScore.user_id).where(UserTrustScore.user_id.in_([new_a, new_b]))
+    ).scalars().all()
+    assert set(rows) == {new_a, new_b}
+
+    # Served from cache until invalidated
+    db.execute(update(UserTrustScore).where(UserTrustScore.user_id == known).values(trust_score=0.9))
+    assert trust_score_service.get_trust_score(db, known) == 0.4
+    trust_score_service.set_trust_score(db, known, 0.7)
+    assert trust_score_service.get_trust_score(db, known) == 0.7
+
+
+def test_ballot_writes_all_votes_and_aggregates_once(db):
+    from app.schemas.fan_voting import BallotRating
+
+    cat, entities = _setup(db, n_entities=4)
+    user_id = uuid.uuid4()
+    fan_voting_service.submit_vote(db, user_id, FanVoteCreate(entity_id=entities[0].id, category_id=cat.id, rating=2.0))
+
+    votes = fan_voting_service.submit_ballot(db, user_id, cat.id, [
+        BallotRating(entity_id=entity.id, rating=float(i + 5)) for i, entity in enumerate(entities)
+    ])
+    assert [v.entity_id for v in votes] == [e.id for e in entities]
+    for i, entity in enumerate(entities):
+        agg = _aggregate(db, entity.id, cat.id)
+        assert agg.vote_count == 1
+        assert agg.aggregate_score == pytest.approx((i + 5) * 10)
+    # The earlier vote was replaced and archived, not duplicated
+    versions = db.execute(select(FanVoteVersion)).scalars().all()
+    assert [(v.fan_vote_id, v.rating) for v in versions] == [(votes[0].id, 2.0)]
+
+
+def test_ballot_rejected_as_a_whole(db):
+    from app.schemas.fan_voting import BallotRating
+
+    cat, entities = _setup(db)
+    ratings = [BallotRating(entity_id=entities[0].id, rating=7.0), BallotRating(entity_id=uuid.uuid4(), rating=7.0)]
+    with pytest.raises(ValueError, match="do not belong"):
+        fan_voting_service.submit_ballot(db, uuid.uuid4(), cat.id, ratings)
+    with pytest.raises(ValueError, match="only once"):
+        fan_voting_service.submit_ballot(db, uuid.uuid4(), cat.id, [ratings[0], ratings[0]])
+    assert db.execute(select(FanVote)).first() is None
+
+
+def test_decayed_score_favours_recent_votes(db):
+    cat, (entity, _) = _setup(db)
+    now = datetime.now(timezone.utc)
+    delta = AggregateDelta.for_vote(2.0, 1.0, now - timedelta(days=60))
+    delta.merge(AggregateDelta.for_vote(10.0, 1.0, now))
+    fan_voting_service.apply_vote_deltas(db, {(entity.id, cat.id): delta})
+    db.commit()
+
+    agg = _aggregate(db, entity.id, cat.id)
+    assert agg.aggregate_score == pytest.approx(60.0)
+    # Two 30-day half-lives: the old vote counts a quarter as much
+    assert agg.decayed_score == pytest.approx((2.0 * 0.25 + 10.0) / 1.25 * 10)
+    assert fan_score(agg, "decayed") == agg.decayed_score
+    assert fan_score(agg, "lifetime") == agg.aggregate_score
+
+
+def test_windowed_aggregate_reads_buckets(db):
+    cat, (entity, _) = _setup(db)
+    now = datetime.now(timezone.utc)
+    fan_voting_service.apply_vote_deltas(db, {
+        (entity.id, cat.id): AggregateDelta.for_vote(4.0, 1.0, now - timedelta(days=3)),
+    })
+    fan_voting_service.apply_vote_deltas(db, {
+        (entity.id, cat.id): AggregateDelta.for_vote(9.0, 1.0, now),
+    })
+    db.commit()
+
+    assert fan_voting_service.get_windowed_aggregate(db, entity.id, cat.id, timedelta(hours=24)) == (90.0, 1)
+    assert fan_voting_service.get_windowed_aggregate(db, entity.id, cat.id, timedelta(days=7)) == (65.0, 2)
+    assert fan_voting_service.get_windowed_aggregate(
+        db, uuid.uuid4(), cat.id, timedelta(days=7)
+    ) == (None, 0)
+
+
+def test_reconcile_rebuilds_decayed_sums_and_buckets(db):
+    cat, (entity, _) = _setup(db)
+    for rating in (6.0, 8.0):
+        fan_voting_service.submit_vote(db, uuid.uuid4(), FanVoteCreate(entity_id=entity.id, category_id=cat.id, rating=rating))
+    expected = _aggregate(db, entity.id, cat.id).decayed_score
+    db.execute(update(FanVoteAggregate).values(decayed_weighted_rating_sum=0.0, decayed_score=0.0))
+    db.execute(update(FanVoteBucket).values(vote_count=99))
+    db.commit()
+
+    report = fan_voting_service.reconcile_aggregates(db, category_id=cat.id)
+    db.commit()
+    assert (report.corrected, report.buckets) == (1, 2)
+    assert _aggregate(db, entity.id, cat.id).decayed_score == pytest.approx(expected)
+    assert fan_voting_service.get_windowed_aggregate(db, entity.id, cat.id, timedelta(hours=24)) == (70.0, 2)
+
+
+@pytest.mark.postgres
+def test_postgres_upsert_new_vote_revote_and_concurrent_first_votes(pg_engine):
+    Session = sessionmaker(bind=pg_engine, autoflush=False)
+    with Session() as setup:
+        cat, (entity,) = _setup(setup, n_entities=1)
+    key = (entity.id, cat.id)
+    user_id = uuid.uuid4()
+
+    def cast(session, rating):
+        [(vote, delta)] = fan_voting_service.upsert_votes(
+            session, user_id, [FanVoteCreate(entity_id=entity.id, category_id=cat.id, rating=rating)], 1.0
+        )
+        fan_voting_service.apply_vote_deltas(session, {key: delta})
+        return vote, delta
+
+    # Two first votes at once, as from a double-submitted ballot: the second
+    # waits for the first to commit, then replaces it instead of adding to it
+    first, second = Session(), Session()
+    raced = []
+    try:
+        _, first_delta = cast(first, 6.0)
+        racer = threading.Thread(target=lambda: (raced.append(cast(second, 8.0)), second.commit()))
+        racer.start()
+        racer.join(0.5)
+        assert racer.is_alive()
+        first.commit()
+        racer.join(10)
+        assert not racer.is_alive()
+    finally:
+        first.close()
+        second.close()
+    assert first_delta.vote_count == 1
+    [(_, second_delta)] = raced
+    assert second_delta.vote_count == 0
+    assert second_delta.weighted_rating_sum == pytest.approx(2.0)
+
+    with Session() as db:
+        vote = fan_voting_service.submit_vote(
+            db, user_id, FanVoteCreate(entity_id=entity.id, category_id=cat.id, rating=9.0, reason="Rewatched")
+        )
+        versions = db.execute(
+            select(FanVoteVersion.rating).where(FanVoteVersion.fan_vote_id == vote.id).order_by(FanVoteVersion.rating)
+        ).scalars().all()
+        assert versions == [6.0, 8.0]
+        agg = _aggregate(db, entity.id, cat.id)
+        assert (agg.vote_count, agg.weighted_rating_sum, agg.weight_sum) == (1, pytest.approx(9.0), pytest.approx(1.0))
@@ -0,0 +1,114 @@
+import json
+import math
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import select
+from app.models.category import Category
+from app.models.entity import Entity
+from app.models.influence import DirtyInfluenceEntity, InfluenceEvent, InfluenceModel, InfluenceScore, InfluenceSource
+from app.models.subcategory import SubCategory
+from app.services.influence import influence_service
+from app.services.influence_ingest import influence_event_ingest_service
+
+
+def _seed_influence_category(db):
+    cat = Category(name="InfCat", slug="infcat", domain="Music")
+    db.add(cat)
+    db.flush()
+    sub = SubCategory(name="InfSub", slug="infsub", category_id=cat.id)
+    db.add(sub)
+    db.flush()
+    entities = [
+        Entity(name=f"InfEntity{i}", slug=f"inf-entity-{i}", subcategory_id=sub.id,
+               category_id=cat.id, image_url="https://example.com/image.jpg")
+        for i in range(3)
+    ]
+    db.add_all(entities)
+    sources = [
+        InfluenceSource(name="Press", source_type="web", credibility_score=0.9),
+        InfluenceSource(name="Forum", source_type="text", credibility_score=0.3),
+    ]
+    db.add_all(sources)
+    model = InfluenceModel(name="InfModel", version="1", category_id=cat.id,
+                           weights={"breadth": 0.4, "depth": 0.3, "longevity": 0.2, "peer": 0.1})
+    db.add(model)
+    db.flush()
+
+    events = [
+        (entities[0], sources[0], "mention", datetime(2000, 1, 1, tzinfo=timezone.utc), 2.0),
+        (entities[0], sources[1], "peer_mention", datetime(2010, 1, 1, tzinfo=timezone.utc), 1.0),
+        (entities[0], sources[1], "mention", None, 1.0),
+        (entities[1], sources[0], "peer_mention", datetime(2020, 6, 1, tzinfo=timezone.utc), 3.0),
+    ]
+    db.add_all(
+        InfluenceEvent(entity_id=entity.id, source_id=source.id, event_type=event_type,
+                       description="Mentioned", event_date=event_date, weight=weight)
+        for entity, source, event_type, event_date, weight in events
+    )
+    db.commit()
+    return model, entities
+
+
+def test_model_scores_from_grouped_query(db):
+    model, entities = _seed_influence_category(db)
+
+    report = influence_service.calculate_model_scores(db, model.id)
+    assert (report.entities_scored, report.entities_changed, report.entities_without_events) == (3, 3, 1)
+
+    scores = {
+        s.entity_id: s
+        for s in db.execute(select(InfluenceScore).where(InfluenceScore.influence_model_id == model.id)).scalars()
+    }
+    first = scores[entities[0].id]
+    longevity = min(100.0, (datetime(2010, 1, 1) - datetime(2000, 1, 1)).days / 365.25 * 5.0)
+    depth = math.log(4.0 + 1) * 20.0
+    assert (first.breadth_score, first.peer_score) == (20.0, 25.0)
+    assert first.depth_score == pytest.approx(depth)
+    assert first.longevity_score == pytest.approx(longevity)
+    assert first.total_score == pytest.approx(20.0 * 0.4 + depth * 0.3 + longevity * 0.2 + 25.0 * 0.1)
+    assert first.confidence_score == pytest.approx((0.9 + 0.3 + 0.3) / 3 * 0.3)
+    assert scores[entities[1].id].peer_score == 75.0
+    assert scores[entities[2].id].total_score == 0.0
+
+    # Single-entity scoring shares the computation
+    single = influence_service.calculate_influence_score(db, entities[0].id, model.id)
+    assert single.id == first.id
+    assert single.total_score == pytest.approx(first.total_score)
+
+    again = influence_service.calculate_model_scores(db, model.id)
+    assert again.entities_changed == 0
+
+
+def test_bulk_ingest_dedupes_and_rescores_dirty_entities(db):
+    model, entities = _seed_influence_category(db)
+    influence_service.calculate_model_scores(db, model.id)
+    source_id = db.execute(select(InfluenceSource.id).where(InfluenceSource.name == "Press")).scalar_one()
+
+    def line(entity, day, description="Cited"):
+        return json.dumps({
+            "entity_id": str(entity.id), "source_id": str(source_id), "event_type": "mention",
+            "event_date": f"2021-03-{day:02d}T{day:02d}:00:00Z", "description": description,
+        })
+
+    lines = [line(entities[2], 1), line(entities[2], 1), line(entities[2], 2),
+             line(entities[1], 3), json.dumps({"entity_id": str(entities[1].id), "source_id": str(entities[0].id),
+                                                "event_type": "mention", "description": "Cited"})]
+    report = influence_event_ingest_service.ingest(db, lines, "ndjson", chunk_size=3)
+    assert (report.received, report.inserted, report.duplicates, report.failed) == (5, 3, 1, 1)
+    assert [(b.inserted, b.duplicates, b.failed) for b in report.batches] == [(2, 1, 0), (1, 0, 1)]
+    assert report.errors[0].line == 5 and report.errors[0].error == "Influence source not found"
+    assert report.entities_marked == 2
+
+    # Re-sending is harmless; the same day at another hour is the same event
+    again = influence_event_ingest_service.ingest(db, [line(entities[2], 1).replace("T01", "T23")], "ndjson")
+    assert (again.inserted, again.duplicates) == (0, 1)
+
+    dirty = db.execute(select(DirtyInfluenceEntity.entity_id)).scalars().all()
+    assert sorted(dirty) == sorted([entities[1].id, entities[2].id])
+    rescored = influence_service.calculate_model_scores(db, model.id, dirty_only=True)
+    assert (rescored.entities_scored, rescored.entities_changed) == (2, 2)
+    assert db.execute(select(DirtyInfluenceEntity)).first() is None
+    score = db.execute(
+        select(InfluenceScore).where(InfluenceScore.entity_id == entities[2].id)
+    ).scalar_one()
+    assert score.breadth_score > 0
@@ -0,0 +1,74 @@
+import uuid
+import pytest
+from app.models.job import JOB_CANCELLED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED
+from app.services.jobs import JobCancelled, JobContext, JobRunner
+from app.services.score_all import score_all_service
+
+
+def _runner(calls):
+    runner = JobRunner()
+
+    @runner.register("test.echo")
+    def _echo(db, params, context):
+        context.check_cancelled()
+        context.progress(0.5, "halfway")
+        calls.append(params)
+        return {"echo": params["value"]}
+
+    return runner
+
+
+def test_enqueue_deduplicates_active_jobs(db):
+    runner = _runner([])
+    first = runner.enqueue(db, "test.echo", {"value": 1}, dedup_key="echo:a")
+    second = runner.enqueue(db, "test.echo", {"value": 2}, dedup_key="echo:a")
+    other = runner.enqueue(db, "test.echo", {"value": 3}, dedup_key="echo:b")
+
+    assert first.status == JOB_QUEUED
+    assert second.id == first.id
+    assert other.id != first.id
+
+
+def test_run_job_records_result_and_frees_dedup_key(db):
+    calls = []
+    runner = _runner(calls)
+    job = runner.enqueue(db, "test.echo", {"value": 7}, dedup_key="echo:a")
+
+    finished = runner.run_job(job.id, db=db)
+
+    assert finished.status == JOB_SUCCEEDED
+    assert finished.result == {"echo": 7}
+    assert finished.progress == 1.0
+    assert finished.attempts == 1
+    assert calls == [{"value": 7}]
+    # Already claimed: running it again is a no-op
+    assert runner.run_job(job.id, db=db) is None
+
+    rerun = runner.enqueue(db, "test.echo", {"value": 8}, dedup_key="echo:a")
+    assert rerun.id != job.id
+
+
+def test_cancel_queued_job(db):
+    calls = []
+    runner = _runner(calls)
+    job = runner.enqueue(db, "test.echo", {"value": 1})
+
+    cancelled = runner.cancel(db, job.id)
+
+    assert cancelled.status == JOB_CANCELLED
+    assert cancelled.finished_at is not None
+    assert runner.run_job(job.id, db=db) is None
+    assert calls == []
+
+
+def test_cancel_running_job_stops_between_categories(db):
+    runner = _runner([])
+    job = runner.enqueue(db, "test.echo", {"value": 1})
+    job.status = JOB_RUNNING
+    db.commit()
+
+    # Flagged, not finished: the handler has to notice
+    cancelled = runner.cancel(db, job.id)
+    assert (cancelled.status, cancelled.cancel_requested) == (JOB_RUNNING, True)
+    with pytest.raises(JobCancelled):
+        score_all_service.score_all(db, category_ids=[uuid.uuid4(), uuid.uuid4()], context=JobContext(job.id, db))
@@ -0,0 +1,112 @@
+import json
+import pytest
+from sqlalchemy import select, func
+from app.models.category import Category
+from app.models.entity import Entity
+from app.models.scoring import LatestRawScore, RawScore, ScoringComponent
+from app.models.subcategory import SubCategory
+from app.services.component_stats import component_stats_service
+from app.services.line_records import LineRecordReader
+from app.services.raw_score_ingest import raw_score_ingest_service
+from app.services.scoring import scoring_service
+
+
+def _setup(db):
+    cat = Category(name="IngestCat", slug="ingestcat", domain="Sports")
+    db.add(cat)
+    db.flush()
+    sub = SubCategory(name="IngestSub", slug="ingestsub", category_id=cat.id)
+    db.add(sub)
+    db.flush()
+    entities = [
+        Entity(name=f"IngestEntity{i}", slug=f"ingest-entity-{i}", subcategory_id=sub.id,
+               category_id=cat.id, image_url="https://example.com/image.jpg")
+        for i in range(3)
+    ]
+    db.add_all(entities)
+    comp = ScoringComponent(name="IngestComp", slug="ingestcomp")
+    db.add(comp)
+    db.commit()
+    return cat, entities, comp
+
+
+def test_ingest_ndjson_reports_bad_rows(db):
+    cat, entities, comp = _setup(db)
+    lines = [
+        json.dumps({"entity_id": str(entities[0].id), "component_id": str(comp.id), "value": 10}),
+        json.dumps({"entity_id": str(entities[1].id), "component_id": str(comp.id), "value": 20}),
+        "{not json",
+        json.dumps({"entity_id": str(entities[2].id), "component_id": str(comp.id)}),
+        json.dumps({"entity_id": str(comp.id), "component_id": str(comp.id), "value": 1}),
+        "",
+        json.dumps({"entity_id": str(entities[0].id), "component_id": str(comp.id), "value": 30}),
+    ]
+
+    report = raw_score_ingest_service.ingest(db, lines, "ndjson", chunk_size=2)
+
+    assert report.received == 6
+    assert report.inserted == 3
+    assert report.failed == 3
+    assert [e.line for e in report.errors] == [3, 4, 5]
+    assert report.errors[2].error == "Entity not found"
+
+    assert db.execute(select(func.count(RawScore.id))).scalar_one() == 3
+    latest = {
+        r.entity_id: r.value
+        for r in db.execute(select(LatestRawScore).where(LatestRawScore.component_id == comp.id)).scalars()
+    }
+    assert latest == {entities[0].id: 30.0, entities[1].id: 20.0}
+
+    stats, _ = component_stats_service.get_normalization_stats(db, cat.id, [comp.id])
+    assert stats[comp.id]["min"] == 20.0
+    assert stats[comp.id]["max"] == 30.0
+    assert stats[comp.id]["avg"] == pytest.approx(25.0)
+
+
+def test_ingest_csv_keeps_header_across_chunks(db):
+    cat, entities, comp = _setup(db)
+    lines = ["entity_id,component_id,value,era_id"] + [
+        f"{entity.id},{comp.id},{value}," for entity, value in zip(entities, [1.5, 2.5, "abc"])
+    ]
+
+    report = raw_score_ingest_service.ingest(db, lines, "csv", chunk_size=1)
+
+    assert report.inserted == 2
+    assert report.failed == 1
+    assert report.errors[0].line == 4
+    assert report.errors[0].error.startswith("value:")
+
+
+def test_ingest_repeats_in_one_chunk_keep_file_order(db):
+    cat, entities, comp = _setup(db)
+    lines = [
+        json.dumps({"entity_id": str(entities[0].id), "component_id": str(comp.id), "value": value})
+        for value in (5, 9, 7)
+    ]
+
+    report = raw_score_ingest_service.ingest(db, lines, "ndjson", chunk_size=10)
+
+    assert report.inserted == 3
+    latest = select(LatestRawScore.value).where(LatestRawScore.entity_id == entities[0].id)
+    assert db.execute(latest).scalar_one() == 7.0
+    # The history orders the same way when latest values are rebuilt from it
+    scoring_service.rebuild_latest_raw_scores(db, cat.id)
+    db.commit()
+    assert db.execute(latest).scalar_one() == 7.0
+
+
+def test_reader_rejects_short_csv_rows():
+    reader = LineRecordReader("csv")
+    rows = reader.read(["entity_id,component_id,value", "a,b"])
+    assert rows == [(2, None, "Expected 3 columns, got 2")]
+
+
+def test_reader_joins_quoted_csv_cells_across_lines():
+    reader = LineRecordReader("csv")
+    rows = reader.read(["id,description", '1,"Line one', "", '  line ""three"""', "2,plain"])
+    rows += reader.read(['3,"never closed', "4,lost"])
+    assert rows == [
+        (2, {"id": "1", "description": 'Line one\n\n  line "three"'}, None),
+        (5, {"id": "2", "description": "plain"}, None),
+    ]
+    assert reader.finish() == [(6, None, "Unterminated quoted field")]
@@ -1,8 +1,12 @@
+import threading
+import pytest
+from sqlalchemy.orm import sessionmaker
 from app.services.scoring import scoring_service
-from app.models.scoring import RawScore, ScoringComponent, ScoringModel, ScoringWeight
+from app.models.scoring import LatestRawScore, RawScore, ScoringComponent, ScoringModel, ScoringWeight
 from app.models.entity import Entity
 from app.models.category import Category
 from app.models.subcategory import SubCategory
+from app.schemas.scoring import RawScoreCreate
 
 def test_normalize_value_min_max():
     # Test standard min-max
@@ -62,9 +66,9 @@ def test_run_scoring_full_flow(db):
     db.commit()
     
     # 2. Add Raw Score
-    raw = RawScore(entity_id=entity.id, component_id=comp.id, value=100.0)
-    db.add(raw)
-    db.commit()
+    scoring_service.submit_raw_score(
+        db, RawScoreCreate(entity_id=entity.id, component_id=comp.id, value=100.0)
+    )
     
     # 3. Run Scoring
     results = scoring_service.run_scoring_for_category(db, cat.id)
@@ -75,3 +79,457 @@ def test_run_scoring_full_flow(db):
     # 1.0 * 1.0 (weight) * 100 = 100.0
     assert results[0].score == 100.0
     assert results[0].breakdown["testcomp"] == 100.0
+
+
+def _seed_scoring_category(db, n_entities=25):
+    import random
+    from app.models.era import Era, EraFactor
+    from app.models.expert import Expert, ExpertDomain, ExpertVote
+    from app.models.fan_voting import FanVoteAggregate
+    from app.models.influence import InfluenceModel, InfluenceScore
+
+    rng = random.Random(7)
+    cat = Category(name="KernelCat", slug="kernelcat", domain="Sports")
+    db.add(cat)
+    db.flush()
+    sub = SubCategory(name="KernelSub", slug="kernelsub", category_id=cat.id)
+    db.add(sub)
+    db.flush()
+
+    entities = [
+        Entity(
+            name=f"KernelEntity{i}",
+            slug=f"kernel-entity-{i}",
+            subcategory_id=sub.id,
+            category_id=cat.id,
+            image_url="https://example.com/image.jpg",
+        )
+        for i in range(n_entities)
+    ]
+    db.add_all(entities)
+
+    components = [
+        ScoringComponent(name="KStats", slug="kstats", normalization_type="min-max"),
+        ScoringComponent(name="KFollowers", slug="kfollowers", normalization_type="log"),
+        ScoringComponent(name="KImpact", slug="kimpact", normalization_type="z-score"),
+        ScoringComponent(name="KPopularity", slug="kpopularity", normalization_type="min-max", is_subjective=True),
+    ]
+    db.add_all(components)
+    model = ScoringModel(name="KernelModel", version="1.0", category_id=cat.id, is_active=True)
+    db.add(model)
+    db.flush()
+    for comp, w in zip(components, [0.4, 0.2, 0.2, 0.2]):
+        db.add(ScoringWeight(scoring_model_id=model.id, component_id=comp.id, weight=w))
+
+    eras = [Era(name=f"KernelEra{i}", category_id=cat.id) for i in range(2)]
+    db.add_all(eras)
+    db.flush()
+    db.add(EraFactor(era_id=eras[0].id, component_id=components[0].id, mean_value=40.0, std_dev=5.0, multiplier=1.1))
+    db.add(EraFactor(era_id=eras[1].id, component_id=components[2].id, mean_value=0.0, std_dev=1.0, multiplier=0.9))
+
+    for entity in entities:
+        for comp in components:
+            if rng.random() < 0.15:
+                continue
+            era = rng.choice([None, eras[0], eras[1]])
+            scoring_service.submit_raw_score(db, RawScoreCreate(
+                entity_id=entity.id,
+                component_id=comp.id,
+                value=rng.uniform(-5, 100) if comp.slug != "kfollowers" else rng.uniform(0, 1e6),
+                era_id=era.id if era else None,
+            ))
+
+    expert = Expert(name="Kernel Expert", reputation_score=1.3)
+    db.add(expert)
+    db.flush()
+    db.add(ExpertDomain(expert_id=expert.id, category_id=cat.id, expertise_level=0.8))
+    for entity in entities[:10]:
+        db.add(ExpertVote(expert_id=expert.id, entity_id=entity.id, scoring_model_id=model.id,
+                          score=rng.uniform(0, 10), confidence=rng.uniform(0.2, 1.0)))
+    for entity in entities[5:15]:
+        db.add(FanVoteAggregate(entity_id=entity.id, category_id=cat.id,
+                                aggregate_score=rng.uniform(10, 100), vote_count=rng.randint(1, 50)))
+    inf_model = InfluenceModel(name="KernelInf", version="1", category_id=cat.id, weights={})
+    db.add(inf_model)
+    db.flush()
+    for entity in entities[::3]:
+        db.add(InfluenceScore(entity_id=entity.id, influence_model_id=inf_model.id, total_score=rng.uniform(0, 100)))
+    db.commit()
+    return cat
+
+
+def test_vectorized_kernel_matches_reference(db):
+    import pytest
+    from app.services import scoring_kernel
+
+    cat = _seed_scoring_category(db)
+    inputs = scoring_service._load_scoring_inputs(db, cat.id)
+
+    reference = scoring_service._score_entities_reference(db, cat.id, inputs)
+    vectorized = scoring_kernel.score_category(inputs)
+
+    assert len(reference) == len(vectorized) == 25
+    for ref, vec in zip(reference, vectorized):
+        assert vec.entity_id == ref.entity_id
+        assert vec.score == pytest.approx(ref.score, abs=0.01)
+        assert vec.breakdown.keys() == ref.breakdown.keys()
+        for key, value in ref.breakdown.items():
+            assert vec.breakdown[key] == pytest.approx(value, abs=0.01)
+        assert vec.explanation_codes == ref.explanation_codes
+
+
+def test_run_scoring_reference_flag(db):
+    cat = _seed_scoring_category(db, n_entities=5)
+    vectorized = {s.entity_id: s.score for s in scoring_service.run_scoring_for_category(db, cat.id)}
+    reference = {s.entity_id: s.score for s in scoring_service.run_scoring_for_category(db, cat.id, reference=True)}
+    assert vectorized.keys() == reference.keys()
+    for entity_id, score in reference.items():
+        assert abs(vectorized[entity_id] - score) <= 0.01
+
+
+def test_rescoring_upserts_final_scores(db):
+    from sqlalchemy import select, func
+    from app.models.scoring import FinalScore
+
+    cat = _seed_scoring_category(db, n_entities=6)
+    first = scoring_service.score_category(db, cat.id)
+    assert first.entities_scored == 6
+    assert first.min_score <= first.mean_score <= first.max_score
+
+    model = db.execute(select(ScoringModel).where(ScoringModel.category_id == cat.id)).scalar_one()
+    component = db.execute(select(ScoringComponent).where(ScoringComponent.slug == "kstats")).scalar_one()
+    entity = db.execute(select(Entity).where(Entity.category_id == cat.id)).scalars().first()
+    scoring_service.submit_raw_score(
+        db, RawScoreCreate(entity_id=entity.id, component_id=component.id, value=10_000.0)
+    )
+
+    second = scoring_service.score_category(db, cat.id)
+    assert second.entities_scored == 6
+
+    count = db.execute(
+        select(func.count(FinalScore.id)).where(FinalScore.scoring_model_id == model.id)
+    ).scalar_one()
+    assert count == 6
+    rescored = db.execute(
+        select(FinalScore).where(FinalScore.entity_id == entity.id)
+    ).scalar_one()
+    assert rescored.breakdown["kstats"] > 0
+
+
+def test_incremental_scoring_rescores_only_dirty_entities(db):
+    from sqlalchemy import select
+    from app.models.fan_voting import FanVoteAggregate
+    from app.models.scoring import DirtyScoringEntity, FinalScore
+    from app.services.dirty_scores import dirty_score_service
+
+    cat = _seed_scoring_category(db, n_entities=8)
+    full = scoring_service.score_category(db, cat.id)
+    assert full.mode == "full" and full.entities_scored == 8
+
+    # Nothing changed since the full run
+    assert scoring_service.score_dirty(db, cat.id).entities_scored == 0
+
+    # A fan aggregate change does not move normalization stats
+    agg = db.execute(select(FanVoteAggregate).where(FanVoteAggregate.category_id == cat.id)).scalars().first()
+    before = db.execute(select(FinalScore.score).where(FinalScore.entity_id == agg.entity_id)).scalar_one()
+    agg.aggregate_score = 100.0 if agg.aggregate_score < 50 else 0.0
+    dirty_score_service.mark_dirty(db, [agg.entity_id], reason="fan_aggregate")
+    db.commit()
+
+    incremental = scoring_service.score_dirty(db, cat.id)
+    assert incremental.mode == "incremental"
+    assert incremental.entities_scored == 1
+    after = db.execute(select(FinalScore.score).where(FinalScore.entity_id == agg.entity_id)).scalar_one()
+    assert after != before
+    assert db.execute(select(DirtyScoringEntity)).first() is None
+
+    # An outlier raw score shifts min/max, so every entity is re-scored
+    component = db.execute(select(ScoringComponent).where(ScoringComponent.slug == "kstats")).scalar_one()
+    scoring_service.submit_raw_score(
+        db, RawScoreCreate(entity_id=agg.entity_id, component_id=component.id, value=1e6)
+    )
+
+    drifted = scoring_service.score_dirty(db, cat.id)
+    assert drifted.mode == "full"
+    assert drifted.entities_scored == 8
+
+
+def test_component_stats_follow_latest_raw_scores(db):
+    import pytest
+    from app.services.component_stats import component_stats_service
+
+    cat = Category(name="StatsCat", slug="statscat", domain="Sports")
+    db.add(cat)
+    db.flush()
+    sub = SubCategory(name="StatsSub", slug="statssub", category_id=cat.id)
+    db.add(sub)
+    db.flush()
+    entities = [
+        Entity(name=f"StatsEntity{i}", slug=f"stats-entity-{i}", subcategory_id=sub.id,
+               category_id=cat.id, image_url="https://example.com/image.jpg")
+        for i in range(4)
+    ]
+    db.add_all(entities)
+    comp = ScoringComponent(name="StatsComp", slug="statscomp")
+    db.add(comp)
+    db.commit()
+
+    for entity, value in zip(entities, [10.0, 20.0, 30.0, 40.0]):
+        scoring_service.submit_raw_score(db, RawScoreCreate(entity_id=entity.id, component_id=comp.id, value=value))
+
+    stats, _ = component_stats_service.get_normalization_stats(db, cat.id, [comp.id])
+    assert stats[comp.id]["min"] == 10.0
+    assert stats[comp.id]["max"] == 40.0
+    assert stats[comp.id]["avg"] == pytest.approx(25.0)
+    assert stats[comp.id]["std"] == pytest.approx(12.909944, rel=1e-6)
+
+    # Replacing the maximum must drop it from the stats, not just add a value
+    scoring_service.submit_raw_score(db, RawScoreCreate(entity_id=entities[3].id, component_id=comp.id, value=15.0))
+
+    stats, _ = component_stats_service.get_normalization_stats(db, cat.id, [comp.id])
+    assert stats[comp.id]["max"] == 30.0
+    assert stats[comp.id]["avg"] == pytest.approx(18.75)
+    assert stats[comp.id]["std"] == pytest.approx(8.539126, rel=1e-6)
+
+    # A rebuild from history lands on the same numbers
+    component_stats_service.rebuild(db, cat.id)
+    rebuilt, _ = component_stats_service.get_normalization_stats(db, cat.id, [comp.id])
+    for key in ("min", "max", "avg", "std"):
+        assert rebuilt[comp.id][key] == pytest.approx(stats[comp.id][key])
+
+
+def test_latest_raw_scores_projection(db):
+    from sqlalchemy import select, func
+
+    cat = _seed_scoring_category(db, n_entities=3)
+    entity = db.execute(select(Entity).where(Entity.category_id == cat.id)).scalars().first()
+    component = db.execute(select(ScoringComponent).where(ScoringComponent.slug == "kimpact")).scalar_one()
+    for value in (1.0, 2.0, 3.0):
+        scoring_service.submit_raw_score(
+            db, RawScoreCreate(entity_id=entity.id, component_id=component.id, value=value)
+        )
+
+    history = db.execute(
+        select(func.count(RawScore.id)).where(RawScore.entity_id == entity.id, RawScore.component_id == component.id)
+    ).scalar_one()
+    latest = db.execute(
+        select(LatestRawScore).where(LatestRawScore.entity_id == entity.id, LatestRawScore.component_id == component.id)
+    ).scalars().all()
+    assert history >= 3
+    assert len(latest) == 1
+    assert latest[0].value == 3.0
+
+    before = {(r.entity_id, r.component_id): r.value for r in db.execute(select(LatestRawScore)).scalars()}
+    scoring_service.rebuild_latest_raw_scores(db, cat.id)
+    db.commit()
+    after = {(r.entity_id, r.component_id): r.value for r in db.execute(select(LatestRawScore)).scalars()}
+    assert after.keys() == before.keys()
+
+
+def test_score_all_reports_each_category(db):
+    from app.services.score_all import score_all_service
+
+    first = _seed_scoring_category(db, n_entities=4)
+    category_ids = score_all_service.category_ids(db)
+    assert first.id in category_ids
+
+    progress = []
+    report = score_all_service.score_all(
+        db, category_ids=[first.id], on_progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert report.workers == 1
+    assert report.succeeded == 1
+    assert report.failed == 0
+    assert report.entities_scored == 4
+    assert report.categories[0].category_id == first.id
+    assert progress == [(1, 1)]
+
+
+def test_score_all_process_pool_reports_progress(db, monkeypatch):
+    import uuid
+    from concurrent.futures import Future
+    from app.core.config import settings
+    from app.services import score_all
+    from app.services.jobs import JobContext, job_runner
+
+    class InlineExecutor:
+        # Stands in for the spawned pool: runs each category on submit
+        def __init__(self, max_workers, mp_context, initializer, initargs):
+            assert mp_context.get_start_method() == "spawn"
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def submit(self, fn, category_id):
+            future = Future()
+            if category_id == failing:
+                future.set_exception(RuntimeError("worker died"))
+            else:
+                future.set_result(score_all._score_one(db, category_id).model_dump())
+            return future
+
+    first = _seed_scoring_category(db, n_entities=3)
+    failing = uuid.uuid4()
+    monkeypatch.setattr(score_all, "ProcessPoolExecutor", InlineExecutor)
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql://pool-test/goat")
+    monkeypatch.setattr(settings, "SCORE_ALL_MAX_WORKERS", 2)
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 2)
+    monkeypatch.setattr(score_all.os, "cpu_count", lambda: 2)
+    job = job_runner.enqueue(db, "scoring.run_all", {})
+
+    report = score_all.score_all_service.score_all(
+        db, category_ids=[first.id, failing], context=JobContext(job.id, db)
+    )
+
+    assert report.workers == 2
+    assert (report.succeeded, report.failed, report.entities_scored) == (1, 1, 3)
+    assert next(r for r in report.categories if r.category_id == failing).error == "worker died"
+    db.refresh(job)
+    assert job.progress == 1.0
+    assert job.progress_message == "2/2 categories scored"
+
+
+def test_final_score_explanation_rendered_from_codes(db):
+    from app.schemas.scoring import FinalScoreResponse
+
+    cat = _seed_scoring_category(db, n_entities=12)
+    results = scoring_service.run_scoring_for_category(db, cat.id)
+    final = next(r for r in results if r.explanation_codes and len(r.explanation_codes) > 2)
+    assert final.explanation is None
+
+    rendered = FinalScoreResponse.model_validate(final).model_dump()
+    assert "explanation_codes" not in rendered
+    assert "KPopularity: Popularity weight capped at 10% and renormalized" in rendered["explanation"]
+    assert rendered["explanation"].count(" | ") == len(final.explanation_codes) - 1
+
+    # Rows scored before explanation codes keep their stored text
+    final.explanation_codes = None
+    final.explanation = "Legacy text"
+    assert FinalScoreResponse.model_validate(final).explanation == "Legacy text"
+
+
+def test_leaderboard_refreshed_after_scoring(db):
+    from sqlalchemy import select
+    from app.models.scoring import FinalScore
+    from app.services.leaderboard import leaderboard_service
+
+    cat = _seed_scoring_category(db, n_entities=7)
+    summary = scoring_service.score_category(db, cat.id)
+    model_id = leaderboard_service.resolve_model_id(db, cat.id)
+    assert model_id == summary.scoring_model_id
+    assert leaderboard_service.count(db, cat.id, model_id) == 7
+
+    first = leaderboard_service.get_page(db, cat.id, model_id, limit=3)
+    second = leaderboard_service.get_page(db, cat.id, model_id, after_rank=first[-1].rank, limit=10)
+    ranked = first + second
+    assert [e.rank for e in ranked] == list(range(1, 8))
+    scores = [e.score for e in ranked]
+    assert scores == sorted(scores, reverse=True)
+
+    expected = db.execute(
+        select(FinalScore.score).where(FinalScore.scoring_model_id == model_id).order_by(FinalScore.score.desc())
+    ).scalars().all()
+    assert scores == expected
+
+    bottom = ranked[-1]
+    entry = leaderboard_service.get_entity_rank(db, model_id, bottom.entity_id)
+    assert entry.rank == 7
+    assert entry.entity_name.startswith("KernelEntity")
+
+
+def test_ranking_snapshot_pages_match_leaderboard(db):
+    from app.models.scoring import FinalScore
+    from app.services.leaderboard import leaderboard_service
+    from app.services.ranking_snapshots import ranking_snapshot_service
+
+    cat = _seed_scoring_category(db, n_entities=9)
+    scoring_service.score_category(db, cat.id)
+    snapshot = scoring_service.create_snapshot(db, cat.id, label="Season end")
+    model_id = leaderboard_service.resolve_model_id(db, cat.id)
+    assert snapshot.scoring_model_id == model_id
+    assert snapshot.entry_count == 9
+
+    ranked = leaderboard_service.get_page(db, cat.id, model_id, limit=20)
+    entries = (
+        ranking_snapshot_service.get_entries(db, snapshot, offset=0, limit=4)
+        + ranking_snapshot_service.get_entries(db, snapshot, offset=4, limit=10)
+    )
+    assert [e["rank"] for e in entries] == list(range(1, 10))
+    assert [e["entity_id"] for e in entries] == [r.entity_id for r in ranked]
+    assert [e["entity_name"] for e in entries] == [r.entity_name for r in ranked]
+    assert [e["score"] for e in entries] == [r.score for r in ranked]
+
+    for entry in entries:
+        final = db.query(FinalScore).filter_by(entity_id=entry["entity_id"], scoring_model_id=model_id).one()
+        assert entry["breakdown"] == final.breakdown
+    assert ranking_snapshot_service.get_entries(db, snapshot, offset=9) == []
+
+
+def test_snapshot_diff_reports_movers_entrants_and_exits(db):
+    from app.models.scoring import FinalScore
+    from app.services.leaderboard import leaderboard_service
+    from app.services.ranking_snapshots import ranking_snapshot_service
+
+    cat = _seed_scoring_category(db, n_entities=6)
+    scoring_service.score_category(db, cat.id)
+    model_id = leaderboard_service.resolve_model_id(db, cat.id)
+    first = scoring_service.create_snapshot(db, cat.id, label="Before")
+    ranked = leaderboard_service.get_page(db, cat.id, model_id, limit=10)
+    top, bottom, dropped = ranked[0], ranked[-1], ranked[2]
+
+    # Bottom entity jumps to first, one entity leaves the ranking
+    db.query(FinalScore).filter_by(entity_id=bottom.entity_id, scoring_model_id=model_id).update(
+        {"score": top.score + 10.0}
+    )
+    db.query(FinalScore).filter_by(entity_id=dropped.entity_id, scoring_model_id=model_id).delete()
+    leaderboard_service.refresh(db, cat.id, model_id)
+    db.commit()
+
+    live = ranking_snapshot_service.diff(db, first.id)
+    assert live.to_snapshot_id is None
+    assert live.entrants == []
+    assert [e.entity_id for e in live.exits] == [dropped.entity_id]
+    assert live.exits[0].old_rank == 3
+    biggest = live.movers[0]
+    assert biggest.entity_id == bottom.entity_id
+    assert (biggest.old_rank, biggest.new_rank, biggest.rank_change) == (6, 1, 5)
+    assert biggest.score_change == top.score + 10.0 - bottom.score
+    assert live.unchanged_count + len(live.movers) == 5
+
+    second = scoring_service.create_snapshot(db, cat.id, label="After")
+    between = ranking_snapshot_service.diff(db, first.id, second.id)
+    assert between.movers == live.movers
+    assert between.exits == live.exits
+    assert ranking_snapshot_service.diff(db, first.id, second.id) is between
+
+    reverse = ranking_snapshot_service.diff(db, second.id, first.id)
+    assert [e.entity_id for e in reverse.entrants] == [dropped.entity_id]
+    assert reverse.exits == []
+
+
+@pytest.mark.postgres
+def test_postgres_runs_of_one_category_wait_for_each_other(pg_engine):
+    Session = sessionmaker(bind=pg_engine, autoflush=False)
+    with Session() as setup:
+        cat = _seed_scoring_category(setup, n_entities=5)
+
+    # A run in progress elsewhere, e.g. a score-all pool worker
+    holder, runner = Session(), Session()
+    summaries = []
+    try:
+        scoring_service._lock_category(holder, cat.id)
+        thread = threading.Thread(target=lambda: summaries.append(scoring_service.score_category(runner, cat.id)))
+        thread.start()
+        thread.join(0.5)
+        assert thread.is_alive()
+        holder.commit()
+        thread.join(30)
+        assert not thread.is_alive()
+    finally:
+        holder.close()
+        runner.close()
+    assert summaries[0].entities_scored == 5
@@ -0,0 +1,120 @@
+import uuid
+from starlette.requests import Request
+from app.api.v1 import deps
+from app.core.config import settings
+from app.services.vote_anomalies import (
+    BUCKET_SECONDS, IP_VOTE_THRESHOLD, SURGE_WARMUP_BUCKETS, VoteAnomalyDetector,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_clustering_flagged_once_per_ip_and_entity():
+    clock = FakeClock()
+    detector = VoteAnomalyDetector(clock=clock)
+    entity_id = uuid.uuid4()
+    for _ in range(IP_VOTE_THRESHOLD * 2):
+        detector.observe(entity_id, "203.0.113.7", "Mozilla/5.0")
+    # Thousands of one-off IPs don't trip anything or grow the sketch
+    for i in range(5000):
+        detector.observe(entity_id, f"198.51.{i // 256}.{i % 256}", None)
+        clock.now += 0.001
+
+    anomalies = detector._pending
+    assert [(a["anomaly_type"], a["metadata_json"]["ip_address"]) for a in anomalies] == [
+        ("clustering", "203.0.113.7")
+    ]
+    assert anomalies[0]["entity_id"] == entity_id
+    assert len(detector._ip_sketch.window) == detector._ip_sketch.width * len(detector._ip_sketch._hashes)
+
+
+def test_sliding_window_forgets_old_votes():
+    clock = FakeClock()
+    detector = VoteAnomalyDetector(clock=clock)
+    entity_id = uuid.uuid4()
+    for _ in range(IP_VOTE_THRESHOLD - 1):
+        detector.observe(entity_id, "203.0.113.8")
+    clock.now += BUCKET_SECONDS * 10
+    detector.tick()
+    for _ in range(IP_VOTE_THRESHOLD - 1):
+        detector.observe(entity_id, "203.0.113.8")
+    assert not detector.has_pending
+
+
+def test_surge_against_ewma_baseline():
+    clock = FakeClock()
+    detector = VoteAnomalyDetector(clock=clock)
+    entity_id = uuid.uuid4()
+    for _ in range(SURGE_WARMUP_BUCKETS + 4):
+        for _ in range(3):
+            detector.observe(entity_id)
+        clock.now += BUCKET_SECONDS
+        detector.tick()
+    assert not detector.has_pending
+
+    for _ in range(80):
+        detector.observe(entity_id)
+    clock.now += BUCKET_SECONDS
+    # Votes only count; the writer's tick closes the bucket
+    assert not detector.has_pending
+    detector.tick()
+
+    [anomaly] = detector._pending
+    assert anomaly["anomaly_type"] == "surge"
+    assert anomaly["metadata_json"]["votes"] == 80
+    assert anomaly["severity"] > 4
+
+
+def test_flush_writes_vote_anomalies(db):
+    from sqlalchemy import select
+    from app.models.category import Category
+    from app.models.entity import Entity
+    from app.models.fan_voting import FanVote, VoteAnomaly
+    from app.models.subcategory import SubCategory
+    from app.schemas.fan_voting import FanVoteCreate
+    from app.services.fan_voting import fan_voting_service
+
+    cat = Category(name="AnomalyCat", slug="anomalycat", domain="Sports")
+    db.add(cat)
+    db.flush()
+    sub = SubCategory(name="AnomalySub", slug="anomalysub", category_id=cat.id)
+    db.add(sub)
+    db.flush()
+    entity = Entity(name="AnomalyEntity", slug="anomaly-entity", subcategory_id=sub.id,
+                    category_id=cat.id, image_url="https://example.com/image.jpg")
+    db.add(entity)
+    db.commit()
+
+    for _ in range(IP_VOTE_THRESHOLD):
+        fan_voting_service.submit_vote(
+            db, uuid.uuid4(), FanVoteCreate(entity_id=entity.id, category_id=cat.id, rating=10.0),
+            ip_address="192.0.2.44", user_agent="curl/8.0",
+        )
+
+    assert set(db.execute(select(FanVote.ip_address)).scalars()) == {"192.0.2.44"}
+    [anomaly] = db.execute(select(VoteAnomaly).where(VoteAnomaly.entity_id == entity.id)).scalars().all()
+    assert anomaly.anomaly_type == "clustering"
+    assert anomaly.is_resolved is False
+
+
+def test_vote_source_ignores_forwarded_for_from_untrusted_peers(monkeypatch):
+    def source(peer, forwarded=None):
+        headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+        return deps.get_vote_source(Request({"type": "http", "client": (peer, 1234), "headers": headers}))[0]
+
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["10.0.0.0/8"])
+    deps._trusted_proxy_networks.cache_clear()
+    try:
+        # A voter can't pick their own address
+        assert source("203.0.113.7", "198.51.100.1") == "203.0.113.7"
+        # Behind the proxies, the right-most hop they didn't add is the client
+        assert source("10.0.0.2", "198.51.100.1, 203.0.113.7, 10.0.0.5") == "203.0.113.7"
+        assert source("10.0.0.2") == "10.0.0.2"
+    finally:
+        deps._trusted_proxy_networks.cache_clear()